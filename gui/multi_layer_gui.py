@@ -4,13 +4,13 @@ import numpy as np
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
     QLabel, QLineEdit, QHBoxLayout, QGraphicsView, QGraphicsScene,
-    QSizePolicy, QComboBox, QApplication, QDialog, QMenu, QTabWidget,
+    QSizePolicy, QComboBox, QApplication, QDialog, QMenu, QTabWidget, QMessageBox,
     QFileDialog, QHeaderView, QCheckBox
 )
 from PySide6.QtCore import Qt, QEvent
 from PySide6.QtGui import QColor, QPalette
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from ml_model_functions import (
+from ml_model_package.ml_model_functions import (
     Layer,
     run_simulation,
     plot_results,
@@ -18,6 +18,13 @@ from ml_model_functions import (
     calculate_migrated_mass_over_time,
     calculate_migrated_mass_over_time_by_layer,
     plot_migrated_mass_over_time_by_layer,
+    ThresholdObserver,
+    EquilibriumObserver,
+    NegativeConcentrationObserver,
+    time_to_threshold,
+    auto_resolution,
+    SuperpositionEngine,
+    minimum_layer_thickness,
 )
 from tooltip_helper import DelayedToolTipHelper
 
@@ -51,6 +58,9 @@ class MultiLayerTab(QWidget):
         self.dt_input = QLineEdit("1000")
         self.d_nx_input = QLineEdit("0.02")
         self.threshold_input = QLineEdit("1e-5")
+        self.temperature_profile_input = QLineEdit("")
+        self.temperature_profile_input.setPlaceholderText("z.B. 0.5:80; 3:30; 365:20")
+        self.temperature_profile_input.textChanged.connect(lambda _: self.validate_inputs())
         self.threshold_checkbox = QCheckBox("")
         self.threshold_input.setEnabled(False)
         self.threshold_input.setFixedHeight(25)
@@ -58,7 +68,16 @@ class MultiLayerTab(QWidget):
         self.threshold_input.setAlignment(Qt.AlignRight)
         self.sim_case_dropdown = QComboBox()
         self.sim_case_dropdown.addItems(["worst", "best"])
+        self.solver_dropdown = QComboBox()
+        self.solver_dropdown.addItems(["Crank-Nicolson", "Crank-Nicolson (geometrisch)", "TR-BDF2", "Modal"])
+        self.lumped_contact_checkbox = QCheckBox("")
+        self.superposition_checkbox = QCheckBox("")
         self.tooltip_helper.register(self.T_C_input, "Temperatur der Simulation in °C.")
+        self.tooltip_helper.register(
+            self.temperature_profile_input,
+            "Optionales Temperaturprofil als Abschnitte 'Ende in Tagen:Temperatur in °C', getrennt durch ';' "
+            "(z.B. Heißabfüllung, Transport, Lagerung). Ersetzt T_C; nach dem letzten Abschnitt gilt dessen Temperatur.",
+        )
         self.tooltip_helper.register(self.M_r_input, "Relative Molekülmasse des Migranten in g/mol.")
         self.tooltip_helper.register(self.t_max_input, "Gesamtdauer der Simulation in Tagen (wird in Sekunden umgerechnet).")
         self.tooltip_helper.register(self.dt_input, "Zeitschrittgröße in Sekunden.")
@@ -68,7 +87,25 @@ class MultiLayerTab(QWidget):
             "Bestimmt, ob mit Worst-Case- oder Best-Case-Annahmen gerechnet wird (Diffusionskoeffizient nach Piringer).",
         )
         self.tooltip_helper.register(self.threshold_checkbox, "Grenzwertlinie im Migrationsplot aktivieren.")
+        self.tooltip_helper.register(
+            self.solver_dropdown,
+            "Crank-Nicolson: Zeitschritte mit Δt. Crank-Nicolson (geometrisch): beginnt mit Δt und verdoppelt den "
+            "Zeitschritt stufenweise bis t_max/100. TR-BDF2: L-stabil, dämpft steife Moden der Kontaktphase "
+            "auch bei großem Δt (etwa doppelter Aufwand je Schritt). Modal: Eigenmodenzerlegung des Schichtaufbaus (zwischengespeichert); "
+            "Änderungen von t_max oder Grenzwert erfordern keine neue Lösung.",
+        )
         self.tooltip_helper.register(self.threshold_input, "Grenzwert für die Migrationsmenge in mg/dm².")
+        self.tooltip_helper.register(
+            self.lumped_contact_checkbox,
+            "Kontaktphase als ideal durchmischt behandeln: ein einzelner Knoten im Gleichgewicht mit dem letzten "
+            "Polymerknoten (über K, Dicke und Dichte) statt einer aufgelösten Schicht mit nₓ Punkten.",
+        )
+        self.tooltip_helper.register(
+            self.superposition_checkbox,
+            "Ergebnis aus zwischengespeicherten Einheitsantworten je Schicht zusammensetzen (C_init = 1 in einer "
+            "Schicht). Änderungen von C_init in der Tabelle erfordern dann keine neue Simulation; Grenzwertzeitpunkt "
+            "zwischen den gespeicherten Zeitpunkten interpoliert, ohne Gleichgewichtserkennung.",
+        )
 
         # Validierung verbinden
         for fld in (self.T_C_input, self.M_r_input, self.t_max_input, self.dt_input, self.d_nx_input):
@@ -87,6 +124,7 @@ class MultiLayerTab(QWidget):
 
         # Nutze addWidget und setze die Elemente linksbündig
         self.input_layout.addWidget(self._create_labeled_row("T<sub>C</sub>", "°C", self.T_C_input))
+        self.input_layout.addWidget(self._create_labeled_row("T-Profil", "Tage:°C", self.temperature_profile_input))
         self.input_layout.addWidget(self._create_labeled_row("M<sub>r</sub>", "g/mol", self.M_r_input))
         self.input_layout.addWidget(self._create_labeled_row("t<sub>max</sub>", "Tage", self.t_max_input))
         self.input_layout.addWidget(self._create_labeled_row("Δt", "s", self.dt_input))
@@ -110,6 +148,10 @@ class MultiLayerTab(QWidget):
         self.input_layout.addWidget(threshold_container)
         self.input_layout.setAlignment(Qt.AlignLeft)  # Links-Ausrichtung für den gesamten Eingabebereich
         self.input_layout.addWidget(self._create_labeled_row("Simulation Case", "", self.sim_case_dropdown))
+        self.input_layout.addWidget(self._create_labeled_row("Löser", "", self.solver_dropdown))
+        self.input_layout.addWidget(self._create_labeled_row("Kontaktphase durchmischt", "", self.lumped_contact_checkbox))
+        self.input_layout.addWidget(self._create_labeled_row("C<sub>init</sub> per Superposition", "",
+                                                             self.superposition_checkbox))
         self.input_layout.setSpacing(6)
 
         left_column = QVBoxLayout()
@@ -218,6 +260,26 @@ class MultiLayerTab(QWidget):
         self.start_button.pressed.connect(self._finalize_pending_table_edits)
         self.start_button.clicked.connect(self.start_calculation)
 
+        self.auto_resolution_button = QPushButton("Auflösung automatisch")
+        self.auto_resolution_button.setFixedSize(150, 28)
+        self.auto_resolution_button.setProperty("appStyle", True)
+        self.tooltip_helper.register(
+            self.auto_resolution_button,
+            "Bestimmt nₓ je Schicht und Δt per Richardson-Extrapolation so, dass die Migrationsmenge bei t_max "
+            "auf 0,1 % genau ist, und zeigt die vorhergesagte Rechenzeit an.",
+        )
+        self.auto_resolution_button.clicked.connect(self.choose_resolution)
+
+        self.barrier_button = QPushButton("Barrieredicke")
+        self.barrier_button.setFixedSize(150, 28)
+        self.barrier_button.setProperty("appStyle", True)
+        self.tooltip_helper.register(
+            self.barrier_button,
+            "Bestimmt die Dicke der markierten Schicht, bei der die Migrationsmenge nach t_max genau den Grenzwert "
+            "erreicht, und trägt d und nₓ in die Tabelle ein.",
+        )
+        self.barrier_button.clicked.connect(self.choose_barrier_thickness)
+
         # Fehler-Label
         self.error_label = QLabel("")
         self.error_label.setStyleSheet("color: red;")
@@ -227,6 +289,8 @@ class MultiLayerTab(QWidget):
         controls_layout.setContentsMargins(0, 0, 0, 0)
         controls_layout.setSpacing(12)
         controls_layout.addWidget(self.error_label, 1)
+        controls_layout.addWidget(self.barrier_button, 0, Qt.AlignRight)
+        controls_layout.addWidget(self.auto_resolution_button, 0, Qt.AlignRight)
         controls_layout.addWidget(self.start_button, 0, Qt.AlignRight)
 
         right_column = QVBoxLayout()
@@ -359,6 +423,13 @@ class MultiLayerTab(QWidget):
         else:
             self.mark_field_valid(self.threshold_input)
 
+        try:
+            self._parse_temperature_profile()
+            self.mark_field_valid(self.temperature_profile_input)
+        except ValueError:
+            self.mark_field_invalid(self.temperature_profile_input)
+            is_valid = False
+
         for row in range(self.layer_table.rowCount()):
             for col in (1, 2, 3, 4, 5):
                 if not self._validate_table_value(row, col):
@@ -584,6 +655,144 @@ class MultiLayerTab(QWidget):
             rect.setToolTip(f"{material}: {d} cm")
             x_offset += width
 
+    def _parse_temperature_profile(self):
+        """Liest das Temperaturprofil 'Ende in Tagen:°C; ...' als Abschnitte (Beginn [s], Ende [s], T_C) oder None."""
+        text = self.temperature_profile_input.text().strip()
+        if not text:
+            return None
+        profile = []
+        start = 0.0
+        for part in filter(None, (p.strip() for p in text.split(";"))):
+            end_days, T_C = (float(v) for v in part.split(":"))
+            end = end_days * 24 * 3600
+            if end <= start:
+                raise ValueError("Abschnittsenden müssen aufsteigend sein.")
+            profile.append((start, end, T_C))
+            start = end
+        if not profile:
+            raise ValueError("Leeres Temperaturprofil.")
+        return profile
+
+    def _build_layers(self, M_r, T_C, simulation_case, lumped_contact):
+        """Erstellt die Layer-Liste aus der Tabelle und setzt die Diffusionskoeffizienten."""
+        layers = []
+        for row in range(self.layer_table.rowCount()):
+            material = self.get_material_from_row(row)
+            d       = float(self.layer_table.item(row, 1).text())
+            nx      = int(float(self.layer_table.item(row, 2).text()))
+            K_val   = float(self.layer_table.item(row, 3).text())
+            C_init  = float(self.layer_table.item(row, 4).text())
+            density = float(self.layer_table.item(row, 5).text())
+            is_contact = lumped_contact and row == self.layer_table.rowCount() - 1
+            layer = Layer(material, d, nx, K_val, C_init, density=density, lumped=is_contact)       # :contentReference[oaicite:3]{index=3}
+            layer.set_diffusion_coefficient(M_r, T_C, simulation_case=simulation_case)  # :contentReference[oaicite:4]{index=4}
+            layers.append(layer)
+        return layers
+
+    def choose_resolution(self):
+        """Wählt nₓ je Schicht und Δt für eine Genauigkeit von 0,1 % der Migrationsmenge bei t_max und trägt sie ein."""
+        self._finalize_pending_table_edits()
+
+        if not self.validate_inputs():
+            self.show_error_message("Bitte korrigiere alle rot markierten Felder.")
+            return
+
+        M_r = float(self.M_r_input.text())
+        T_C = float(self.T_C_input.text())
+        t_max = float(self.t_max_input.text()) * 24 * 3600
+        integrator = "tr_bdf2" if self.solver_dropdown.currentText() == "TR-BDF2" else "cn"
+        layers = self._build_layers(M_r, T_C, self.sim_case_dropdown.currentText(),
+                                    self.lumped_contact_checkbox.isChecked())
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            result = auto_resolution(layers, t_max, rtol=1e-3, integrator=integrator)
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        self.layer_table.blockSignals(True)
+        for row, nx in enumerate(result["nx"]):
+            self.layer_table.item(row, 2).setText(str(nx))
+        self.layer_table.blockSignals(False)
+        self.dt_input.setText(f"{result['dt']:.6g}")
+        self.update_graphics()
+
+        QMessageBox.information(
+            self,
+            "Auflösung automatisch",
+            f"nₓ je Schicht: {', '.join(str(nx) for nx in result['nx'])}\n"
+            f"Größter Gitterabstand: {result['d_nx_ratio']:.3g} cm\n"
+            f"Δt: {result['dt']:.3g} s ({result['Nt']} Zeitschritte)\n"
+            f"Geschätzter Fehler (Ort/Zeit): {result['error_space']:.2g} / {result['error_time']:.2g} mg/dm²\n"
+            f"Vorhergesagte Rechenzeit: {result['predicted_runtime']:.3g} s "
+            f"({result['solves']} Testrechnungen)",
+        )
+
+    def choose_barrier_thickness(self):
+        """Legt die Dicke der markierten Schicht so aus, dass die Migrationsmenge bei t_max den Grenzwert erreicht."""
+        self._finalize_pending_table_edits()
+
+        if not self.validate_inputs():
+            self.show_error_message("Bitte korrigiere alle rot markierten Felder.")
+            return
+        row = self.layer_table.currentRow()
+        lumped_contact = self.lumped_contact_checkbox.isChecked()
+        if row < 0 or self.get_material_from_row(row) == "Kontaktphase":
+            self.show_error_message("Bitte eine Polymerschicht in der Tabelle markieren.")
+            return
+        if not self.threshold_checkbox.isChecked():
+            self.show_error_message("Bitte einen Grenzwert angeben.")
+            return
+        if self.solver_dropdown.currentText() == "Modal" or self._parse_temperature_profile() is not None:
+            self.show_error_message("Die Auslegung ist nur mit Zeitschritten und konstanter Temperatur verfügbar.")
+            return
+
+        limit = float(self.threshold_input.text())
+        M_r = float(self.M_r_input.text())
+        T_C = float(self.T_C_input.text())
+        t_max = float(self.t_max_input.text()) * 24 * 3600
+        dt = float(self.dt_input.text())
+        solver_choice = self.solver_dropdown.currentText()
+        integrator = "tr_bdf2" if solver_choice == "TR-BDF2" else "cn"
+        time_stepping = "geometric" if solver_choice == "Crank-Nicolson (geometrisch)" else "fixed"
+        layers = self._build_layers(M_r, T_C, self.sim_case_dropdown.currentText(), lumped_contact)
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            result = minimum_layer_thickness(layers, row, limit, t_max, dt, integrator=integrator,
+                                             time_stepping=time_stepping)
+        except (ValueError, RuntimeError) as e:
+            self.show_error_message(str(e))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        if result["limit_met_at_d_min"]:
+            # Tabelle unverändert lassen: d_min ist keine ausgelegte Dicke
+            QMessageBox.information(
+                self,
+                "Barrieredicke",
+                f"Keine Barriere erforderlich: Der Grenzwert {limit:.3g} mg/dm² wird auch mit der kleinsten "
+                f"zulässigen Dicke von {self.get_material_from_row(row)} (Zeile {row + 1}, d = {result['d']:.4g} cm) "
+                f"nach {t_max / 86400.0:.3g} Tagen eingehalten ({result['migrated_mass']:.3g} mg/dm²).",
+            )
+            return
+
+        self.layer_table.blockSignals(True)
+        self.layer_table.item(row, 1).setText(f"{result['d']:.4g}")
+        self.layer_table.item(row, 2).setText(str(result["nx"]))
+        self.layer_table.blockSignals(False)
+        self.update_graphics()
+
+        QMessageBox.information(
+            self,
+            "Barrieredicke",
+            f"{self.get_material_from_row(row)} (Zeile {row + 1}): d = {result['d']:.4g} cm, nₓ = {result['nx']}\n"
+            f"Migrationsmenge nach {t_max / 86400.0:.3g} Tagen: {result['migrated_mass']:.3g} mg/dm² "
+            f"(Grenzwert {limit:.3g} mg/dm²)\n"
+            f"{result['solves']} Vorwärtsrechnungen, davon {result['early_stops']} vorzeitig beendet",
+        )
+
     def start_calculation(self):
         """Liest alle Eingaben aus, baut die Layer-Liste, führt die Simulation durch und zeigt das Ergebnis."""
         self._finalize_pending_table_edits()
@@ -600,43 +809,79 @@ class MultiLayerTab(QWidget):
         t_max_days = float(self.t_max_input.text())
         t_max = t_max_days * 24 * 3600
         dt = float(self.dt_input.text())
+        solver_choice = self.solver_dropdown.currentText()
+        solver = "modal" if solver_choice == "Modal" else "banded"
+        time_stepping = "geometric" if solver_choice == "Crank-Nicolson (geometrisch)" else "fixed"
+        integrator = "tr_bdf2" if solver_choice == "TR-BDF2" else "cn"
+        lumped_contact = self.lumped_contact_checkbox.isChecked()
+        temperature_profile = self._parse_temperature_profile()
 
         # 4) Layer-Liste bauen
-        layers = []
-        for row in range(self.layer_table.rowCount()):
-            material = self.get_material_from_row(row)
-            d       = float(self.layer_table.item(row, 1).text())
-            nx      = int(float(self.layer_table.item(row, 2).text()))
-            K_val   = float(self.layer_table.item(row, 3).text())
-            C_init  = float(self.layer_table.item(row, 4).text())
-            density = float(self.layer_table.item(row, 5).text())
-            layer = Layer(material, d, nx, K_val, C_init, density=density)       # :contentReference[oaicite:3]{index=3}
-            layer.set_diffusion_coefficient(M_r, T_C, simulation_case=simulation_case)  # :contentReference[oaicite:4]{index=4}
-            layers.append(layer)
-
-        C_values, C_init, total_masses, x, partitioning = run_simulation(layers, t_max, dt)  # :contentReference[oaicite:5]{index=5}&#8203;:contentReference[oaicite:6]{index=6}
-
-        concentration_fig = plot_results(C_values, C_init, x, layers, dt, show=False)
+        if temperature_profile is not None and solver == "modal":
+            self.show_error_message("Das Temperaturprofil ist nur mit Zeitschrittverfahren verfügbar.")
+            return
+        layers = self._build_layers(M_r, T_C, simulation_case, lumped_contact)
 
-        migrated_mass, time_points = calculate_migrated_mass_over_time(
-            C_values, x, layers, dt, calc_interval=1
-        )
-        migrated_mass_by_layer, layer_time_points = calculate_migrated_mass_over_time_by_layer(
-            C_values, x, layers, dt, calc_interval=1
-        )
         threshold = None
         if self.threshold_checkbox.isChecked():
             try:
                 threshold = float(self.threshold_input.text())
             except ValueError:
                 threshold = None
+        # Überschreitungszeitpunkt des Grenzwerts wird innerhalb des Zeitschritts interpoliert
+        threshold_observer = ThresholdObserver(threshold) if threshold is not None else None
+        # Im Verteilungsgleichgewicht werden die restlichen Zeitpunkte ohne weitere Lösungen aufgefüllt
+        equilibrium_observer = EquilibriumObserver()
+        # Negative Konzentrationen deuten auf Oszillationen des Zeitschrittverfahrens hin
+        negative_observer = NegativeConcentrationObserver()
+        observers = [equilibrium_observer, negative_observer]
+        observers += [threshold_observer] if threshold_observer is not None else []
+
+        # Höchstens ~1000 Profile speichern; integriert wird weiterhin mit vollem dt
+        # Der geometrische Zeitplan hat nur wenige Schritte, daher werden dort alle Profile gespeichert
+        snapshot_interval = max(1, int(t_max / dt) // 1000) if time_stepping == "fixed" else None
+        options = dict(
+            solver=solver, snapshots=snapshot_interval, time_stepping=time_stepping, integrator=integrator,
+            startup_steps=2 if integrator == "cn" else 0,  # Rannacher-Start: glatte Profile auch bei großem Δt
+            temperature_profile=temperature_profile, M_r=M_r, simulation_case=simulation_case,
+        )
+        threshold_time = None
+        if self.superposition_checkbox.isChecked():
+            # Einheitsantworten je Schicht werden zwischengespeichert; neue C_init-Werte kosten keine Simulation
+            engine = SuperpositionEngine(layers, t_max, dt, **options)
+            C_init_values = [layer.C_init for layer in layers]
+            C_values, C_init, x, snapshot_times = engine.profiles(C_init_values)
+            if threshold is not None:
+                threshold_time = float(engine.threshold_time(C_init_values, threshold))
+            equilibration_time = np.nan
+            negative = np.nonzero(C_values.min(axis=1) < -negative_observer.rtol * np.abs(C_init).max())[0]
+            negative_time = float(snapshot_times[negative[0]]) if len(negative) else np.nan
+        else:
+            C_values, C_init, total_masses, x, partitioning, snapshot_times = run_simulation(
+                layers, t_max, dt, observers=observers, **options
+            )  # :contentReference[oaicite:5]{index=5}&#8203;:contentReference[oaicite:6]{index=6}
+            if threshold_observer is not None:
+                threshold_time = float(threshold_observer.crossing_times[0])
+                if solver == "modal":
+                    threshold_time = float(time_to_threshold(layers, threshold, t_max, dt, solver="modal")[0])
+            equilibration_time = equilibrium_observer.equilibration_time
+            negative_time = negative_observer.first_time
+
+        concentration_fig = plot_results(C_values, C_init, x, layers, dt, show=False, time_points=snapshot_times)
 
+        migrated_mass, time_points = calculate_migrated_mass_over_time(
+            C_values, x, layers, dt, calc_interval=1, time_points=snapshot_times
+        )
+        migrated_mass_by_layer, layer_time_points = calculate_migrated_mass_over_time_by_layer(
+            C_values, x, layers, dt, calc_interval=1, time_points=snapshot_times
+        )
         migration_fig = plot_migrated_mass_over_time(
             migrated_mass,
             time_points,
             save_path=None,
             show=False,
             threshold=threshold,
+            threshold_time=threshold_time,
         )
         migration_by_layer_fig = plot_migrated_mass_over_time_by_layer(
             migrated_mass_by_layer,
@@ -649,6 +894,9 @@ class MultiLayerTab(QWidget):
             "migration": {
                 "time_points": time_points,
                 "migrated_mass": migrated_mass,
+                "threshold": threshold,
+                "threshold_time": threshold_time,
+                "equilibration_time": equilibration_time,
                 "figure": migration_fig,
             },
             "migration_by_layer": {
@@ -662,6 +910,8 @@ class MultiLayerTab(QWidget):
                 "x": x,
                 "layers": layers,
                 "dt": dt,
+                "time_points": snapshot_times,
+                "negative_time": negative_time,
                 "figure": concentration_fig,
             },
         }
@@ -747,10 +997,22 @@ class MultiLayerTab(QWidget):
             total_d = sum(layer.d for layer in layers) if layers else None
             dt_text = f"{dt:.3g} s" if isinstance(dt, (int, float)) else "-"
             thickness_text = f"{total_d:.3g} cm" if total_d is not None else "-"
+            threshold = data.get("threshold")
+            threshold_time = data.get("threshold_time")
+            threshold_text = ""
+            if threshold is not None:
+                if threshold_time is None or np.isnan(threshold_time):
+                    threshold_text = f"Grenzwert {threshold:.3g} mg/dm² nicht überschritten<br>"
+                else:
+                    threshold_text = f"Grenzwert {threshold:.3g} mg/dm² überschritten nach {threshold_time / 86400.0:.3g} Tagen<br>"
+            equilibration_time = data.get("equilibration_time")
+            if equilibration_time is not None and not np.isnan(equilibration_time):
+                threshold_text += f"Verteilungsgleichgewicht erreicht nach {equilibration_time / 86400.0:.3g} Tagen<br>"
             return (
                 "<b>Zusammenfassung</b><br>"
                 f"Max. Migration: {max_migration:.3g} mg/dm² bei {max_time_days:.3g} Tagen<br>"
                 f"Endwert: {last_migration:.3g} mg/dm² nach {last_time_days:.3g} Tagen<br>"
+                f"{threshold_text}"
                 f"Δt: {dt_text}; Schichten: {len(layers)}; Gesamtstärke: {thickness_text}"
             )
 
@@ -765,10 +1027,17 @@ class MultiLayerTab(QWidget):
             thickness_text = f"{total_d:.3g} cm" if total_d is not None else "-"
             time_text = f"{last_time_days:.3g} Tage" if last_time_days is not None else "-"
             materials = ", ".join([layer.material for layer in layers]) if layers else "-"
+            negative_time = data.get("negative_time")
+            oscillation_text = ""
+            if negative_time is not None and not np.isnan(negative_time):
+                oscillation_text = (
+                    f"<br>Warnung: negative Konzentrationen ab {negative_time / 86400.0:.3g} Tagen – Δt verkleinern"
+                )
             return (
                 "<b>Zusammenfassung</b><br>"
                 f"Schichten: {len(layers)}; Materialien: {materials}<br>"
                 f"Gesamtstärke: {thickness_text}; Simulationsdauer: {time_text}; Δt: {dt_text}"
+                f"{oscillation_text}"
             )
 
         return ""
@@ -856,13 +1125,21 @@ class MultiLayerTab(QWidget):
         x = data.get("x")
         dt = data.get("dt")
         layers = data.get("layers")
+        snapshot_times = data.get("time_points")
         if C_values is None or C_init is None or x is None or dt is None or not layers:
             return
 
-        time_steps = np.linspace(0, len(C_values) - 1, num=10, dtype=int).astype(int)
+        if snapshot_times is not None:
+            # Zeitpunkte können ungleichmäßig verteilt sein → Profile nach Zeit statt nach Index auswählen
+            times = np.asarray(snapshot_times, dtype=float)
+            targets = np.linspace(0, times[-1], num=10)[1:]
+            time_steps = np.unique(np.searchsorted(times, targets).clip(0, len(times) - 1))
+            columns = [(0.0, C_init)] + [(times[t] / 86400.0, C_values[t]) for t in time_steps]
+        else:
+            time_steps = np.linspace(0, len(C_values) - 1, num=10, dtype=int).astype(int)
+            columns = [((t * dt) / 86400.0, C_init if t == 0 else C_values[t]) for t in time_steps]
         headers = ["x [cm]", "Schicht"]
-        for t in time_steps:
-            time_days = (t * dt) / 86400.0
+        for time_days, _ in columns:
             headers.append(f"t={time_days:.3g} d")
 
         # Zuordnung jeder x-Position zur passenden Schicht
@@ -894,11 +1171,8 @@ class MultiLayerTab(QWidget):
                             layer_name = name
                             break
                     row = [pos, layer_name]
-                    for t in time_steps:
-                        if t == 0:
-                            row.append(C_init[idx])
-                        else:
-                            row.append(C_values[t][idx])
+                    for _, profile in columns:
+                        row.append(profile[idx])
                     writer.writerow(row)
         except Exception:
             pass
@@ -139,7 +139,8 @@ def calculate_migration_timestep(D_P, c_t, P_density, F_density, K_PF, t_step, V
 
     return migration_amount
 
-def migrationsmodell_piringer(M_r, T_C, c_P0, Material, P_density, F_density, K_PF, t_max, V_P, V_F, d_P, d_F, A_PF, dt, D_P_known, simulation_case="worst"):
+def migrationsmodell_piringer(M_r, T_C, c_P0, Material, P_density, F_density, K_PF, t_max, V_P, V_F, d_P, d_F, A_PF, dt, D_P_known, simulation_case="worst",
+                              thresholds=None, stop_at_threshold=False):
     """
     Führt die Migration des Migranten im Polymer nach dem Piringer-Modell durch und gibt die Migrationsmenge über die Zeit zurück.
 
@@ -160,9 +161,13 @@ def migrationsmodell_piringer(M_r, T_C, c_P0, Material, P_density, F_density, K_
     dt (float): Zeitschrittgröße [s].
     simulation_case (str): Simulationsfall, entweder 'worst' oder 'best' (Standard ist 'worst').
     D_P_known (float, optional): Optionaler bekannter Diffusionskoeffizient [cm²/s].
+    thresholds (float oder list, optional): Grenzwerte für die Migrationsmenge [mg/dm²].
+    stop_at_threshold (bool, optional): Berechnung beenden, sobald alle Grenzwerte überschritten sind.
 
     Rückgabe:
     list: Liste der Migrationsmengen über die Zeit [mg/dm²].
+    Mit thresholds zusätzlich ein np.ndarray der ersten Überschreitungszeitpunkte je Grenzwert [s]
+    (linear zwischen den Zeitschritten interpoliert, np.nan falls nicht erreicht), d.h. (migration_data, crossing_times).
     """
     material_params = get_material_data(Material, simulation_case)
 
@@ -175,9 +180,24 @@ def migrationsmodell_piringer(M_r, T_C, c_P0, Material, P_density, F_density, K_
     migration_data = []
     current_time = 0
 
+    if thresholds is not None:
+        thresholds = np.atleast_1d(np.asarray(thresholds, dtype=float))
+        crossing_times = np.full(len(thresholds), np.nan)
+
     while current_time < t_max:
         migration_amount = calculate_migration_timestep(D_P, c_P0, P_density, F_density, K_PF, current_time, V_P, V_F, d_P, d_F, A_PF)
         migration_data.append(migration_amount)
+
+        if thresholds is not None and len(migration_data) > 1:
+            # Überschreitung innerhalb des Zeitschritts linear interpolieren (Werte in [mg/dm²], normiert auf 0)
+            m_prev = (migration_data[-2] - migration_data[0]) / 10
+            m_curr = (migration_amount - migration_data[0]) / 10
+            crossed = np.isnan(crossing_times) & (m_prev < thresholds) & (m_curr >= thresholds)
+            if np.any(crossed):
+                crossing_times[crossed] = current_time - dt + (thresholds[crossed] - m_prev) / (m_curr - m_prev) * dt
+            if stop_at_threshold and not np.any(np.isnan(crossing_times)):
+                break
+
         current_time += dt
 
     migration_data = (np.array(migration_data) - migration_data[0]) / 10  # Umrechnung in [mg/dm²] und Normierung auf 0    
@@ -185,10 +205,12 @@ def migrationsmodell_piringer(M_r, T_C, c_P0, Material, P_density, F_density, K_
     # if migration_data.size:
     #     migration_data = migration_data - migration_data[0]
 
+    if thresholds is not None:
+        return migration_data, crossing_times
     return migration_data
 
 
-def migrationsmodell_piringer_with_temp_profile(M_r, c_P0, Material, P_density, F_density, K_PF, t_max, V_P, V_F, d_P, d_F, A_PF, dt, simulation_case="worst"):
+def migrationsmodell_piringer_with_temp_profile(M_r, c_P0, Material, P_density, F_density, K_PF, t_max, V_P, V_F, d_P, d_F, A_PF, dt, simulation_case="worst", temperature_profile=None):
     """
     Simuliert die Migration unter einem variablen Temperaturprofil nach dem Piringer-Modell.
 
@@ -207,18 +229,21 @@ def migrationsmodell_piringer_with_temp_profile(M_r, c_P0, Material, P_density,
     A_PF (float): Kontaktfläche zwischen Polymer und Fluid [dm²].
     dt (float): Zeitschrittgröße [s].
     simulation_case (str): Simulationsfall, entweder 'worst' oder 'best' (Standard ist 'worst').
+    temperature_profile (list, optional): Abschnitte (Beginn [s], Ende [s], T_C [°C]); Standard ist das bisherige
+        Profil 40 °C / 20 °C / 40 °C mit Wechseln nach 10 und 20 Tagen.
 
     Rückgabe:
     list: Liste der Migrationsmengen über die Zeit [mg/dm²] bei variierendem Temperaturprofil.
     """
     material_params = get_material_data(Material, simulation_case)
 
-    # Define the temperature profile sections (converted to seconds)
-    temperature_profile = [
-        (0, 864000, 40),     # Day 1-10, temperature = 10°C
-        (864000, 1728000, 20),  # Day 10-20, temperature = 30°C
-        (1728000, t_max, 40)  # Day 20+, temperature = 20°C
-    ]
+    if temperature_profile is None:
+        # Define the temperature profile sections (converted to seconds)
+        temperature_profile = [
+            (0, 864000, 40),     # Day 1-10, temperature = 10°C
+            (864000, 1728000, 20),  # Day 10-20, temperature = 30°C
+            (1728000, t_max, 40)  # Day 20+, temperature = 20°C
+        ]
 
     migration_data = []
     current_time = 0
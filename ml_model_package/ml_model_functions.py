@@ -3,10 +3,20 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import os
+import copy
+import json
+from time import perf_counter
+from scipy import sparse
+from scipy.linalg import solve_banded, svd
+from scipy.linalg.lapack import dgttrf, dgttrs
+from scipy.optimize import brentq
+from scipy.sparse.linalg import expm_multiply
+from collections import OrderedDict
 from datetime import datetime
+from matplotlib.patches import Patch
 
 class Layer:
-    def __init__(self, material, d, nx, K_value=1.0, C_init=0.0, density=1.0, D=None):
+    def __init__(self, material, d, nx, K_value=1.0, C_init=0.0, density=1.0, D=None, dx_edge=None, lumped=False):
         """
         Initialisiert ein Layer-Objekt, das eine einzelne Schicht des Simulationsmodells repräsentiert.
 
@@ -18,9 +28,16 @@ class Layer:
             C_init (float): Anfangskonzentration in der Schicht in mg/kg (Standardwert: 0.0).
             density (float): Dichte des Materials in g/cm³ (Standardwert: 1.0).
             D (float, optional): Diffusionskoeffizient der Schicht in cm²/s, falls explizit angegeben. Ansonsten wird er über die Piringer Gleichung berechnet.
+            dx_edge (float, optional): Gitterabstand an beiden Schichträndern (Grenzflächen bzw. Kontakt zum Füllgut) in cm.
+                Die Gitterpunkte werden dann zu den Rändern hin verdichtet und im Inneren vergröbert (siehe layer_nodes);
+                None ergibt ein äquidistantes Gitter.
+            lumped (bool, optional): Nur für die letzte Schicht (Kontaktphase): ideal durchmischte Kontaktphase, die als
+                ein einziger Knoten mit der Konzentration C_F beschrieben wird (nx wird auf 1 gesetzt, D wird nicht verwendet).
+                Der Knoten steht über K, Volumen (Dicke) und Dichte mit dem letzten Polymerknoten im Gleichgewicht
+                (siehe lumped_contact_parameters).
 
         Methoden:
-            set_diffusion_coefficient(M_r, T_C): Berechnet und setzt den Diffusionskoeffizienten nach Piringer basierend auf der relativen Molekülmasse des Migranten und der Temperatur.
+            set_diffusion_coefficient(M_r, T_C, simulation_case): Berechnet und setzt den Diffusionskoeffizienten nach Piringer basierend auf der relativen Molekülmasse des Migranten, der Temperatur und dem Simulationsfall.
         """
 
         self.material = material
@@ -30,37 +47,43 @@ class Layer:
         self.C_init = C_init
         self.density = density
         self.D = D  # Falls kein Diffusionskoeffizient übergeben wurde, wird er mit der Piringer Gleichung berechnet
+        self.dx_edge = dx_edge
+        self.lumped = lumped
+        if lumped:
+            self.nx = 1
 
-    def set_diffusion_coefficient(self, M_r, T_C):
+    def set_diffusion_coefficient(self, M_r, T_C, simulation_case="worst"):
         """
         Berechnet und setzt den Diffusionskoeffizienten für die Schicht, falls nicht manuell angegeben.
         
         Parameter:
             M_r (float): rel. Molekülmasse des Migranten [g/mol].
             T_C (float): Temperatur [°C].
+            simulation_case (str): Simulationsfall ('worst' oder 'best').
         """
         if self.D is None: 
             if self.material == 'Kontaktphase':
                 self.D = 1e-2  # Nach EU-Verordnung für durchmischte Kontaktphase
             else:
-                material_params = get_material_data(self.material)
+                material_params = get_material_data(self.material, simulation_case)
                 self.D = diffusion_coefficient_Piringer(M_r, T_C, material_params)
 
-def get_material_data(material):
+def get_material_data(material, simulation_case="worst"):
     """
     Gibt die materialbezogenen Parameter für die Berechnung des Diffusionskoeffizienten zurück.
 
     Parameter:
         material (str): Name des Materials.
+        simulation_case (str): Simulationsfall, entweder 'worst' (Standard) oder 'best'.
 
     Rückgabe:
         dict: Ein Dictionary, das die Parameter 'A_Pt' und 'tau' für das angegebene Material enthält.
 
     Raises:
-        ValueError: Wenn das angegebene Material nicht in der Liste der bekannten Materialien enthalten ist.
+        ValueError: Wenn das Material oder der Simulationsfall unbekannt ist.
     """
 
-    material_parameters = {
+    material_parameters_worst_case = {
         "LDPE": {"A_Pt": 11.7, "tau": 0},
         "LLDPE": {"A_Pt": 9.8, "tau": 0}, # für Validierung
         "HDPE": {"A_Pt": 13.2, "tau": 1577},
@@ -71,10 +94,25 @@ def get_material_data(material):
         "HIPS": {"A_Pt": 0.1, "tau": 0}
     }
 
-    if material in material_parameters:
-        return material_parameters[material]
-    else:
-        raise ValueError(f"Unbekanntes Material: {material}")
+    material_parameters_best_case = {
+        "LDPE": {"A_Pt": 10.0, "tau": 0},
+        "LLDPE": {"A_Pt": 9.8, "tau": 0},
+        "HDPE": {"A_Pt": 10.0, "tau": 1577},
+        "PP": {"A_Pt": 9.4, "tau": 1577},
+        "PET": {"A_Pt": 2.2, "tau": 1577},
+        "PS": {"A_Pt": -2.8, "tau": 0},
+        "PEN": {"A_Pt": -0.34, "tau": 1577},
+        "HIPS": {"A_Pt": -2.7, "tau": 0}
+    }
+
+    if simulation_case == "worst":
+        if material in material_parameters_worst_case:
+            return material_parameters_worst_case[material]
+    elif simulation_case == "best":
+        if material in material_parameters_best_case:
+            return material_parameters_best_case[material]
+
+    raise ValueError("Unbekanntes Material oder Simulation Case")
 
 def diffusion_coefficient_Piringer(M_r, T_C, material_params):
     """
@@ -107,6 +145,59 @@ def diffusion_coefficient_Piringer(M_r, T_C, material_params):
 
     return D_P
 
+def layer_nodes(d, nx, dx_edge=None):
+    """
+    Berechnet die Lage der Gitterpunkte innerhalb einer Schicht.
+
+    Parameter:
+        d (float): Dicke der Schicht in cm.
+        nx (int): Anzahl der Gitterpunkte in der Schicht.
+        dx_edge (float, optional): Gitterabstand an beiden Rändern der Schicht in cm. Die Punkte folgen
+            x = d/2 * (1 + tanh(s * (xi - 1/2)) / tanh(s / 2)) mit äquidistantem xi in [0, 1]; die Streckung s
+            wird so bestimmt, dass der erste und letzte Abstand dx_edge beträgt.
+
+    Rückgabe:
+        np.ndarray: Lokale Koordinaten der Gitterpunkte von 0 bis d.
+
+    Raises:
+        ValueError: Wenn dx_edge größer als der äquidistante Abstand d / (nx - 1) ist.
+    """
+    xi = np.linspace(0, 1, nx, endpoint=True)
+    if dx_edge is None or np.isclose(dx_edge, d / (nx - 1)):
+        return xi * d
+    if dx_edge > d / (nx - 1):
+        raise ValueError("dx_edge muss kleiner als der äquidistante Gitterabstand d / (nx - 1) sein.")
+
+    def first_spacing(s):
+        return d / 2 * (1 + np.tanh(s * (xi[1] - 0.5)) / np.tanh(s / 2)) - dx_edge
+
+    s = brentq(first_spacing, 1e-6, 200.0)
+    x = d / 2 * (1 + np.tanh(s * (xi - 0.5)) / np.tanh(s / 2))
+    x[0], x[-1] = 0.0, d
+    return x
+
+def graded_node_count(d, dx_edge, dx_max):
+    """
+    Schätzt die Anzahl der Gitterpunkte für eine Schicht mit Randabstand dx_edge und größtem Abstand dx_max.
+
+    Parameter:
+        d (float): Dicke der Schicht in cm.
+        dx_edge (float): Gitterabstand an den Schichträndern in cm.
+        dx_max (float): Angestrebter größter Gitterabstand in der Schichtmitte in cm.
+
+    Rückgabe:
+        int: Anzahl der Gitterpunkte nx für layer_nodes (mindestens 3).
+
+    Hinweise:
+        - Für die tanh-Verteilung gilt näherungsweise dx_max / dx_edge = cosh²(s / 2); daraus und aus dem
+          mittleren Abstand ergibt sich nx. Mit dx_max = dx_edge entspricht das Ergebnis d / dx_edge + 1.
+    """
+    s = 2 * np.arccosh(np.sqrt(max(dx_max / dx_edge, 1.0)))
+    if s == 0:
+        return max(3, int(round(d / dx_edge)) + 1)
+    mean_spacing = dx_edge * np.sinh(s) / s
+    return max(3, int(round(d / mean_spacing)) + 1)
+
 def initialize_grid(layers):
     """
     Initialisiert das räumliche Gitter basierend auf den Schichten im Modell.
@@ -126,12 +217,54 @@ def initialize_grid(layers):
 
         x_start = sum(l.d for l in layers[:i])
         x_end = x_start + d
-        x_layer = np.linspace(x_start, x_end, nx, endpoint=True)
+        if getattr(layer, "dx_edge", None):
+            x_layer = x_start + layer_nodes(d, nx, layer.dx_edge)
+        else:
+            x_layer = np.linspace(x_start, x_end, nx, endpoint=True)
         x.append(x_layer)
 
     x = np.concatenate(x)
     return x
 
+def lumped_contact_parameters(layers):
+    """
+    Liefert die Kenngrößen einer ideal durchmischten Kontaktphase (letzte Schicht mit lumped=True).
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+
+    Rückgabe:
+        tuple oder None: (K, h, capacity, gamma) oder None, wenn die Kontaktphase als Schicht aufgelöst ist.
+            - K: Verteilungskoeffizient der letzten Polymerschicht, C_Polymer = K * C_F.
+            - h: Letzter Gitterabstand der Polymerschicht [cm].
+            - capacity: Kapazität des Kontrollvolumens aus halber Randzelle und Kontaktphase, rho_P * h * K / 2 + rho_F * d_F.
+            - gamma: Rate [1/s] in dC_L/dt = gamma * (C_(L-1) - C_L) für den letzten Polymerknoten C_L.
+
+    Raises:
+        ValueError: Wenn eine andere als die letzte Schicht lumped ist oder keine Polymerschicht vorhanden ist.
+
+    Hinweise:
+        - Der letzte Polymerknoten und die Kontaktphase bilden ein gemeinsames Kontrollvolumen, in dem C_L = K * C_F
+          jederzeit gilt; die einzige Kopplung ist der Fluss rho_P * D * (C_(L-1) - C_L) / h aus dem Polymer.
+        - Damit entfällt der steife Block der aufgelösten Kontaktphase (D = 1e-2 cm²/s).
+    """
+    if any(getattr(layer, "lumped", False) for layer in layers[:-1]):
+        raise ValueError("Nur die letzte Schicht (Kontaktphase) kann als ideal durchmischt behandelt werden.")
+    if not getattr(layers[-1], "lumped", False):
+        return None
+    if len(layers) < 2:
+        raise ValueError("Eine ideal durchmischte Kontaktphase benötigt mindestens eine Polymerschicht.")
+
+    polymer, contact = layers[-2], layers[-1]
+    K = polymer.K_value if polymer.K_value is not None else 1.0
+    if getattr(polymer, "dx_edge", None):
+        h = np.diff(layer_nodes(polymer.d, polymer.nx, polymer.dx_edge))[-1]
+    else:
+        h = polymer.d / (polymer.nx - 1)
+    capacity = polymer.density * h * K / 2 + contact.density * contact.d
+    gamma = K * polymer.density * polymer.D / (h * capacity) if polymer.D is not None else None
+    return K, h, capacity, gamma
+
 def initialize_concentration(layers, x):
     """
     Initialisiert die Konzentrationsprofile über das gesamte Gitter basierend auf den Anfangskonzentrationen der Schichten.
@@ -144,6 +277,10 @@ def initialize_concentration(layers, x):
         tuple: Ein Tuple aus zwei Arrays: 
             - Das initiale Konzentrationsprofil (C_init)
             - Eine Kopie des initialen Konzentrationsprofils, welches für die weitere Berechnung verwendet wird
+
+    Hinweise:
+        - Bei ideal durchmischter Kontaktphase werden der letzte Polymerknoten und die Kontaktphase massenerhaltend
+          auf C_L = K * C_F ausgeglichen (siehe lumped_contact_parameters).
     """
 
     Nx = sum(layer.nx for layer in layers)
@@ -155,23 +292,174 @@ def initialize_concentration(layers, x):
         C_init[start_idx:end_idx] = layer.C_init
         start_idx = end_idx
 
+    equilibrate_lumped_contact(layers, C_init)
     return C_init.copy(), C_init
 
-def initialize_matrices(layers, dt):
+def equilibrate_lumped_contact(layers, C):
     """
-    Initialisiert die Koeffizientenmatrizen A und B für das Crank-Nicolson-Verfahren, das zur Lösung der Diffusionsgleichung verwendet wird.
+    Setzt bei ideal durchmischter Kontaktphase den letzten Polymerknoten und die Kontaktphase massenerhaltend
+    ins Gleichgewicht C_L = K * C_F (in place); ohne ideal durchmischte Kontaktphase ohne Wirkung.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+        C (np.ndarray): Konzentrationsprofil, wird verändert.
+    """
+    lumped = lumped_contact_parameters(layers)
+    if lumped is not None:
+        # Randzelle des Polymers und Kontaktphase sofort ins Gleichgewicht setzen (massenerhaltend)
+        K, h, capacity, _ = lumped
+        mass = layers[-2].density * h / 2 * C[-2] + layers[-1].density * layers[-1].d * C[-1]
+        C[-1] = mass / capacity
+        C[-2] = K * C[-1]
+
+def assemble_tridiagonal_bands(layers, dt):
+    """
+    Baut die Crank-Nicolson-Matrizen A und B direkt als Diagonalen auf (vektorisiert, Speicherbedarf O(Nx)).
 
     Parameter:
         layers (list von Layer): Liste der Schichtenobjekte.
         dt (float): Zeitschrittgröße.
 
     Rückgabe:
-        tuple: Zwei Matrizen (A, B) für das Crank-Nicolson-Verfahren.
+        tuple: Zwei Tupel (A_bands, B_bands) mit jeweils (untere Nebendiagonale, Hauptdiagonale, obere Nebendiagonale).
+
+    Hinweise:
+        - Liefert dieselben Koeffizienten wie initialize_matrices(..., assembly="dense").
+        - Die Zeilen der Ränder (No-Flux) und der Schnittstellen (theta/phi/K) werden nach dem Aufbau überschrieben.
+        - Für Schichten mit dx_edge (nicht äquidistantes Gitter) wird der Drei-Punkte-Stern mit variablen Abständen
+          h- und h+ verwendet; Rand- und Schnittstellenzeilen nutzen den jeweils angrenzenden Gitterabstand.
+          Grenzt eine Schicht mit dx_edge an eine Schnittstelle, müssen die Abstände beiderseits übereinstimmen
+          (gleiches dx_edge bzw. dx_edge = d/(nx-1) der Nachbarschicht), da die Schnittstellenzeilen nur mit den
+          Diffusionskoeffizienten gewichten; andernfalls wird ein ValueError ausgelöst.
+        - Bei ideal durchmischter Kontaktphase beschreibt die Zeile des letzten Polymerknotens das gemeinsame
+          Kontrollvolumen mit der Kontaktphase; die letzte Zeile ist die algebraische Bedingung C_F = C_L / K.
+
+    Raises:
+        ValueError: Wenn die Gitterabstände an einer Schnittstelle mit einer Schicht mit dx_edge nicht übereinstimmen.
+    """
+    D = np.array([layer.D for layer in layers], dtype=float)
+    nx = np.array([layer.nx for layer in layers])
+    d = np.array([layer.d for layer in layers], dtype=float)
+
+    dx = d / np.maximum(nx - 1, 1)
+    alphas = D * dt / (2 * dx**2)
+
+    # Alpha-Werte für jeden Gitterpunkt (links/rechts getrennt für nicht äquidistante Gitter)
+    alpha_lo = np.repeat(alphas, nx)
+    alpha_up = alpha_lo.copy()
+    alpha_first = alphas.copy()  # Alpha mit dem ersten Gitterabstand der Schicht
+    alpha_last = alphas.copy()   # Alpha mit dem letzten Gitterabstand der Schicht
+    h_first, h_last = dx.copy(), dx.copy()
+    start_idx = 0
+    for i, layer in enumerate(layers):
+        end_idx = start_idx + layer.nx
+        if getattr(layer, "dx_edge", None):
+            h = np.diff(layer_nodes(layer.d, layer.nx, layer.dx_edge))
+            h_minus, h_plus = h[:-1], h[1:]
+            alpha_lo[start_idx + 1:end_idx - 1] = D[i] * dt / (h_minus * (h_minus + h_plus))
+            alpha_up[start_idx + 1:end_idx - 1] = D[i] * dt / (h_plus * (h_minus + h_plus))
+            alpha_first[i] = D[i] * dt / (2 * h[0]**2)
+            alpha_last[i] = D[i] * dt / (2 * h[-1]**2)
+            h_first[i], h_last[i] = h[0], h[-1]
+        start_idx = end_idx
+
+    # Innere Punkte aller Schichten per Broadcasting
+    A_diag = 1 + (alpha_lo + alpha_up)
+    A_lower = -alpha_lo[1:]
+    A_upper = -alpha_up[:-1]
+    B_diag = 1 - (alpha_lo + alpha_up)
+    B_lower = alpha_lo[1:].copy()
+    B_upper = alpha_up[:-1].copy()
+
+    # Randbedingung an den äußeren Rändern (No-Flux-BC)
+    A_diag[0] = 1 + 2 * alpha_first[0]
+    A_upper[0] = -2 * alpha_first[0]
+    B_diag[0] = 1 - 2 * alpha_first[0]
+    B_upper[0] = 2 * alpha_first[0]
+    A_diag[-1] = 1 + 2 * alpha_last[-1]
+    A_lower[-1] = -2 * alpha_last[-1]
+    B_diag[-1] = 1 - 2 * alpha_last[-1]
+    B_lower[-1] = 2 * alpha_last[-1]
+
+    # Partitionierungsbedingungen und Flusskontinuität an den Schnittstellen
+    lumped = lumped_contact_parameters(layers)
+    interface_idx = np.cumsum(nx)[:-1]
+    if lumped is not None:
+        interface_idx = interface_idx[:-1]
+    for i, idx in enumerate(interface_idx, start=1):
+        D1, D2 = D[i-1], D[i]
+        alpha1, alpha2 = alpha_last[i-1], alpha_first[i]
+        if (layers[i-1].dx_edge or layers[i].dx_edge) and not np.isclose(h_last[i-1], h_first[i], rtol=1e-6):
+            raise ValueError(
+                f"Die Gitterabstände an der Schnittstelle zwischen Schicht {i} ({layers[i-1].material}, "
+                f"{h_last[i-1]:.4g} cm) und Schicht {i + 1} ({layers[i].material}, {h_first[i]:.4g} cm) stimmen "
+                f"nicht überein; dx_edge beider Schichten angleichen."
+            )
+        K = layers[i-1].K_value if layers[i-1].K_value is not None else 1.0
+
+        theta = D1 / (D1 + D2)
+        phi = D2 / (D1 + D2)
+
+        # "Linke Seite" der Grenzfläche (Zeile idx-1)
+        A_lower[idx-2] = -alpha1
+        A_diag[idx-1] = 1 + 2 * alpha1 - theta * alpha1 + phi * alpha1
+        A_upper[idx-1] = -2 * alpha1 * phi * K
+        B_lower[idx-2] = alpha1
+        B_diag[idx-1] = 1 - 2 * alpha1 + theta * alpha1 - phi * alpha1
+        B_upper[idx-1] = 2 * alpha1 * phi * K
+
+        # "Rechte Seite" der Grenzfläche (Zeile idx)
+        A_lower[idx-1] = -2 * alpha2 * theta / K
+        A_diag[idx] = 1 + 2 * alpha2 - phi * alpha2 + theta * alpha2
+        A_upper[idx] = -alpha2
+        B_lower[idx-1] = 2 * alpha2 * theta / K
+        B_diag[idx] = 1 - 2 * alpha2 + phi * alpha2 - theta * alpha2
+        B_upper[idx] = alpha2
+
+    if lumped is not None:
+        K, _, _, gamma = lumped
+        a = gamma * dt / 2
+
+        # Letzter Polymerknoten: gemeinsames Kontrollvolumen mit der Kontaktphase
+        A_lower[-2], A_diag[-2], A_upper[-1] = -a, 1 + a, 0.0
+        B_lower[-2], B_diag[-2], B_upper[-1] = a, 1 - a, 0.0
+
+        # Kontaktphase: C_F = C_L / K
+        A_lower[-1], A_diag[-1] = -1 / K, 1.0
+        B_lower[-1], B_diag[-1] = 0.0, 0.0
+
+    return (A_lower, A_diag, A_upper), (B_lower, B_diag, B_upper)
+
+def initialize_matrices(layers, tabler, assembly="dense"):
+    """
+    Initialisiert die Koeffizientenmatrizen A und B für das Crank-Nicolson-Verfahren, das zur Lösung der Diffusionsgleichung verwendet wird.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+        tabler (float): Zeitschrittgröße.
+        assembly (str, optional): 'dense' (Standard) füllt volle Nx×Nx-Matrizen,
+            'banded' liefert nur die drei Diagonalen (siehe assemble_tridiagonal_bands),
+            'sparse' liefert scipy.sparse-CSR-Matrizen.
+
+    Rückgabe:
+        tuple: Zwei Matrizen (A, B) für das Crank-Nicolson-Verfahren (bzw. deren Diagonalen bei assembly='banded').
 
     Hinweise:
         - Berücksichtigt die Randbedingungen (No-Flux) und die Übergangsbedingung (Flux-continuity) an den Schichtgrenzen.
     """
 
+    if assembly == "banded":
+        return assemble_tridiagonal_bands(layers, tabler)
+    if assembly == "sparse":
+        A_bands, B_bands = assemble_tridiagonal_bands(layers, tabler)
+        return bands_to_sparse(A_bands), bands_to_sparse(B_bands)
+    if assembly != "dense":
+        raise ValueError(f"Unbekannter Assemblierungsmodus: {assembly}")
+    if any(getattr(layer, "dx_edge", None) or getattr(layer, "lumped", False) for layer in layers):
+        # Nicht äquidistante Gitter und ideal durchmischte Kontaktphase werden nur über die Diagonalen aufgebaut
+        A_bands, B_bands = assemble_tridiagonal_bands(layers, tabler)
+        return bands_to_sparse(A_bands).toarray(), bands_to_sparse(B_bands).toarray()
+
     D = [layer.D for layer in layers]
     nx = [layer.nx for layer in layers]
     d = [layer.d for layer in layers]
@@ -194,7 +482,7 @@ def initialize_matrices(layers, dt):
     B = np.zeros((Nx, Nx))
     
     # Definiere Alpha-Werte für jede Schicht
-    alphas = [D[i] * dt / (2 * dx[i]**2) for i in range(len(D))]
+    alphas = [D[i] * tabler / (2 * dx[i]**2) for i in range(len(D))]
     
     # Auffüllen der Matrizen A und B
     start_idx = 0
@@ -279,6 +567,108 @@ def solve_timestep(A, B, C_current):
 
     return C_new
 
+def extract_tridiagonal(M):
+    """
+    Extrahiert die drei Diagonalen einer tridiagonalen Matrix.
+
+    Parameter:
+        M (np.ndarray): Quadratische Matrix (z.B. A oder B aus initialize_matrices).
+
+    Rückgabe:
+        tuple: (untere Nebendiagonale, Hauptdiagonale, obere Nebendiagonale) als np.ndarray.
+    """
+    return np.diagonal(M, -1).copy(), np.diagonal(M).copy(), np.diagonal(M, 1).copy()
+
+def bands_to_sparse(bands):
+    """
+    Wandelt die Diagonalen einer tridiagonalen Matrix in eine scipy.sparse-CSR-Matrix um.
+
+    Parameter:
+        bands (tuple): Diagonalen (unten, Haupt, oben).
+
+    Rückgabe:
+        scipy.sparse.csr_matrix: Dünnbesetzte Matrix.
+    """
+    lower, diag, upper = bands
+    return sparse.diags([lower, diag, upper], [-1, 0, 1], format="csr")
+
+def factorize_tridiagonal(A_bands):
+    """
+    Berechnet die LU-Zerlegung einer tridiagonalen Matrix (LAPACK gttrf).
+
+    Die Zerlegung wird einmal pro Simulation berechnet und danach in jedem Zeitschritt wiederverwendet.
+
+    Parameter:
+        A_bands (tuple): Diagonalen (unten, Haupt, oben) der Matrix A.
+
+    Rückgabe:
+        tuple: Faktoren (dl, d, du, du2, ipiv) für solve_timestep_banded.
+
+    Raises:
+        ValueError: Wenn die Matrix singulär ist.
+    """
+    dl, d, du = A_bands
+    dl, d, du, du2, ipiv, info = dgttrf(dl, d, du)
+    if info != 0:
+        raise ValueError(f"Tridiagonale Zerlegung fehlgeschlagen (info={info})")
+    return dl, d, du, du2, ipiv
+
+def apply_tridiagonal(bands, C):
+    """
+    Berechnet das Produkt einer tridiagonalen Matrix mit einem Vektor in O(Nx).
+
+    Parameter:
+        bands (tuple): Diagonalen (unten, Haupt, oben) der Matrix.
+        C (np.ndarray): Konzentrationsarray (oder Matrix mit einer Spalte je rechter Seite).
+
+    Rückgabe:
+        np.ndarray: Ergebnis des Matrix-Vektor-Produkts.
+    """
+    lower, diag, upper = bands
+    if C.ndim > 1:
+        lower, diag, upper = lower[:, None], diag[:, None], upper[:, None]
+    b = diag * C
+    b[:-1] += upper * C[1:]
+    b[1:] += lower * C[:-1]
+    return b
+
+def solve_timestep_banded(A_lu, B_bands, C_current):
+    """
+    Löst das lineare Gleichungssystem für den aktuellen Zeitschritt mit vorab zerlegter tridiagonaler Matrix A.
+
+    Parameter:
+        A_lu (tuple): LU-Zerlegung von A aus factorize_tridiagonal.
+        B_bands (tuple): Diagonalen (unten, Haupt, oben) der Matrix B.
+        C_current (np.ndarray): Konzentrationsarray zum aktuellen Zeitpunkt.
+
+    Rückgabe:
+        np.ndarray: Aktualisiertes Konzentrationsarray für den nächsten Zeitschritt.
+    """
+    # Rechte Seite des Gleichungssystems berechnen (O(Nx))
+    b = apply_tridiagonal(B_bands, C_current)
+
+    # Lineares Gleichungssystem mit der vorhandenen Zerlegung lösen (O(Nx))
+    return solve_factorized(A_lu, b)
+
+def solve_factorized(A_lu, b):
+    """
+    Löst A x = b mit der LU-Zerlegung aus factorize_tridiagonal (LAPACK gttrs) in O(Nx).
+
+    Parameter:
+        A_lu (tuple): LU-Zerlegung von A aus factorize_tridiagonal.
+        b (np.ndarray): Rechte Seite (oder Matrix mit einer Spalte je rechter Seite).
+
+    Rückgabe:
+        np.ndarray: Lösung x.
+
+    Raises:
+        ValueError: Wenn LAPACK einen Fehler meldet (info != 0).
+    """
+    x, info = dgttrs(*A_lu, b)
+    if info != 0:
+        raise ValueError(f"Tridiagonale Lösung fehlgeschlagen (info={info})")
+    return x
+
 def check_partitioning(layers, C_values):
     """
     Überprüft die Partitionierungsbedingungen an den Schnittstellen zwischen den Schichten.
@@ -320,226 +710,2572 @@ def check_partitioning(layers, C_values):
     
     return partitioning_checks
 
-def run_simulation(layers, t_max, dt):
+def trapezoid_weights(x, start_idx, end_idx):
     """
-    Führt die Simulation über die angegebene Zeit durch und gibt die relevanten Daten zurück.
+    Berechnet Gewichte, mit denen das Trapezintegral eines Abschnitts als Skalarprodukt ausgewertet werden kann.
 
     Parameter:
-        layers (list von Layer): Liste der Schichtenobjekte.
-        t_max (float): Gesamte Simulationszeit in Sekunden.
-        dt (float): Zeitschrittgröße in Sekunden.
+        x (np.ndarray): Räumliches Gitter.
+        start_idx (int): Erster Index des Abschnitts.
+        end_idx (int): Index hinter dem letzten Punkt des Abschnitts.
 
     Rückgabe:
-        tuple: 
-            - C_values: Liste der Konzentrationsprofile zu verschiedenen Zeitpunkten.
-            - C_init: Initiales Konzentrationsprofil.
-            - total_masses: Liste der Gesamtmassen zu verschiedenen Zeitpunkten.
-            - x: Das räumliche Gitter.
-            - partitioning_checks: Überprüfung der Partitionierungsverhältnisse an den Schichtgrenzen.
+        np.ndarray: Gewichtsvektor w der Länge Nx mit w @ C == np.trapz(C[start_idx:end_idx], x[start_idx:end_idx]).
     """
-    
-    x = initialize_grid(layers)
-    C_current, C_init = initialize_concentration(layers, x)
-    A, B = initialize_matrices(layers, dt)
-
-    Nt = int(t_max / dt)
-    total_masses = []
-    C_values = []
-    
-    # Für Partitionierungsüberprüfungen
-    partitioning_checks = []
-
-    # Zeitschleife über Migrationszeit
-    for n in range(Nt):
-        C_new = solve_timestep(A, B, C_current)
-        C_current = C_new
-        C_values.append(C_current.copy())
-
-        total_mass = np.trapz(C_current, x)
-        total_masses.append(total_mass)
-
-    partitioning_checks = check_partitioning(layers, C_values)
+    w = np.zeros(len(x))
+    h = np.diff(x[start_idx:end_idx])
+    w[start_idx:end_idx - 1] += h / 2
+    w[start_idx + 1:end_idx] += h / 2
+    return w
 
-    return C_values, C_init, total_masses, x, partitioning_checks
-
-def calculate_migrated_mass_over_time(C_values, x, layers, dt, calc_interval):
+def layer_mass_weights(layers, x):
     """
-    Berechnet die migrierte Masse im letzten Layer über die Zeit.
-    
+    Stellt die Gewichtsmatrix für die spez. Migrationsmenge [mg/dm²] je Schicht auf.
+
     Parameter:
-        C_values (list von np.ndarray): Konzentrationsprofile über die Zeit.
-        x (np.ndarray): Räumliches Gitter.
         layers (list von Layer): Liste der Schichtobjekte.
-        dt (float): Zeitschrittgröße [s].
-        calc_interval (int): Intervall der Berechnung.
+        x (np.ndarray): Räumliches Gitter.
 
     Rückgabe:
-        migrated_mass_over_time (np.ndarray): Liste der migrierten Massen über die Zeit.
-        time_points (list): Liste der Zeitpunkte [s].
+        np.ndarray: Matrix der Form (Anzahl Schichten, Nx); W @ C liefert die Masse je Schicht.
     """
-    # Extrahiere den letzten Layer
-    last_layer = layers[-1]
-    nx_last = last_layer.nx
-    density_last = last_layer.density
-    
-    # Bestimme den Start- und Endindex für den letzten Layer im Gitter
-    start_idx = sum([layer.nx for layer in layers[:-1]])
-    end_idx = start_idx + nx_last
-    
-    # Extrahiere die räumlichen Koordinaten des letzten Layers
-    x_last_layer = x[start_idx:end_idx]
-    
-    # Speichert die migrierte Masse über die Zeit
-    concentration_integrals_over_time = []
-    
-    # Speichert die entsprechenden Zeitpunkte
-    time_points = []
-    
-    # Schleife über die gespeicherten Konzentrationsprofile in C_values mit dem angegebenen Intervall
-    for i in range(0, len(C_values), calc_interval):
-        # Extrahiere das Konzentrationsprofil im letzten Layer zu jedem Zeitschritt
-        C_last_layer = C_values[i][start_idx:end_idx]
-        
-        # Berechne die migrierte Masse mittels der Trapezregel
-        concentration_integral_last_layer = np.trapz(C_last_layer, x_last_layer)
-        
-        # Speichere die migrierte Masse für den aktuellen Zeitschritt
-        concentration_integrals_over_time.append(concentration_integral_last_layer)
-        
-        # Berechne und speichere die entsprechende Zeit in Sekunden
-        time_points.append(i * dt)
-        
-    migrated_mass_over_time = np.array(concentration_integrals_over_time) * (density_last / 10)
-    
-    return migrated_mass_over_time, time_points
+    W = np.zeros((len(layers), len(x)))
+    start_idx = 0
+    for i, layer in enumerate(layers):
+        end_idx = start_idx + layer.nx
+        if getattr(layer, "lumped", False):
+            W[i, start_idx] = layer.d * (layer.density / 10)  # Ideal durchmischt: C_F * d_F
+        else:
+            W[i] = trapezoid_weights(x, start_idx, end_idx) * (layer.density / 10)
+        start_idx = end_idx
+    return W
 
-def plot_results(C_values, C_init, x, layers, dt, log_scale=False, steps_to_plot=10, save_path=None):
-    """
-    Erstellt einen Plot der Konzentrationsprofile zu verschiedenen Zeitpunkten während der Simulation.
+class SimulationObserver:
+    def __init__(self, every=1, steps=None):
+        """
+        Basisklasse für Beobachter, die während run_simulation Kenngrößen je Zeitschritt in vorab allokierte Arrays schreiben.
 
-    Parameter:
-        C_values (list von np.ndarray): Liste der Konzentrationsprofile zu verschiedenen Zeitpunkten.
-        C_init (np.ndarray): Initiales Konzentrationsprofil.
-        x (np.ndarray): Räumliches Gitter.
-        layers (list von Layer): Liste der Schichtenobjekte.
-        dt (float): Zeitschrittgröße in Sekunden.
-        log_scale (bool, optional): Ob die Zeitschritte auf logarithmischer Skala gewählt werden sollen.
-        steps_to_plot (int, optional): Anzahl der zu plottenden Zeitschritte.
-        save_path (str, optional): Dateipfad zum Speichern des Plots.
-    """
-    
-    def get_time_label(t, dt):
-        time_in_seconds = t * dt
-        
-        if time_in_seconds < 3600:  # Weniger als 1 Stunde
-            time_label = f't={time_in_seconds:.0f} s'
-        elif time_in_seconds < 3600 * 24:  # Weniger als 24 Stunden
-            time_label = f't={time_in_seconds / 3600:.1f} h'
-        else:  # Mehr als 24 Stunden
-            time_label = f't={time_in_seconds / (3600 * 24):.1f} d'
-        
-        return time_label
-    
-    Nt = len(C_values)
-    # Bestimmen der Zeitpunkte zum Plotten (logarithmisch oder linear)
-    if log_scale:
-        time_steps_to_plot = np.unique(np.logspace(0, np.log10(Nt-1), num=steps_to_plot, dtype=int))
-        time_steps_to_plot = np.insert(time_steps_to_plot, 0, 0)
-    else:
-        time_steps_to_plot = np.linspace(0, Nt-1, num=steps_to_plot, dtype=int)
-    
-    # Plot für die Konzentrationsprofile
-    plt.figure(figsize=(10, 6))
+        Parameter:
+            every (int): Beobachtungsintervall in Zeitschritten (Standardwert: 1).
+            steps (iterable von int, optional): Explizite Zeitschrittindizes; ersetzt every, falls angegeben.
+                Der Anfangszustand (Schritt 0) und der letzte Zeitschritt werden immer beobachtet.
 
-    # Listen zur Speicherung der Zeitlinien für die Legende
-    time_lines = []
-    
-    # Plot der Konzentrationsprofile für die bestimmten Zeitpunkte
-    for t in time_steps_to_plot:
-        time_label = get_time_label(t, dt)
-        if t == 0:
-            line, = plt.plot(x, C_init, label=f'{time_label}', color='k', linewidth=1.5)
+        Methoden:
+            start(layers, x, Nt, dt): Bereitet den Beobachter vor und allokiert die Ergebnisarrays.
+            reduce(C): Reduziert ein Konzentrationsprofil auf einen Wert oder ein kleines Array (in Unterklassen).
+            finish(): Kürzt die Ergebnisarrays auf die tatsächlich beobachteten Zeitpunkte.
+
+        Attribute nach der Simulation:
+            times (np.ndarray): Beobachtete Zeitpunkte [s].
+            values (np.ndarray): Beobachtete Werte, erste Achse entspricht times.
+        """
+        self.every = every
+        self.steps = None if steps is None else set(int(n) for n in steps)
+        self.times = None
+        self.values = None
+        self._count = 0
+
+    def start(self, layers, x, Nt, dt):
+        if self.steps is not None:
+            capacity = len(self.steps) + 2
         else:
-            C_plot = C_values[t]
-            line, = plt.plot(x, C_plot, label=f'{time_label}', linewidth=1.5)
-        time_lines.append(line)
+            capacity = Nt // self.every + 2
+        self.times = np.empty(capacity)
+        self.values = None
+        self._count = 0
+
+    def reduce(self, C):
+        raise NotImplementedError
+
+    def __call__(self, n, t, C, final=False):
+        if not final and n != 0:
+            if self.steps is not None:
+                if n not in self.steps:
+                    return
+            elif n % self.every:
+                return
+
+        value = np.asarray(self.reduce(C), dtype=float)
+        if self.values is None:
+            self.values = np.empty((len(self.times),) + value.shape)
+        elif self._count == len(self.times):
+            # Kapazität verdoppeln, falls die Anzahl der Zeitschritte nicht bekannt war
+            self.times = np.resize(self.times, 2 * len(self.times))
+            self.values = np.resize(self.values, (2 * len(self.values),) + value.shape)
+
+        self.times[self._count] = t
+        self.values[self._count] = value
+        self._count += 1
+
+    def finish(self):
+        self.times = self.times[:self._count]
+        if self.values is not None:
+            self.values = self.values[:self._count]
+
+class LinearReducerObserver(SimulationObserver):
+    def __init__(self, weights, every=1, steps=None):
+        """
+        Beobachter für lineare Kenngrößen, die als Matrix-Vektor-Produkt W @ C ausgewertet werden.
 
-    # Layer-Farben
-    colors = {
-        'LDPE': '#f16d1d',         
-        'LLDPE': '#f16d1d',         
-        'HDPE': '#32c864',         
-        'PP': '#c832ee',           
-        'PET': '#646464',          
-        'Kontaktphase': '#64e6df', 
-        'PS': '#8c564b',           
-        'PEN': '#e377c2',          
-        'HIPS': '#7f7f7f',         
-    }
-    
-    # Hinzufügen der Layerfarben
-    layer_patches = []
-    start_idx = 0
-    added_labels = set()
+        Parameter:
+            weights (np.ndarray): Gewichtsvektor (Nx,) oder Gewichtsmatrix (m, Nx).
+            every (int): Beobachtungsintervall in Zeitschritten.
+            steps (iterable von int, optional): Explizite Zeitschrittindizes.
+        """
+        super().__init__(every=every, steps=steps)
+        self.weights = None if weights is None else np.asarray(weights, dtype=float)
 
-    for layer in layers:
-        end_idx = start_idx + layer.nx
-        x_layer = x[start_idx:end_idx]
-        color = colors[layer.material]
-        
-        # Füge das Label nur hinzu, wenn das Material nicht bereits hinzugefügt wurde
-        if layer.material not in added_labels:
-            patch = plt.fill_between(x_layer, 0, max(C_values[0]), color=color, alpha=0.3, label=layer.material)
-            added_labels.add(layer.material)
+    def reduce(self, C):
+        return self.weights @ C
+
+class MigratedMassObserver(LinearReducerObserver):
+    def __init__(self, every=1, steps=None):
+        """
+        Beobachtet die spez. Migrationsmenge [mg/dm²] im letzten Layer (wie calculate_migrated_mass_over_time).
+        """
+        super().__init__(None, every=every, steps=steps)
+
+    def start(self, layers, x, Nt, dt):
+        super().start(layers, x, Nt, dt)
+        self.weights = layer_mass_weights(layers, x)[-1]
+
+class LayerMassObserver(LinearReducerObserver):
+    def __init__(self, every=1, steps=None):
+        """
+        Beobachtet die spez. Migrationsmenge [mg/dm²] je Schicht (wie calculate_migrated_mass_over_time_by_layer).
+        values hat die Form (Anzahl Beobachtungen, Anzahl Schichten).
+        """
+        super().__init__(None, every=every, steps=steps)
+
+    def start(self, layers, x, Nt, dt):
+        super().start(layers, x, Nt, dt)
+        self.weights = layer_mass_weights(layers, x)
+
+class ThresholdObserver(MigratedMassObserver):
+    def __init__(self, thresholds, stop=False, every=1, steps=None):
+        """
+        Erkennt, wann die spez. Migrationsmenge [mg/dm²] im letzten Layer einen oder mehrere Grenzwerte überschreitet.
+
+        Parameter:
+            thresholds (float oder iterable von float): Grenzwerte [mg/dm²].
+            stop (bool, optional): Simulation abbrechen, sobald alle Grenzwerte überschritten sind (Standard: False).
+            every (int), steps (iterable von int, optional): Nur für die gespeicherten Werte (siehe SimulationObserver);
+                die Grenzwerte werden in jedem Zeitschritt geprüft.
+
+        Attribute nach der Simulation:
+            crossing_times (np.ndarray): Erste Überschreitungszeitpunkte je Grenzwert [s], linear innerhalb des
+                Zeitschritts interpoliert; np.nan, falls der Grenzwert nicht erreicht wurde.
+            stop_requested (bool): True, sobald die Simulation abgebrochen werden kann.
+        """
+        super().__init__(every=every, steps=steps)
+        self.thresholds = np.atleast_1d(np.asarray(thresholds, dtype=float))
+        self.stop = stop
+        self.crossing_times = np.full(len(self.thresholds), np.nan)
+        self.stop_requested = False
+        self._previous = None
+
+    def start(self, layers, x, Nt, dt):
+        super().start(layers, x, Nt, dt)
+        self.crossing_times = np.full(len(self.thresholds), np.nan)
+        self.stop_requested = False
+        self._previous = None
+
+    def __call__(self, n, t, C, final=False):
+        m = self.weights @ C
+        open_ = np.isnan(self.crossing_times)
+        if self._previous is None:
+            self.crossing_times[open_ & (m >= self.thresholds)] = t
         else:
-            patch = plt.fill_between(x_layer, 0, max(C_values[0]), color=color, alpha=0.3)
+            t_prev, m_prev = self._previous
+            crossed = open_ & (m_prev < self.thresholds) & (m >= self.thresholds)
+            if np.any(crossed):
+                self.crossing_times[crossed] = t_prev + (self.thresholds[crossed] - m_prev) / (m - m_prev) * (t - t_prev)
+        self._previous = (t, m)
+        self.stop_requested = self.stop and not np.any(np.isnan(self.crossing_times))
+        super().__call__(n, t, C, final=final)
+
+class EquilibriumObserver(SimulationObserver):
+    def __init__(self, rtol=1e-5, stop=True, fill=True, every=1, steps=None):
+        """
+        Überwacht den Abstand zum Verteilungsgleichgewicht (siehe equilibrium_profile) und erkennt dessen Erreichen.
 
-        layer_patches.append(patch)
-        start_idx = end_idx
+        Parameter:
+            rtol (float, optional): Toleranz für max|C - C_eq| / max|C_eq| (Standard: 1e-5).
+            stop (bool, optional): Zeitschleife beenden, sobald das Gleichgewicht erreicht ist (Standard: True).
+            fill (bool, optional): Beim Abbruch die restlichen Ausgabezeitpunkte mit dem erreichten Profil auffüllen,
+                ohne weitere Gleichungssysteme zu lösen (Standard: True). Mit False enden die Ergebnisse beim Abbruch.
+            every (int), steps (iterable von int, optional): Nur für die gespeicherten Abstände (siehe SimulationObserver).
+
+        Attribute nach der Simulation:
+            equilibration_time (float): Zeitpunkt [s], ab dem das Profil innerhalb der Toleranz liegt; np.nan, falls nicht erreicht.
+            C_eq (np.ndarray): Gleichgewichtsprofil.
+            values (np.ndarray): Relativer Abstand zum Gleichgewicht zu den beobachteten Zeitpunkten.
+        """
+        super().__init__(every=every, steps=steps)
+        self.rtol = rtol
+        self.stop = stop
+        self.fill = fill
+        self.equilibration_time = np.nan
+        self.stop_requested = False
+        self.C_eq = None
+
+    def start(self, layers, x, Nt, dt):
+        super().start(layers, x, Nt, dt)
+        self.layers = layers
+        self.equilibration_time = np.nan
+        self.stop_requested = False
+        self.C_eq = None
+
+    def reduce(self, C):
+        # Abstand wurde in __call__ bereits für dieses Profil berechnet
+        return self._deviation
+
+    def __call__(self, n, t, C, final=False):
+        if self.C_eq is None:
+            # Erster Aufruf mit dem Anfangsprofil
+            self.C_eq = equilibrium_profile(self.layers, C)
+            self.scale = np.max(np.abs(self.C_eq)) or 1.0
+        self._deviation = np.max(np.abs(C - self.C_eq)) / self.scale
+        if np.isnan(self.equilibration_time) and n > 0 and self._deviation <= self.rtol:
+            self.equilibration_time = t
+            self.stop_requested = self.stop
+        super().__call__(n, t, C, final=final)
+
+class NegativeConcentrationObserver(SimulationObserver):
+    def __init__(self, rtol=1e-8, every=1, steps=None):
+        """
+        Erkennt negative Konzentrationen, das typische Zeichen für Oszillationen des Crank-Nicolson-Verfahrens
+        bei zu großem Zeitschritt (Abhilfe: startup_steps in run_simulation oder kleineres tabler).
 
-    # Achsenbeschriftungen und Formatierung
-    plt.xlim(x[0], x[-1])
-    plt.ylim(0, max(C_values[0]) + 5)
-    plt.xlabel('Position x [cm]', fontsize=14)
-    plt.ylabel('Konzentration [mg/kg]', fontsize=14)
-    plt.xticks(fontsize=14)
-    plt.yticks(fontsize=14)
-    
-    # Erste Legende (Zeitpunkte)
-    first_legend = plt.legend(handles=time_lines, loc='upper right', bbox_to_anchor=(1.25, 1.02), fontsize=14)
-    plt.gca().add_artist(first_legend)
+        Parameter:
+            rtol (float, optional): Werte unter -rtol * max|C_init| gelten als negativ (Standard: 1e-8).
+            every (int), steps (iterable von int, optional): Nur für die gespeicherten Werte (siehe SimulationObserver);
+                geprüft wird in jedem Zeitschritt.
+
+        Attribute nach der Simulation:
+            first_time (float): Erster Zeitpunkt [s] mit negativer Konzentration; np.nan, falls keiner auftrat.
+            n_negative (int): Anzahl der Zeitschritte mit negativen Konzentrationen.
+            minimum (float): Kleinste aufgetretene Konzentration relativ zu max|C_init|.
+            values (np.ndarray): min(C) / max|C_init| zu den beobachteten Zeitpunkten.
+        """
+        super().__init__(every=every, steps=steps)
+        self.rtol = rtol
+        self.first_time = np.nan
+        self.n_negative = 0
+        self.minimum = 0.0
+        self.scale = None
+
+    def start(self, layers, x, Nt, dt):
+        super().start(layers, x, Nt, dt)
+        self.first_time = np.nan
+        self.n_negative = 0
+        self.minimum = 0.0
+        self.scale = None
+
+    @property
+    def oscillating(self):
+        return self.n_negative > 0
+
+    def reduce(self, C):
+        return self._minimum
+
+    def __call__(self, n, t, C, final=False):
+        if self.scale is None:
+            self.scale = np.max(np.abs(C)) or 1.0
+        self._minimum = np.min(C) / self.scale
+        if self._minimum < -self.rtol:
+            self.n_negative += 1
+            if np.isnan(self.first_time):
+                self.first_time = t
+        self.minimum = min(self.minimum, self._minimum)
+        super().__call__(n, t, C, final=final)
+
+class TotalMassObserver(LinearReducerObserver):
+    def __init__(self, every=1, steps=None):
+        """
+        Beobachtet das Integral der Konzentration über das gesamte Gitter (wie total_masses aus run_simulation).
+        """
+        super().__init__(None, every=every, steps=steps)
 
-    # Zweite Legende (Layer)
-    layer_patches = [patch for patch in layer_patches if not patch.get_label().startswith('_')]
-    plt.legend(handles=layer_patches, loc='upper right', bbox_to_anchor=(1.33, 0.28), fontsize=14)
-    
-    if save_path:
-        plot_filename = os.path.join(save_path, 'concentration_plot.pdf')
-        plt.savefig(plot_filename, bbox_inches='tight')
-        print(f"Konzentrationsplot gespeichert unter: {plot_filename}")
-        
-    plt.show()
+    def start(self, layers, x, Nt, dt):
+        super().start(layers, x, Nt, dt)
+        self.weights = trapezoid_weights(x, 0, len(x))
+
+class PartitioningObserver(SimulationObserver):
+    def __init__(self, every=1, steps=None):
+        """
+        Beobachtet die Partitionierungsverhältnisse (C_links / C_rechts) / K an allen Schnittstellen (wie check_partitioning).
+        values hat die Form (Anzahl Beobachtungen, Anzahl Schnittstellen).
+        """
+        super().__init__(every=every, steps=steps)
+
+    def start(self, layers, x, Nt, dt):
+        super().start(layers, x, Nt, dt)
+        nx = np.array([layer.nx for layer in layers])
+        self.idx_left = np.cumsum(nx)[:-1] - 1
+        self.idx_right = self.idx_left + 1
+        self.K = np.array([layer.K_value if layer.K_value is not None else 1.0 for layer in layers[:-1]])
+
+    def reduce(self, C):
+        C_left = C[self.idx_left]
+        C_right = C[self.idx_right]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            K_calc = np.where(C_right == 0, np.inf, C_left / C_right)
+        return K_calc / self.K
+
+class TrajectoryWriter:
+    def __init__(self, path, n_profiles, x, C_init=None, chunk_size=64):
+        """
+        Schreibt Konzentrationsprofile während der Simulation in ein speicherabgebildetes .npy-Array auf der Festplatte.
+
+        Parameter:
+            path (str): Verzeichnis der Trajektorie (wird angelegt). Enthält profiles.npy, time_points.npy, x.npy und ggf. C_init.npy.
+            n_profiles (int): Anzahl der zu speichernden Profile.
+            x (np.ndarray): Räumliches Gitter.
+            C_init (np.ndarray, optional): Initiales Konzentrationsprofil.
+            chunk_size (int): Anzahl der Profile, nach denen die geschriebenen Blöcke auf die Festplatte geschrieben werden.
 
-def plot_mass_conservation(total_masses, total_mass_init, t_max, Nt, plot_interval, save_path=None):
+        Methoden:
+            append(t, C): Hängt ein Profil zum Zeitpunkt t [s] an.
+            close(): Schreibt alle offenen Blöcke und schließt die Dateien.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.chunk_size = chunk_size
+        self._count = 0
+
+        np.save(os.path.join(path, "x.npy"), x)
+        if C_init is not None:
+            np.save(os.path.join(path, "C_init.npy"), C_init)
+
+        self.profiles = np.lib.format.open_memmap(
+            os.path.join(path, "profiles.npy"), mode="w+", dtype=np.float64, shape=(n_profiles, len(x))
+        )
+        self.time_points = np.lib.format.open_memmap(
+            os.path.join(path, "time_points.npy"), mode="w+", dtype=np.float64, shape=(n_profiles,)
+        )
+
+    def append(self, t, C):
+        self.profiles[self._count] = C
+        self.time_points[self._count] = t
+        self._count += 1
+
+        # Blockweise auf die Festplatte schreiben, damit der Arbeitsspeicher nicht anwächst
+        if self._count % self.chunk_size == 0:
+            self.profiles.flush()
+            self.time_points.flush()
+
+    def close(self):
+        self.profiles.flush()
+        self.time_points.flush()
+        np.save(os.path.join(self.path, "count.npy"), self._count)  # Bei vorzeitigem Abbruch weniger Profile als vorgesehen
+        del self.profiles, self.time_points
+
+def load_trajectory(path):
     """
-    Plottet die rel. Abweichung der Gesamtmasse während der Simulation.
-    
+    Öffnet eine mit TrajectoryWriter geschriebene Trajektorie, ohne die Profile in den Arbeitsspeicher zu laden.
+
     Parameter:
-        total_masses (list): Liste der Gesamtmassen während der Simulation.
-        total_mass_init (float): Anfangsmasse.
-        t_max (float): Gesamte Simulationszeit [s].
-        Nt (int): Anzahl der Zeitschritte.
-        plot_interval (int): Intervall, in dem geplottet wird.
-        save_path (str, optional): Verzeichnis, in dem der Plot gespeichert wird.
+        path (str): Verzeichnis der Trajektorie.
+
+    Rückgabe:
+        tuple:
+            - C_values (np.memmap): Profile der Form (Anzahl Profile, Nx); C_values[i] wird erst beim Zugriff gelesen.
+            - time_points (np.ndarray): Zeitpunkte der Profile [s].
+            - x (np.ndarray): Räumliches Gitter.
+            - C_init (np.ndarray oder None): Initiales Konzentrationsprofil, falls gespeichert.
     """
-    # Berechnung der relativen Abweichung von der Anfangsmasse
-    rel_deviation = ((np.array(total_masses) - total_mass_init) / total_mass_init) * 100
-    
-    # Zeitwerte für die Simulation
-    time_values = np.linspace(0, t_max, Nt)
-    
-    # Plot erstellen
-    plt.figure(figsize=(10, 6))
+    C_values = np.load(os.path.join(path, "profiles.npy"), mmap_mode="r")
+    time_points = np.load(os.path.join(path, "time_points.npy"))
+    count_path = os.path.join(path, "count.npy")
+    if os.path.exists(count_path):
+        count = int(np.load(count_path))
+        C_values, time_points = C_values[:count], time_points[:count]
+    x = np.load(os.path.join(path, "x.npy"))
+    C_init_path = os.path.join(path, "C_init.npy")
+    C_init = np.load(C_init_path) if os.path.exists(C_init_path) else None
+    return C_values, time_points, x, C_init
+
+_LAYER_FIELDS = ("material", "d", "nx", "K_value", "C_init", "density", "D", "dx_edge", "lumped")
+
+def save_checkpoint(path, layers, t, C, dt=None, solver="banded", integrator="cn", step=None):
+    """
+    Schreibt den Zustand einer laufenden Simulation in eine .npz-Datei, aus der sie fortgesetzt werden kann.
+
+    Parameter:
+        path (str): Zieldatei. Sie wird über eine temporäre Datei ersetzt, sodass bei einem Absturz während des
+            Schreibens der vorherige Checkpoint erhalten bleibt.
+        layers (list von Layer): Schichtaufbau der Simulation.
+        t (float): Zeitpunkt des Zustands [s].
+        C (np.ndarray): Zustandsvektor (inkl. C_F bei ideal durchmischter Kontaktphase).
+        dt (float, optional): Zuletzt verwendete Zeitschrittgröße [s]; Standardwert für die Fortsetzung.
+        solver (str, optional): Löser der Simulation ('banded' oder 'dense').
+        integrator (str, optional): Zeitschrittverfahren der Simulation ('cn' oder 'tr_bdf2').
+        step (int, optional): Anzahl der bis t gerechneten Zeitschritte.
+
+    Hinweise:
+        - Die Schichtdefinitionen werden als JSON gespeichert (alle Konstruktorargumente von Layer, inkl. D);
+          zusätzlich der Schlüssel des Operator-Caches (layer_stack_key, dt, solver), über den load_checkpoint die
+          Konsistenz der Schichtdaten prüft.
+    """
+    definitions = [{field: getattr(layer, field) for field in _LAYER_FIELDS} for layer in layers]
+    operator_key = [layer_stack_key(layers), None if dt is None else float(dt), solver]
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, C=np.asarray(C, dtype=float), t=float(t), dt=np.nan if dt is None else float(dt),
+                 step=-1 if step is None else int(step), layers=json.dumps(definitions, default=lambda v: v.item()),
+                 operator_key=json.dumps(operator_key, default=lambda v: v.item()), solver=solver, integrator=integrator)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path):
+    """
+    Liest einen mit save_checkpoint geschriebenen Checkpoint.
+
+    Parameter:
+        path (str): Checkpoint-Datei.
+
+    Rückgabe:
+        dict: Schlüssel layers (list von Layer), t, C, dt (None, falls unbekannt), step (None, falls unbekannt),
+            solver, integrator und operator_key (Schlüssel des Operator-Caches als Tupel).
+
+    Raises:
+        ValueError: Wenn die gespeicherten Schichtdaten nicht zum gespeicherten Operator-Schlüssel passen.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        layers = [Layer(**definition) for definition in json.loads(str(data["layers"]))]
+        stack_key, dt, solver = json.loads(str(data["operator_key"]))
+        operator_key = (tuple(tuple(entry) for entry in stack_key), dt, solver)
+        if operator_key[0] != layer_stack_key(layers):
+            raise ValueError(f"Der Checkpoint {path} ist inkonsistent: Schichtdaten und Operator-Schlüssel weichen ab.")
+        step = int(data["step"])
+        return {
+            "layers": layers,
+            "t": float(data["t"]),
+            "C": data["C"].copy(),
+            "dt": None if np.isnan(data["dt"]) else float(data["dt"]),
+            "step": None if step < 0 else step,
+            "solver": str(data["solver"]),
+            "integrator": str(data["integrator"]),
+            "operator_key": operator_key,
+        }
+
+class CheckpointObserver(SimulationObserver):
+    def __init__(self, path, interval=600.0, every=None, solver="banded", integrator="cn", dt=None):
+        """
+        Schreibt während der Zeitschleife periodisch Checkpoints (siehe save_checkpoint).
+
+        Parameter:
+            path (str): Checkpoint-Datei; jeder Checkpoint ersetzt den vorherigen.
+            interval (float, optional): Mindestabstand zwischen zwei Checkpoints in Sekunden Rechenzeit (Standard: 600).
+            every (int, optional): Zusätzlich jeden every-ten Zeitschritt sichern.
+            solver, integrator (str, optional): Werden im Checkpoint für die Fortsetzung vermerkt.
+            dt (float, optional): Nominale Zeitschrittgröße [s], die im Checkpoint vermerkt wird; Standard ist der
+                Abstand der beiden letzten Aufrufe.
+
+        Attribute nach der Simulation:
+            count (int): Anzahl der geschriebenen Checkpoints.
+            t_saved (float): Zeitpunkt des zuletzt gesicherten Zustands [s].
+
+        Hinweise:
+            - Der letzte Zeitschritt wird immer gesichert, ebenso der Zustand beim Abbruch durch einen anderen Beobachter.
+            - Ohne dt wird der Abstand der beiden letzten Aufrufe gespeichert; nach einem verkürzten letzten Schritt
+              wäre das nicht die Schrittweite des Laufs, run_simulation übergibt bei festen Zeitschritten deshalb
+              tabler. Mit den Lösern 'expm'/'modal', die nur die Ausgabezeitpunkte aufrufen, ist der Beobachter
+              nicht zulässig.
+        """
+        super().__init__()
+        self.path = path
+        self.interval = interval
+        self.every_steps = every
+        self.solver = solver
+        self.integrator = integrator
+        self.dt = dt
+        self.count = 0
+        self.t_saved = None
+
+    def start(self, layers, x, Nt, dt):
+        self.layers = layers
+        self.count = 0
+        self.t_saved = None
+        self._t_previous = None
+        self._last = None
+        self._last_save = perf_counter()
+
+    def __call__(self, n, t, C, final=False):
+        dt = None if self._t_previous is None else t - self._t_previous
+        if self.dt is not None:
+            dt = self.dt
+        self._t_previous = t
+        if n == 0:
+            return
+        self._last = (n, t, C, dt)
+        due = final or perf_counter() - self._last_save >= self.interval
+        if self.every_steps and n % self.every_steps == 0:
+            due = True
+        if due:
+            self.save(n, t, C, dt)
+
+    def save(self, n, t, C, dt):
+        save_checkpoint(self.path, self.layers, t, C, dt=dt, solver=self.solver, integrator=self.integrator, step=n)
+        self.count += 1
+        self.t_saved = t
+        self._last_save = perf_counter()
+
+    def finish(self):
+        # Abbruch durch einen anderen Beobachter: den zuletzt erreichten Zustand sichern
+        if self._last is not None and self.t_saved != self._last[1]:
+            self.save(*self._last)
+
+def snapshot_steps(Nt, dt, snapshots=None, times=None):
+    """
+    Bestimmt die Zeitschritte, zu denen Konzentrationsprofile gespeichert werden.
+
+    Parameter:
+        Nt (int): Anzahl der Zeitschritte.
+        dt (float): Zeitschrittgröße [s].
+        snapshots (optional): Speicherstrategie:
+            - None: jeder Zeitschritt (bisheriges Verhalten).
+            - int k: jeder k-te Zeitschritt (der letzte Zeitschritt wird immer gespeichert).
+            - "final": nur der letzte Zeitschritt.
+            - "log" oder ("log", n): n logarithmisch verteilte Zeitpunkte (Standard n=50).
+            - Liste von Zeitpunkten [s]: werden auf den nächstgelegenen Zeitschritt gerundet.
+        times (np.ndarray, optional): Zeitpunkte der Schritte 0..Nt [s], gegen die explizite Zeitpunkte abgebildet
+            werden (z.B. mit verkürztem letzten Schritt); Standard ist n * dt.
+
+    Rückgabe:
+        np.ndarray: Aufsteigend sortierte, eindeutige Zeitschrittindizes im Bereich 1..Nt.
+
+    Raises:
+        ValueError: Wenn die Speicherstrategie unbekannt ist.
+    """
+    if Nt < 1:
+        return np.array([], dtype=int)
+
+    if snapshots is None:
+        return np.arange(1, Nt + 1)
+    if isinstance(snapshots, str):
+        snapshots = (snapshots,)
+    if isinstance(snapshots, (int, np.integer)):
+        if snapshots < 1:
+            raise ValueError("Das Speicherintervall muss mindestens 1 sein.")
+        steps = np.arange(snapshots, Nt + 1, snapshots)
+        return np.union1d(steps, [Nt])
+    if isinstance(snapshots, tuple) and snapshots and isinstance(snapshots[0], str):
+        mode = snapshots[0]
+        if mode == "final":
+            return np.array([Nt])
+        if mode == "log":
+            n = snapshots[1] if len(snapshots) > 1 else 50
+            steps = np.rint(np.logspace(0, np.log10(Nt), num=n)).astype(int)
+            return np.unique(np.clip(steps, 1, Nt))
+        raise ValueError(f"Unbekannte Speicherstrategie: {mode}")
+
+    if times is None:
+        times = np.arange(Nt + 1) * dt
+    requested = np.asarray(snapshots, dtype=float)
+    # Nächstgelegener Zeitschritt; bei gleichem Abstand der frühere
+    upper = np.clip(np.searchsorted(times, requested), 1, Nt)
+    steps = np.where(requested - times[upper - 1] <= times[upper] - requested, upper - 1, upper)
+    return np.unique(np.clip(steps, 1, Nt))
+
+def semi_discrete_operator(layers):
+    """
+    Liefert den Operator L des semi-diskreten Systems dC/dt = L C, das dem Crank-Nicolson-Verfahren zugrunde liegt.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte (Diffusionskoeffizienten bereits gesetzt).
+
+    Rückgabe:
+        tuple: Diagonalen (unten, Haupt, oben) von L [1/s].
+
+    Hinweise:
+        - Es gilt A = I - dt/2 L und B = I + dt/2 L, daher L = (B - A) / dt mit den Koeffizienten aus assemble_tridiagonal_bands.
+        - Bei ideal durchmischter Kontaktphase ist die letzte Zeile 0; deren Wert folgt aus C_F = C_L / K
+          (siehe apply_lumped_contact).
+    """
+    A_bands, B_bands = assemble_tridiagonal_bands(layers, 1.0)
+    lower, diag, upper = (B - A for A, B in zip(A_bands, B_bands))
+    if lumped_contact_parameters(layers) is not None:
+        lower[-1] = diag[-1] = 0.0
+    return lower, diag, upper
+
+def apply_lumped_contact(layers, C):
+    """
+    Setzt die Konzentration einer ideal durchmischten Kontaktphase auf C_F = C_L / K (letzte Spalte von C).
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+        C (np.ndarray): Profil(e) der Form (Nx,) oder (Anzahl, Nx); wird direkt verändert.
+
+    Rückgabe:
+        np.ndarray: C.
+    """
+    lumped = lumped_contact_parameters(layers)
+    if lumped is not None:
+        C[..., -1] = C[..., -2] / lumped[0]
+    return C
+
+def exponential_action(L_bands, C0, t, method="contour", n_nodes=24):
+    """
+    Berechnet C(t) = exp(t L) C0 direkt, ohne Zeitschritte.
+
+    Parameter:
+        L_bands (tuple): Diagonalen von L aus semi_discrete_operator.
+        C0 (np.ndarray): Konzentrationsprofil zum Zeitpunkt 0.
+        t (float): Zeitpunkt [s].
+        method (str, optional): 'contour' (Standard) wertet exp(tL) über ein Konturintegral auf einer optimierten
+            Talbot-Kontur aus (n_nodes/2 komplexe tridiagonale Lösungen, Aufwand unabhängig von t);
+            'expm_multiply' nutzt scipy.sparse.linalg.expm_multiply (Aufwand wächst mit ||tL||).
+        n_nodes (int, optional): Anzahl der Quadraturknoten der Kontur (gerade Zahl, Fehler etwa 3.9^-n_nodes).
+
+    Rückgabe:
+        np.ndarray: Konzentrationsprofil zum Zeitpunkt t.
+
+    Hinweise:
+        - Die Kontur setzt voraus, dass die Eigenwerte von L reell und nicht positiv sind (symmetrisierbarer Diffusionsoperator).
+    """
+    if t == 0:
+        return C0.copy()
+
+    if method == "expm_multiply":
+        return expm_multiply(bands_to_sparse(L_bands) * t, C0)
+    if method != "contour":
+        raise ValueError(f"Unbekannte Methode: {method}")
+
+    lower, diag, upper = L_bands
+    N = n_nodes
+    # Knoten der oberen Halbebene; die untere Hälfte folgt aus der Konjugationssymmetrie
+    theta = -np.pi + (np.arange(N // 2, N) + 0.5) * 2 * np.pi / N
+    z = N * (0.5017 * theta / np.tan(0.6407 * theta) - 0.6122 + 0.2645j * theta)
+    dz = N * (0.5017 / np.tan(0.6407 * theta) - 0.5017 * 0.6407 * theta / np.sin(0.6407 * theta)**2 + 0.2645j)
+
+    ab = np.zeros((3, len(C0)), dtype=complex)
+    ab[0, 1:] = -t * upper
+    ab[2, :-1] = -t * lower
+    C_t = np.zeros(len(C0))
+    for z_k, dz_k in zip(z, dz):
+        ab[1] = z_k - t * diag
+        y = solve_banded((1, 1), ab, C0.astype(complex), check_finite=False)
+        C_t += (np.exp(z_k) * dz_k * y).imag
+    return 2 * C_t / N
+
+def symmetrize_operator(layers):
+    """
+    Bestimmt die diagonale Skalierung s, mit der der Operator L symmetrisch wird, sowie das Gleichgewichtsprofil z.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte (Diffusionskoeffizienten bereits gesetzt).
+
+    Rückgabe:
+        tuple: (lower, diag, upper, s, z)
+            - Diagonalen von L (bei ideal durchmischter Kontaktphase ohne deren algebraische Zeile).
+            - s (np.ndarray): Skalierung mit s[i+1] / s[i] = sqrt(upper[i] / lower[i]); S L S^-1 ist symmetrisch.
+            - z (np.ndarray): Gleichgewichtsprofil mit L z = 0, je Schicht konstant und C_links = K * C_rechts.
+
+    Hinweise:
+        - s² * z ist der linke Nullvektor von L, d.h. (s² * z) @ C ist die Erhaltungsgröße des Verfahrens.
+    """
+    lower, diag, upper = semi_discrete_operator(layers)
+    if lumped_contact_parameters(layers) is not None:
+        # Die Kontaktphase folgt algebraisch aus dem letzten Polymerknoten
+        lower, diag, upper = lower[:-1], diag[:-1], upper[:-1]
+
+    # Gleichgewichtsprofil: je Schicht konstant, an den Schnittstellen C_links = K * C_rechts
+    z_layers = np.ones(len(layers))
+    for i in range(len(layers) - 2, -1, -1):
+        K = layers[i].K_value if layers[i].K_value is not None else 1.0
+        z_layers[i] = K * z_layers[i + 1]
+    z = np.repeat(z_layers, [layer.nx for layer in layers])[:len(diag)]
+
+    log_ratio = 0.5 * (np.log(upper) - np.log(lower))
+    s = np.exp(np.concatenate(([0.0], np.cumsum(log_ratio))))
+    return lower, diag, upper, s, z
+
+def equilibrium_profile(layers, C_init):
+    """
+    Berechnet die Gleichgewichtsverteilung, gegen die ein Anfangsprofil für t -> unendlich strebt.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte (Diffusionskoeffizienten bereits gesetzt).
+        C_init (np.ndarray): Anfangsprofil (z.B. aus initialize_concentration).
+
+    Rückgabe:
+        np.ndarray: Gleichgewichtsprofil C_eq [mg/kg]; je Schicht konstant mit C_links = K * C_rechts.
+
+    Hinweise:
+        - Die Konzentrationen folgen aus den K-Werten; ihre Höhe aus der Erhaltungsgröße (s² * z) @ C des Verfahrens
+          (siehe symmetrize_operator). Bei ideal durchmischter Kontaktphase ist das die Masse sum(rho_i * V_i * c_i),
+          die Verteilung also die analytische aus Volumina (Dicken), Dichten und K.
+    """
+    _, _, _, s, z = symmetrize_operator(layers)
+    n = len(s)
+    w = s**2 * z
+    amplitude = (w @ C_init[:n]) / (w @ z)
+
+    z_layers = np.ones(len(layers))
+    for i in range(len(layers) - 2, -1, -1):
+        K = layers[i].K_value if layers[i].K_value is not None else 1.0
+        z_layers[i] = K * z_layers[i + 1]
+    return amplitude * np.repeat(z_layers, [layer.nx for layer in layers])
+
+class ModalDecomposition:
+    def __init__(self, layers):
+        """
+        Zerlegt den Operator L des semi-diskreten Systems einmalig in Eigenmoden, sodass Profile zu beliebigen
+        Zeitpunkten als Summe abklingender Moden ausgewertet werden können.
+
+        Parameter:
+            layers (list von Layer): Liste der Schichtenobjekte (Diffusionskoeffizienten bereits gesetzt).
+
+        Methoden:
+            coefficients(C0): Modale Koeffizienten eines Anfangsprofils.
+            profiles(C0, times): Konzentrationsprofile zu den Zeitpunkten times, Form (Anzahl Zeitpunkte, Nx).
+            reduce(C0, times, weights): Lineare Kenngrößen weights @ C(t) (z.B. migrierte Masse) ohne Aufbau der Profile.
+
+        Hinweise:
+            - L ist über eine diagonale Skalierung S symmetrisierbar (verallgemeinertes Eigenwertproblem mit diagonaler
+              Massenmatrix): S L S^-1 = -G^T G mit einer bidiagonalen Matrix G, die sich aus dem Gleichgewichtsprofil z
+              (L z = 0) ergibt. Die Moden werden über die SVD von G berechnet (LAPACK gesvd), die auch die langsamen
+              Polymermoden neben den sehr schnellen Moden der Kontaktphase mit hoher relativer Genauigkeit liefert.
+            - Die absolute Genauigkeit der Profile liegt bei etwa 1e-15 * max(C_init).
+            - Speicherbedarf O(Nx²) und Aufwand O(Nx³), daher für Gitter bis zu einigen tausend Punkten gedacht.
+        """
+        self.layers = layers
+        lower, diag, upper, self.s, z = symmetrize_operator(layers)
+
+        # S L S^-1 = -G^T G mit G bidiagonal (um eine Nullzeile zur quadratischen Matrix ergänzt)
+        G = np.diag(np.append(-np.sqrt(upper * z[1:] / z[:-1]), 0.0)) + np.diag(np.sqrt(lower * z[:-1] / z[1:]), 1)
+        _, singular_values, Vt = svd(G, lapack_driver="gesvd")
+        self.eigenvalues = -singular_values**2
+        self.modes = Vt.T
+
+    def coefficients(self, C0):
+        return self.modes.T @ (self.s * C0[:len(self.s)])
+
+    def profiles(self, C0, times):
+        decay = np.exp(np.outer(times, self.eigenvalues)) * self.coefficients(C0)
+        C_t = (decay @ self.modes.T) / self.s
+        if len(self.s) < len(C0):
+            C_t = apply_lumped_contact(self.layers, np.hstack([C_t, np.zeros((len(C_t), 1))]))
+        return C_t
+
+    def reduce(self, C0, times, weights):
+        weights = np.array(weights, dtype=float)
+        n = len(self.s)
+        if weights.shape[-1] > n:
+            # Gewicht der Kontaktphase über C_F = C_L / K auf den letzten Polymerknoten umlegen
+            weights[..., n - 1] += weights[..., n] / lumped_contact_parameters(self.layers)[0]
+            weights = weights[..., :n]
+        weights_modal = (weights / self.s) @ self.modes
+        decay = np.exp(np.outer(times, self.eigenvalues)) * self.coefficients(C0)
+        return decay @ weights_modal.T
+
+def layer_stack_key(layers):
+    """
+    Liefert einen hashbaren Schlüssel für alle Eigenschaften eines Schichtaufbaus, die den Operator bestimmen.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+
+    Rückgabe:
+        tuple: (Material, d, nx, D, K, Dichte, dx_edge, lumped) je Schicht; C_init geht nicht ein.
+    """
+    return tuple((layer.material, layer.d, layer.nx, layer.D, layer.K_value, layer.density,
+                  layer.dx_edge, layer.lumped) for layer in layers)
+
+_modal_cache = OrderedDict()
+_MODAL_CACHE_SIZE = 8
+
+def get_modal_decomposition(layers):
+    """
+    Liefert die Modalzerlegung für einen Schichtaufbau aus dem Cache oder berechnet sie neu.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+
+    Rückgabe:
+        ModalDecomposition: Zerlegung des Operators.
+
+    Hinweise:
+        - Schlüssel ist layer_stack_key(layers); C_init, t_max und Ausgabezeitpunkte gehen nicht ein.
+    """
+    key = layer_stack_key(layers)
+    if key in _modal_cache:
+        _modal_cache.move_to_end(key)
+        return _modal_cache[key]
+
+    decomposition = ModalDecomposition(layers)
+    _modal_cache[key] = decomposition
+    if len(_modal_cache) > _MODAL_CACHE_SIZE:
+        _modal_cache.popitem(last=False)
+    return decomposition
+
+class OperatorCache:
+    def __init__(self, max_bytes=256 * 2**20):
+        """
+        LRU-Cache für assemblierte und zerlegte Crank-Nicolson-Operatoren mit Begrenzung über den Speicherbedarf.
+
+        Parameter:
+            max_bytes (int, optional): Maximaler Speicherbedarf aller Einträge in Byte (Standard: 256 MiB).
+
+        Methoden:
+            get(key): Eintrag zu key oder None; zählt Treffer bzw. Fehlzugriffe.
+            put(key, value): Speichert einen Eintrag (Tupel von Arrays) und verdrängt die am längsten ungenutzten Einträge.
+            info(): Statistik als dict (hits, misses, evictions, entries, nbytes, max_bytes).
+            clear(): Leert den Cache und setzt die Statistik zurück.
+
+        Hinweise:
+            - Einträge, die allein größer als max_bytes sind, werden nicht gespeichert.
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(value):
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if isinstance(value, (tuple, list)):
+            return sum(OperatorCache._size(v) for v in value)
+        return 0
+
+    def get(self, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        size = self._size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.nbytes -= evicted_size
+            self.evictions += 1
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+_operator_cache = OperatorCache()
+
+def operator_cache_info():
+    """
+    Liefert die Statistik des Operator-Caches von make_timestepper (siehe OperatorCache.info).
+    """
+    return _operator_cache.info()
+
+def clear_operator_cache(max_bytes=None):
+    """
+    Leert den Operator-Cache von make_timestepper und setzt optional eine neue Speichergrenze in Byte.
+    """
+    _operator_cache.clear()
+    if max_bytes is not None:
+        _operator_cache.max_bytes = max_bytes
+
+def make_timestepper(layers, dt, solver="banded", cache=True, method="cn"):
+    """
+    Stellt einen Crank-Nicolson-Zeitschritt der Größe dt für den Schichtaufbau bereit.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+        dt (float): Zeitschrittgröße [s].
+        solver (str, optional): 'banded' (Standard) oder 'dense' (siehe run_simulation).
+        cache (bool, optional): Assemblierte Matrizen und Zerlegung im LRU-Cache ablegen bzw. von dort übernehmen
+            (Schlüssel: layer_stack_key, dt und solver). Standard ist True.
+        method (str, optional): 'cn' (Standard), 'euler_half' für einen impliziten Euler-Schritt der Größe dt/2
+            oder 'tr_bdf2' für einen L-stabilen TR-BDF2-Schritt der Größe dt.
+
+    Rückgabe:
+        callable: Funktion step(C) -> C_new. Matrizen und Zerlegung werden einmalig hier berechnet.
+
+    Hinweise:
+        - Wegen A = I - dt/2 L ist der implizite Euler-Halbschritt A C_new = C; er nutzt dieselbe Zerlegung wie
+          der Crank-Nicolson-Schritt. Bei ideal durchmischter Kontaktphase bleibt die rechte Seite der algebraischen
+          Zeile null.
+        - TR-BDF2 (gamma = 2 - sqrt(2)): ein Crank-Nicolson-Schritt über gamma*dt, danach ein BDF2-Schritt bis dt.
+          Bei diesem gamma hat der BDF2-Schritt dieselbe Matrix I - gamma*dt/2 L, beide Stufen nutzen also eine
+          einzige Zerlegung (die des Crank-Nicolson-Schritts der Größe gamma*dt). Das Verfahren ist zweiter
+          Ordnung und dämpft steife Moden (z.B. einer aufgelösten Kontaktphase) statt sie oszillieren zu lassen.
+    """
+    if solver not in ("banded", "dense"):
+        raise ValueError(f"Unbekannter Löser: {solver}")
+    if method not in ("cn", "euler_half", "tr_bdf2"):
+        raise ValueError(f"Unbekanntes Zeitschrittverfahren: {method}")
+    if method == "tr_bdf2":
+        gamma = 2 - np.sqrt(2)
+        trapezoidal = make_timestepper(layers, gamma * dt, solver, cache=cache)
+        bdf2 = make_timestepper(layers, gamma * dt, solver, cache=cache, method="euler_half")
+        w_stage = 1 / (gamma * (2 - gamma))
+        w_start = (1 - gamma)**2 / (gamma * (2 - gamma))
+        return lambda C: bdf2(w_stage * trapezoidal(C) - w_start * C)
+
+    key = (layer_stack_key(layers), float(dt), solver)
+    operator = _operator_cache.get(key) if cache else None
+    if operator is None:
+        if solver == "banded":
+            A_bands, B_bands = initialize_matrices(layers, dt, assembly="banded")
+            operator = (factorize_tridiagonal(A_bands), B_bands)
+        else:
+            operator = initialize_matrices(layers, dt)
+        if cache:
+            _operator_cache.put(key, operator)
+
+    if method == "euler_half":
+        rhs_mask = np.ones(sum(layer.nx for layer in layers))
+        if lumped_contact_parameters(layers) is not None:
+            rhs_mask[-1] = 0.0
+        if solver == "banded":
+            A_lu = operator[0]
+            return lambda C: solve_factorized(A_lu, rhs_mask * C)
+        A = operator[0]
+        return lambda C: np.linalg.solve(A, rhs_mask * C)
+
+    if solver == "banded":
+        A_lu, B_bands = operator
+        return lambda C: solve_timestep_banded(A_lu, B_bands, C)
+    A, B = operator
+    return lambda C: solve_timestep(A, B, C)
+
+class _OutputRecorder:
+    def __init__(self, layers, x, C_init, observers=None, trajectory=None, n_profiles=None, n_steps=0, dt=1.0,
+                 t_start=0.0):
+        """
+        Verwaltet die Ausgaben einer Zeitschleife: gespeicherte Profile, Gesamtmassen, Beobachter und Trajektorie.
+
+        Parameter:
+            layers (list von Layer): Liste der Schichtenobjekte.
+            x (np.ndarray): Räumliches Gitter.
+            C_init (np.ndarray): Initiales Konzentrationsprofil.
+            observers (list, optional): Beobachter bzw. Funktionen f(n, t, C).
+            trajectory (str, optional): Verzeichnis für TrajectoryWriter.
+            n_profiles (int, optional): Anzahl der zu speichernden Profile (für trajectory erforderlich).
+            n_steps (int): Erwartete Anzahl an Zeitschritten (zur Vorallokation in den Beobachtern).
+            dt (float): Zeitschrittgröße [s] bzw. Startwert bei variabler Schrittweite.
+            t_start (float): Zeitpunkt des Anfangszustands [s] (bei Fortsetzung aus einem Checkpoint > 0).
+        """
+        self.x = x
+        self.mass_weights = trapezoid_weights(x, 0, len(x))
+        if lumped_contact_parameters(layers) is not None:
+            self.mass_weights[-1] += layers[-1].d
+        self.trajectory = trajectory
+        self.observers = list(observers) if observers else []
+        for observer in self.observers:
+            if isinstance(observer, SimulationObserver):
+                observer.start(layers, x, n_steps, dt)
+            observer(0, t_start, C_init)
+
+        self.writer = None
+        if trajectory is not None:
+            if n_profiles is None:
+                raise ValueError("Für eine Trajektorie muss die Anzahl der gespeicherten Profile vorab feststehen.")
+            self.writer = TrajectoryWriter(trajectory, n_profiles, x, C_init)
+
+        self.C_values = []
+        self.total_masses = []
+        self.time_points = []
+        self.fill_requested = False
+
+    def step(self, n, t, C, store, final=False):
+        for observer in self.observers:
+            if isinstance(observer, SimulationObserver):
+                observer(n, t, C, final=final)
+            else:
+                observer(n, t, C)
+
+        # Abbruch, sobald ein Beobachter (z.B. ThresholdObserver mit stop=True) dies anfordert
+        stop = any(getattr(observer, "stop_requested", False) for observer in self.observers)
+        self.fill_requested = stop and any(
+            getattr(observer, "stop_requested", False) and getattr(observer, "fill", False) for observer in self.observers
+        )
+
+        # Nur die ausgewählten Profile speichern (beim Abbruch ohne Auffüllen immer das letzte Profil)
+        if store or (stop and not final and not self.fill_requested):
+            if self.writer is not None:
+                self.writer.append(t, C)
+            else:
+                self.C_values.append(C.copy())
+            self.total_masses.append(self.mass_weights @ C)
+            self.time_points.append(t)
+        return stop
+
+    def fill(self, steps, times, C):
+        """
+        Füllt die restlichen Ausgabezeitpunkte nach einem Abbruch im Gleichgewicht mit dem konstanten Profil C auf.
+        """
+        for k, (n, t) in enumerate(zip(steps, times)):
+            self.step(n, t, C, store=True, final=(k == len(steps) - 1))
+
+    def finish(self):
+        for observer in self.observers:
+            if isinstance(observer, SimulationObserver):
+                observer.finish()
+
+        if self.writer is not None:
+            self.writer.close()
+            self.C_values = load_trajectory(self.trajectory)[0]
+
+        return self.C_values, self.total_masses, self.time_points
+
+def _initial_profile(initial_state, x):
+    C_init = np.array(initial_state[1], dtype=float)
+    if C_init.shape != x.shape:
+        raise ValueError(f"Der Anfangszustand hat {C_init.size} Einträge, das Gitter des Schichtaufbaus {x.size}.")
+    return C_init.copy(), C_init
+
+def run_simulation_expm(layers, output_times, method="contour", observers=None):
+    """
+    Berechnet Konzentrationsprofile nur zu den gewünschten Zeitpunkten über die Exponentialfunktion des Operators.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+        output_times (iterable von float): Gewünschte Zeitpunkte [s], z.B. 1, 10, 365 und 3650 Tage.
+        method (str, optional): Verfahren für exp(tL) (siehe exponential_action) oder 'modal' für die
+            zwischengespeicherte Modalzerlegung (siehe get_modal_decomposition).
+        observers (list, optional): Beobachter bzw. Funktionen f(n, t, C); n ist der Index des Ausgabezeitpunkts.
+
+    Rückgabe:
+        tuple: Wie run_simulation (C_values, C_init, total_masses, x, partitioning_checks, time_points).
+    """
+    x = initialize_grid(layers)
+    C_current, C_init = initialize_concentration(layers, x)
+    time_points = sorted(float(t) for t in output_times)
+
+    if method == "modal":
+        modal_profiles = get_modal_decomposition(layers).profiles(C_init, time_points)
+    else:
+        L_bands = semi_discrete_operator(layers)
+
+    recorder = _OutputRecorder(layers, x, C_init, observers, n_steps=len(time_points))
+    for n, t in enumerate(time_points, start=1):
+        if method == "modal":
+            C_t = modal_profiles[n - 1]
+        else:
+            C_t = apply_lumped_contact(layers, exponential_action(L_bands, C_init, t, method=method))
+        if recorder.step(n, t, C_t, store=True, final=(n == len(time_points))):
+            if recorder.fill_requested:
+                recorder.fill(np.arange(n + 1, len(time_points) + 1), time_points[n:], C_t)
+            break
+
+    C_values, total_masses, time_points = recorder.finish()
+    partitioning_checks = check_partitioning(layers, C_values)
+    return C_values, C_init, total_masses, x, partitioning_checks, time_points
+
+def output_schedule(snapshots, dt_min, t_max):
+    """
+    Übersetzt eine Speicherstrategie für Zeitschleifen mit variabler Schrittweite in Ausgabezeitpunkte.
+
+    Parameter:
+        snapshots (optional): None, int k, "final", "log"/("log", n) oder eine Liste von Zeitpunkten [s].
+        dt_min (float): Kleinste Zeitschrittgröße [s] (Beginn der logarithmischen Verteilung).
+        t_max (float): Gesamte Simulationszeit [s].
+
+    Rückgabe:
+        tuple: (every, output_times) – jeder every-te Schritt wird gespeichert, falls output_times None ist;
+            sonst die aufsteigenden Zeitpunkte in (0, t_max], die exakt getroffen werden.
+    """
+    every = 1
+    output_times = None
+    if isinstance(snapshots, str):
+        snapshots = (snapshots,)
+    if isinstance(snapshots, (int, np.integer)):
+        every = snapshots
+    elif isinstance(snapshots, tuple) and snapshots and isinstance(snapshots[0], str):
+        if snapshots[0] == "final":
+            output_times = np.array([t_max])
+        elif snapshots[0] == "log":
+            n = snapshots[1] if len(snapshots) > 1 else 50
+            output_times = np.logspace(np.log10(dt_min), np.log10(t_max), num=n)
+        else:
+            raise ValueError(f"Unbekannte Speicherstrategie: {snapshots[0]}")
+    elif snapshots is not None:
+        output_times = np.asarray(snapshots, dtype=float)
+    if output_times is not None:
+        output_times[np.isclose(output_times, t_max, rtol=1e-9)] = t_max
+        output_times = np.unique(output_times[(output_times > 0) & (output_times <= t_max)])
+    return every, output_times
+
+def geometric_time_points(t_max, dt_init, dt_max=None, growth=2.0, steps_per_level=5):
+    """
+    Erstellt einen Zeitplan mit kleinen Schritten am Anfang, die geometrisch bis zu einer Obergrenze anwachsen.
+
+    Parameter:
+        t_max (float): Gesamte Simulationszeit [s].
+        dt_init (float): Erste Zeitschrittgröße [s].
+        dt_max (float, optional): Größte Zeitschrittgröße [s] (Standard: max(dt_init, t_max / 100)).
+        growth (float, optional): Wachstumsfaktor von Stufe zu Stufe (Standard: 2).
+        steps_per_level (int, optional): Anzahl Schritte je Stufe (Standard: 5).
+
+    Rückgabe:
+        np.ndarray: Zeitpunkte t_1 < ... < t_N = t_max [s] (ohne 0).
+
+    Hinweise:
+        - Je Stufe bleibt dt konstant, sodass nur beim Stufenwechsel neu zerlegt wird. Die Anzahl der Schritte
+          wächst mit log(dt_max / dt_init) * steps_per_level + t_max / dt_max statt mit t_max / dt_init.
+        - Der letzte Schritt wird verkürzt, um t_max exakt zu treffen.
+    """
+    if dt_max is None:
+        dt_max = max(dt_init, t_max / 100)
+    times = []
+    t = 0.0
+    dt = dt_init
+    while t < t_max * (1 - 1e-12):
+        for _ in range(steps_per_level if dt < dt_max else 1):
+            t = min(t + dt, t_max)
+            times.append(t)
+            if t >= t_max:
+                break
+        dt = min(dt * growth, dt_max)
+    times[-1] = t_max
+    return np.array(times)
+
+def temperature_at(temperature_profile, t):
+    """
+    Liefert die Temperatur eines abschnittsweise konstanten Temperaturprofils zum Zeitpunkt t.
+
+    Parameter:
+        temperature_profile (list von tuple): Abschnitte (Beginn [s], Ende [s], T_C [°C]), aufsteigend sortiert.
+        t (float): Zeitpunkt [s].
+
+    Rückgabe:
+        float: Temperatur [°C]; vor dem ersten bzw. nach dem letzten Abschnitt gilt dessen Temperatur.
+    """
+    for start, end, T_C in temperature_profile:
+        if t < end:
+            return T_C
+    return temperature_profile[-1][2]
+
+def temperature_breakpoints(temperature_profile, t_max):
+    """
+    Liefert die Zeitpunkte in (0, t_max), an denen sich die Temperatur eines Profils ändert.
+
+    Parameter:
+        temperature_profile (list von tuple): Abschnitte (Beginn [s], Ende [s], T_C [°C]).
+        t_max (float): Gesamte Simulationszeit [s].
+
+    Rückgabe:
+        np.ndarray: Aufsteigende Abschnittsgrenzen [s].
+    """
+    edges = np.array([end for _, end, _ in temperature_profile[:-1]], dtype=float)
+    return np.unique(edges[(edges > 0) & (edges < t_max)])
+
+def run_simulation_schedule(layers, time_points, solver="banded", snapshots=None, observers=None, trajectory=None,
+                            startup_steps=0, integrator="cn", temperature_profile=None, M_r=None,
+                            simulation_case="worst", initial_state=None):
+    """
+    Führt die Simulation entlang eines vorgegebenen Zeitplans mit variabler Schrittweite durch.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+        time_points (iterable von float): Aufsteigende Zeitpunkte [s] (z.B. aus geometric_time_points).
+        solver (str, optional): 'banded' (Standard) oder 'dense'.
+        snapshots (optional): Speicherstrategie wie bei run_simulation_adaptive; explizite Zeitpunkte werden
+            in den Zeitplan eingefügt und exakt getroffen.
+        observers (list, optional): Beobachter bzw. Funktionen f(n, t, C) (siehe run_simulation).
+        trajectory (str, optional): Verzeichnis für TrajectoryWriter.
+        startup_steps (int, optional): Anzahl der ersten Schritte, die durch je zwei implizite Euler-Halbschritte
+            ersetzt werden (Rannacher-Start, siehe run_simulation).
+        integrator (str, optional): 'cn' (Standard) oder 'tr_bdf2' (siehe make_timestepper).
+        temperature_profile (list von tuple, optional): Abschnitte (Beginn [s], Ende [s], T_C [°C]); die
+            Diffusionskoeffizienten aller Schichten werden je Abschnitt nach Piringer neu berechnet (siehe migrant_layers).
+            Abschnittsgrenzen sollten im Zeitplan enthalten sein (siehe temperature_breakpoints).
+        M_r (float, optional): Relative Molekülmasse des Migranten [g/mol]; erforderlich mit temperature_profile.
+        simulation_case (str, optional): 'worst' (Standard) oder 'best' für die Piringer-Parameter.
+        initial_state (tuple, optional): (t0 [s], C0) – Fortsetzung ab dem Zustand C0 zum Zeitpunkt t0
+            (siehe resume_simulation); time_points muss dann nach t0 beginnen.
+
+    Rückgabe:
+        tuple: Wie run_simulation; time_points ist nicht äquidistant.
+
+    Hinweise:
+        - Für jede vorkommende Kombination aus Temperatur und Schrittweite wird die Zerlegung einmal berechnet
+          (bzw. aus dem Operator-Cache übernommen); wiederkehrende Temperaturen kosten keine neue Zerlegung.
+    """
+    if temperature_profile is not None and M_r is None:
+        raise ValueError("Für ein Temperaturprofil wird die Molekülmasse M_r des Migranten benötigt.")
+    t_start = 0.0 if initial_state is None else float(initial_state[0])
+    schedule = np.asarray(time_points, dtype=float)
+    schedule = schedule[schedule > t_start]
+    t_max = schedule[-1]
+    every, output_times = output_schedule(snapshots, schedule[0], t_max)
+    if output_times is not None:
+        output_times = output_times[output_times > t_start]
+        schedule = np.union1d(schedule, output_times)
+        store = np.isin(schedule, output_times)
+    else:
+        store = np.zeros(len(schedule), dtype=bool)
+        store[every - 1::every] = True
+        store[-1] = True
+    dts = np.diff(schedule, prepend=t_start)
+
+    x = initialize_grid(layers)
+    C_current, C_init = initialize_concentration(layers, x)
+    if initial_state is not None:
+        C_current, C_init = _initial_profile(initial_state, x)
+    recorder = _OutputRecorder(layers, x, C_init, observers, trajectory,
+                               n_profiles=int(np.count_nonzero(store)), n_steps=len(schedule), dt=dts[0],
+                               t_start=t_start)
+
+    stacks = {}
+    steppers = {}
+    for n, (t, dt) in enumerate(zip(schedule, dts), start=1):
+        T_C = None
+        stack = layers
+        if temperature_profile is not None:
+            # Temperatur in der Mitte des Schritts (Abschnittsgrenzen liegen auf Schrittgrenzen)
+            T_C = temperature_at(temperature_profile, t - dt / 2)
+            if T_C not in stacks:
+                stacks[T_C] = migrant_layers(layers, M_r, T_C, simulation_case=simulation_case)
+            stack = stacks[T_C]
+        if n <= startup_steps:
+            half_step = make_timestepper(stack, dt, solver, method="euler_half")
+            C_current = half_step(half_step(C_current))
+        else:
+            if (T_C, dt) not in steppers:
+                steppers[T_C, dt] = make_timestepper(stack, dt, solver, method=integrator)
+            C_current = steppers[T_C, dt](C_current)
+        if recorder.step(n, t, C_current, store[n - 1], final=(n == len(schedule))):
+            if recorder.fill_requested:
+                remaining = np.nonzero(store[n:])[0] + n
+                recorder.fill(remaining + 1, schedule[remaining], C_current)
+            break
+
+    C_values, total_masses, time_points = recorder.finish()
+    partitioning_checks = check_partitioning(layers, C_values)
+    return C_values, C_init, total_masses, x, partitioning_checks, time_points
+
+def run_simulation_adaptive(layers, t_max, dt_init, rtol=1e-3, atol=1e-9, solver="banded",
+                            snapshots=None, observers=None, trajectory=None, integrator="cn", startup_steps=0):
+    """
+    Führt die Simulation mit fehlergesteuerter, variabler Zeitschrittweite durch.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+        t_max (float): Gesamte Simulationszeit in Sekunden.
+        dt_init (float): Startwert der Zeitschrittgröße in Sekunden.
+        rtol (float, optional): Relative Toleranz für die spez. Migrationsmenge im letzten Layer.
+        atol (float, optional): Absolute Toleranz für die spez. Migrationsmenge [mg/dm²].
+        solver (str, optional): 'banded' (Standard) oder 'dense'.
+        snapshots (optional): Speicherstrategie; None (jeder akzeptierte Schritt), int k (jeder k-te Schritt),
+            "final", "log"/("log", n) oder eine Liste von Zeitpunkten [s], die exakt getroffen werden.
+        observers (list, optional): Beobachter bzw. Funktionen f(n, t, C) (siehe run_simulation).
+        trajectory (str, optional): Verzeichnis für TrajectoryWriter (nur mit fester Anzahl an Profilen,
+            d.h. "final", "log" oder expliziten Zeitpunkten).
+        integrator (str, optional): 'cn' (Standard) oder 'tr_bdf2' (siehe make_timestepper).
+        startup_steps (int, optional): Die ersten startup_steps akzeptierten Schritte werden durch je zwei implizite
+            Euler-Halbschritte ersetzt (Rannacher-Start, siehe run_simulation). Standard: 0.
+
+    Rückgabe:
+        tuple: Wie run_simulation; time_points ist nicht äquidistant.
+
+    Hinweise:
+        - Der lokale Fehler wird per Schrittverdopplung geschätzt (ein Schritt dt gegen zwei Schritte dt/2,
+          Fehler der migrierten Masse ≈ |m_dt/2 - m_dt| / 3 bei einem Verfahren zweiter Ordnung bzw.
+          |m_dt/2 - m_dt| in den Startschritten mit implizitem Euler).
+        - Die Schrittweiten werden auf die Stufen dt_init * 2^k gerundet, sodass die Zerlegungen je Stufe
+          wiederverwendet werden und nur bei einem Wechsel von dt neu zerlegt wird.
+    """
+    x = initialize_grid(layers)
+    C_current, C_init = initialize_concentration(layers, x)
+    weights = layer_mass_weights(layers, x)[-1]
+    every, output_times = output_schedule(snapshots, dt_init, t_max)
+
+    recorder = _OutputRecorder(
+        layers, x, C_init, observers, trajectory,
+        n_profiles=None if output_times is None else len(output_times), n_steps=1024, dt=dt_init,
+    )
+
+    steppers = {}
+
+    def stepper(h, startup, cache=True):
+        method = "euler_half" if startup else integrator
+        if not cache:
+            step = make_timestepper(layers, h, solver, cache=False, method=method)
+        else:
+            if (h, method) not in steppers:
+                steppers[h, method] = make_timestepper(layers, h, solver, method=method)
+            step = steppers[h, method]
+        return (lambda C: step(step(C))) if startup else step
+
+    t = 0.0
+    n = 0
+    level = 0  # dt = dt_init * 2**level
+    next_out = 0
+    while t < t_max:
+        dt = dt_init * 2.0**level
+        t_target = t_max
+        if output_times is not None and next_out < len(output_times):
+            t_target = output_times[next_out]
+        h = min(dt, t_target - t)
+        if h < 1e-12 * t_max:
+            raise RuntimeError("Zeitschrittweite zu klein; Toleranz kann nicht eingehalten werden.")
+
+        # Schrittverdopplung; verkürzte Schritte (Ausgabezeitpunkte) werden nicht zwischengespeichert
+        on_ladder = h == dt
+        startup = n < startup_steps
+        full = stepper(h, startup, cache=on_ladder)
+        half = stepper(h / 2, startup, cache=on_ladder)
+        C_full = full(C_current)
+        C_half = half(half(C_current))
+
+        m_half = weights @ C_half
+        err = abs(m_half - weights @ C_full) / (1 if startup else 3)
+        tol = atol + rtol * abs(m_half)
+        accepted = err <= tol
+
+        if accepted:
+            t = t_target if h == t_target - t else t + h
+            n += 1
+            C_current = C_half
+            store = False
+            if output_times is not None:
+                if next_out < len(output_times) and t == output_times[next_out]:
+                    store = True
+                    next_out += 1
+            else:
+                store = n % every == 0 or t >= t_max
+            if recorder.step(n, t, C_current, store, final=(t >= t_max)):
+                if recorder.fill_requested:
+                    if output_times is not None:
+                        remaining = output_times[output_times > t]
+                    else:
+                        remaining = np.array([t_max]) if t < t_max else np.array([])
+                    recorder.fill(n + 1 + np.arange(len(remaining)), remaining, C_current)
+                break
+
+        # Neue Schrittweite (auf die nächstkleinere Stufe gerundet)
+        factor = 2.0 if err == 0 else min(2.0, max(0.2, 0.9 * (tol / err)**(1 / 3)))
+        base = dt if (accepted and not on_ladder) else h
+        new_level = int(np.floor(np.log2(base * factor / dt_init)))
+        level = new_level if accepted else min(new_level, level - 1)
+
+    C_values, total_masses, time_points = recorder.finish()
+    partitioning_checks = check_partitioning(layers, C_values)
+    return C_values, C_init, total_masses, x, partitioning_checks, time_points
+
+def _step_count(duration, dt):
+    # Anzahl der Zeitschritte bis zum Ende; ein Rest wird zu einem verkürzten letzten Schritt
+    return max(int(np.ceil(duration / dt - 1e-9)), 1)
+
+def run_simulation(layers, t_max, tabler, solver="banded", snapshots=None, observers=None, trajectory=None,
+                   time_stepping="fixed", rtol=1e-3, atol=1e-9, dt_max=None, growth=2.0, steps_per_level=5,
+                   startup_steps=0, integrator="cn", temperature_profile=None, M_r=None, simulation_case="worst",
+                   initial_state=None, checkpoint=None, checkpoint_interval=600.0):
+    """
+    Führt die Simulation über die angegebene Zeit durch und gibt die relevanten Daten zurück.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+        t_max (float): Gesamte Simulationszeit in Sekunden.
+        tabler (float): Zeitschrittgröße in Sekunden (bei time_stepping="adaptive" der Startwert). Ist t_max kein
+            Vielfaches von tabler, wird der letzte Schritt verkürzt, sodass die Simulation genau bei t_max endet.
+        solver (str, optional): 'banded' (Standard) nutzt die einmal zerlegte tridiagonale Matrix und kostet O(Nx) pro Zeitschritt,
+            'dense' löst das volle Gleichungssystem wie bisher (O(Nx³) pro Zeitschritt, zum Vergleich).
+            'expm' springt ohne Zeitschritte direkt zu den Ausgabezeitpunkten (siehe run_simulation_expm),
+            'modal' wertet die zwischengespeicherte Modalzerlegung des Schichtaufbaus aus;
+            explizite Zeitpunkte in snapshots werden dabei exakt ausgewertet.
+        snapshots (optional): Speicherstrategie für die Konzentrationsprofile (siehe snapshot_steps).
+            Die Integration läuft immer mit der vollen Zeitschrittgröße.
+        observers (list, optional): Beobachter (SimulationObserver) oder Funktionen f(n, t, C), die während der
+            Zeitschleife aufgerufen werden. Zusammen mit snapshots="final" bleibt der Speicherbedarf bei O(Nt).
+            Setzt ein Beobachter stop_requested (z.B. ThresholdObserver mit stop=True), endet die Zeitschleife
+            nach diesem Schritt; das letzte Profil wird dann immer gespeichert. Fordert er zusätzlich fill an
+            (EquilibriumObserver), werden die restlichen Ausgabezeitpunkte mit dem erreichten Gleichgewichtsprofil belegt.
+        trajectory (str, optional): Verzeichnis, in das die gespeicherten Profile während der Simulation als
+            speicherabgebildete .npy-Datei geschrieben werden (siehe TrajectoryWriter). C_values ist dann ein np.memmap.
+        time_stepping (str, optional): 'fixed' (Standard), 'adaptive' (fehlergesteuert, siehe run_simulation_adaptive)
+            oder 'geometric' (tabler wächst stufenweise um growth bis dt_max, siehe geometric_time_points).
+        rtol, atol (float, optional): Toleranzen für die migrierte Masse bei time_stepping="adaptive".
+        dt_max, growth, steps_per_level (optional): Zeitplan bei time_stepping="geometric".
+        startup_steps (int, optional): Rannacher-Start – die ersten startup_steps Crank-Nicolson-Schritte werden durch
+            je zwei implizite Euler-Halbschritte ersetzt (gleiche Zerlegung). Dämpft die Oszillationen, die der
+            sprunghafte Anfangszustand bei großem tabler erzeugt; 2 ist ein bewährter Wert. Standard: 0 (reines
+            Crank-Nicolson). Gilt für alle time_stepping-Varianten.
+        integrator (str, optional): 'cn' (Crank-Nicolson, Standard) oder 'tr_bdf2' (L-stabil, zweiter Ordnung,
+            gleiche tridiagonale Struktur; etwa doppelter Aufwand je Schritt, siehe make_timestepper).
+        temperature_profile (list von tuple, optional): Abschnittsweise konstantes Temperaturprofil
+            [(Beginn [s], Ende [s], T_C [°C]), ...], z.B. Heißabfüllung, Transport, Lagerung. Die Diffusionskoeffizienten
+            aller Schichten werden je Abschnitt nach Piringer neu berechnet (Kontaktphase: 1e-2 cm²/s), die Zerlegungen
+            je Temperatur zwischengespeichert. Abschnittsgrenzen werden exakt getroffen. Nur mit time_stepping
+            "fixed" oder "geometric" und den Lösern 'banded'/'dense'.
+        M_r (float, optional): Relative Molekülmasse des Migranten [g/mol]; erforderlich mit temperature_profile.
+        simulation_case (str, optional): 'worst' (Standard) oder 'best' für die Piringer-Parameter bei temperature_profile.
+        initial_state (tuple, optional): (t0 [s], C0) – die Simulation beginnt mit dem Zustandsvektor C0 zum Zeitpunkt t0
+            statt mit initialize_concentration und läuft bis t_max (absolute Zeit). Snapshot-Zeitpunkte und
+            Temperaturprofil beziehen sich ebenfalls auf die absolute Zeit. Nur mit den Lösern 'banded'/'dense' und
+            time_stepping "fixed" oder "geometric" (siehe resume_simulation).
+        checkpoint (str, optional): Datei, in die während der Zeitschleife automatisch Checkpoints geschrieben werden
+            (siehe CheckpointObserver, save_checkpoint). Eine abgebrochene Simulation lässt sich damit über
+            resume_simulation fortsetzen. Nur mit den Lösern 'banded'/'dense', da 'expm'/'modal' keine
+            Zeitschrittgröße haben, mit der sich fortsetzen ließe.
+        checkpoint_interval (float, optional): Mindestabstand zwischen zwei automatischen Checkpoints in Sekunden
+            Rechenzeit (Standard: 600). Der letzte Zeitschritt wird immer gesichert.
+
+    Rückgabe:
+        tuple: 
+            - C_values: Liste der Konzentrationsprofile zu den gespeicherten Zeitpunkten.
+            - C_init: Initiales Konzentrationsprofil.
+            - total_masses: Liste der Gesamtmassen zu den gespeicherten Zeitpunkten.
+            - x: Das räumliche Gitter.
+            - partitioning_checks: Überprüfung der Partitionierungsverhältnisse an den Schichtgrenzen.
+            - time_points: Zeitpunkte der gespeicherten Profile [s].
+    """
+    
+    t_start = 0.0
+    if solver in ("expm", "modal") and (
+        checkpoint is not None or any(isinstance(observer, CheckpointObserver) for observer in observers or [])
+    ):
+        raise ValueError("Checkpoints sind nur mit den Zeitschrittverfahren ('banded', 'dense') möglich.")
+    if initial_state is not None:
+        if solver in ("expm", "modal") or time_stepping == "adaptive":
+            raise ValueError("Eine Fortsetzung ist nur mit festen oder geometrischen Zeitschritten möglich.")
+        t_start = float(initial_state[0])
+    if checkpoint is not None:
+        observers = list(observers or []) + [
+            CheckpointObserver(checkpoint, interval=checkpoint_interval, solver=solver, integrator=integrator,
+                               dt=tabler if time_stepping == "fixed" else None)
+        ]
+
+    if temperature_profile is not None:
+        if solver in ("expm", "modal") or time_stepping == "adaptive":
+            raise ValueError("Temperaturprofile werden nur mit festen oder geometrischen Zeitschritten unterstützt.")
+        if time_stepping == "geometric":
+            schedule = t_start + geometric_time_points(t_max - t_start, tabler, dt_max=dt_max, growth=growth,
+                                                       steps_per_level=steps_per_level)
+        else:
+            schedule = t_start + np.minimum(np.arange(1, _step_count(t_max - t_start, tabler) + 1) * tabler,
+                                            t_max - t_start)
+        schedule = np.union1d(schedule, temperature_breakpoints(temperature_profile, t_max))
+        return run_simulation_schedule(layers, schedule, solver=solver, snapshots=snapshots, observers=observers,
+                                       trajectory=trajectory, startup_steps=startup_steps, integrator=integrator,
+                                       temperature_profile=temperature_profile, M_r=M_r,
+                                       simulation_case=simulation_case, initial_state=initial_state)
+
+    if solver in ("expm", "modal"):
+        Nt = _step_count(t_max, tabler)
+        if snapshots is None or isinstance(snapshots, (str, tuple, int, np.integer)):
+            output_times = np.minimum(snapshot_steps(Nt, tabler, snapshots) * tabler, t_max)
+        else:
+            output_times = snapshots
+        method = "modal" if solver == "modal" else "contour"
+        return run_simulation_expm(layers, output_times, method=method, observers=observers)
+
+    if time_stepping == "adaptive":
+        return run_simulation_adaptive(layers, t_max, tabler, rtol=rtol, atol=atol, solver=solver,
+                                       snapshots=snapshots, observers=observers, trajectory=trajectory,
+                                       integrator=integrator, startup_steps=startup_steps)
+    if time_stepping == "geometric":
+        schedule = t_start + geometric_time_points(t_max - t_start, tabler, dt_max=dt_max, growth=growth,
+                                                   steps_per_level=steps_per_level)
+        return run_simulation_schedule(layers, schedule, solver=solver, snapshots=snapshots,
+                                       observers=observers, trajectory=trajectory, startup_steps=startup_steps,
+                                       integrator=integrator, initial_state=initial_state)
+    if time_stepping != "fixed":
+        raise ValueError(f"Unbekannte Zeitschrittsteuerung: {time_stepping}")
+
+    x = initialize_grid(layers)
+    C_current, C_init = initialize_concentration(layers, x)
+    if initial_state is not None:
+        C_current, C_init = _initial_profile(initial_state, x)
+        if snapshots is not None and not isinstance(snapshots, (str, tuple, int, np.integer)):
+            # Explizite Zeitpunkte beziehen sich auf die absolute Zeit
+            snapshots = np.asarray(snapshots, dtype=float)
+            snapshots = snapshots[snapshots > t_start] - t_start
+    step = make_timestepper(layers, tabler, solver, method=integrator)
+    half_step = make_timestepper(layers, tabler, solver, method="euler_half") if startup_steps else None
+
+    Nt = _step_count(t_max - t_start, tabler)
+    # Letzten Schritt verkürzen, damit t_max exakt getroffen wird
+    dt_last = (t_max - t_start) - (Nt - 1) * tabler
+    last_step = step
+    if not np.isclose(dt_last, tabler, rtol=1e-9):
+        last_step = make_timestepper(layers, dt_last, solver, method=integrator)
+    times = t_start + np.minimum(np.arange(Nt + 1) * tabler, t_max - t_start)
+    steps_to_store = snapshot_steps(Nt, tabler, snapshots, times=times - t_start)
+    store = np.zeros(Nt + 1, dtype=bool)
+    store[steps_to_store] = True
+    recorder = _OutputRecorder(layers, x, C_init, observers, trajectory,
+                               n_profiles=len(steps_to_store), n_steps=Nt, dt=tabler, t_start=t_start)
+
+    # Zeitschleife über Migrationszeit
+    for n in range(1, Nt + 1):
+        if n == Nt and last_step is not step:
+            C_current = last_step(C_current)
+        elif n <= startup_steps:
+            C_current = half_step(half_step(C_current))
+        else:
+            C_current = step(C_current)
+        if recorder.step(n, times[n], C_current, store[n], final=(n == Nt)):
+            break
+    if recorder.fill_requested:
+        remaining = steps_to_store[steps_to_store > n]
+        recorder.fill(remaining, times[remaining], C_current)
+
+    C_values, total_masses, time_points = recorder.finish()
+    partitioning_checks = check_partitioning(layers, C_values)
+
+    return C_values, C_init, total_masses, x, partitioning_checks, time_points
+
+def resume_simulation(checkpoint, t_max, tabler=None, solver=None, integrator=None, **kwargs):
+    """
+    Setzt eine Simulation aus einem Checkpoint fort bzw. verlängert sie bis t_max.
+
+    Parameter:
+        checkpoint (str oder dict): Checkpoint-Datei oder Ergebnis von load_checkpoint.
+        t_max (float): Neue Endzeit [s] (absolute Zeit, größer als die Zeit des Checkpoints).
+        tabler (float, optional): Zeitschrittgröße [s]; Standard ist die im Checkpoint vermerkte Schrittweite.
+        solver, integrator (str, optional): Standard sind die im Checkpoint vermerkten Verfahren.
+        **kwargs: Weitere Argumente für run_simulation (z.B. snapshots, observers, checkpoint, temperature_profile).
+
+    Rückgabe:
+        tuple: Wie run_simulation; C_init ist der Zustand des Checkpoints, time_points beginnen nach dessen Zeitpunkt.
+
+    Hinweise:
+        - Mit gleicher Schrittweite und gleichem Verfahren ist die Fortsetzung bis auf Rundung identisch mit einer
+          durchgehenden Simulation (ohne Rannacher-Start, da startup_steps standardmäßig 0 ist). Die Zerlegung
+          wird über den Operator-Cache wiederverwendet, wenn sie im selben Prozess bereits berechnet wurde.
+    """
+    state = load_checkpoint(checkpoint) if isinstance(checkpoint, (str, os.PathLike)) else checkpoint
+    if t_max <= state["t"]:
+        raise ValueError(f"Die Endzeit {t_max} s liegt nicht nach dem Checkpoint ({state['t']} s).")
+    if tabler is None:
+        if state["dt"] is None:
+            raise ValueError("Der Checkpoint enthält keine Zeitschrittgröße; bitte tabler angeben.")
+        tabler = state["dt"]
+    return run_simulation(state["layers"], t_max, tabler, solver=solver or state["solver"],
+                          integrator=integrator or state["integrator"], initial_state=(state["t"], state["C"]),
+                          **kwargs)
+
+def time_to_threshold(layers, thresholds, t_max, tabler, solver="banded", time_stepping="fixed", stop=True,
+                      rtol=1e-3, atol=1e-9):
+    """
+    Bestimmt, wann die spez. Migrationsmenge im letzten Layer einen oder mehrere Grenzwerte überschreitet.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+        thresholds (float oder iterable von float): Grenzwerte [mg/dm²].
+        t_max (float): Maximale Simulationszeit in Sekunden.
+        tabler (float): Zeitschrittgröße in Sekunden (bei 'expm'/'modal' die kleinste aufgelöste Zeit).
+        solver (str, optional): 'banded', 'dense', 'expm' oder 'modal' (siehe run_simulation).
+        time_stepping (str, optional): 'fixed' oder 'adaptive' (nur für 'banded'/'dense').
+        stop (bool, optional): Zeitschleife beenden, sobald alle Grenzwerte überschritten sind (Standard: True).
+        rtol, atol (float, optional): Toleranzen bei time_stepping="adaptive".
+
+    Rückgabe:
+        np.ndarray: Erste Überschreitungszeitpunkte je Grenzwert [s]; np.nan, falls bis t_max nicht erreicht.
+
+    Hinweise:
+        - Mit Zeitschritten wird der Zeitpunkt linear innerhalb des Schritts interpoliert (siehe ThresholdObserver).
+        - Bei 'expm' und 'modal' wird die Migrationsmenge auf 64 logarithmisch verteilten Zeitpunkten ausgewertet
+          und die erste Überschreitung anschließend mit brentq eingegrenzt.
+    """
+    thresholds = np.atleast_1d(np.asarray(thresholds, dtype=float))
+    if solver not in ("expm", "modal"):
+        observer = ThresholdObserver(thresholds, stop=stop)
+        run_simulation(layers, t_max, tabler, solver=solver, snapshots="final", observers=[observer],
+                       time_stepping=time_stepping, rtol=rtol, atol=atol)
+        return observer.crossing_times
+
+    x = initialize_grid(layers)
+    _, C_init = initialize_concentration(layers, x)
+    weights = layer_mass_weights(layers, x)[-1]
+    if solver == "modal":
+        decomposition = get_modal_decomposition(layers)
+
+        def mass(t):
+            return decomposition.reduce(C_init, np.atleast_1d(t), weights)
+    else:
+        L_bands = semi_discrete_operator(layers)
+
+        def mass(t):
+            return np.array([weights @ apply_lumped_contact(layers, exponential_action(L_bands, C_init, t_k))
+                             for t_k in np.atleast_1d(t)])
+
+    times = np.concatenate(([0.0], np.logspace(np.log10(tabler), np.log10(t_max), 64)))
+    masses = mass(times)
+    crossing_times = np.full(len(thresholds), np.nan)
+    for i, threshold in enumerate(thresholds):
+        above = np.nonzero(masses >= threshold)[0]
+        if len(above) == 0:
+            continue
+        k = above[0]
+        if k == 0:
+            crossing_times[i] = 0.0
+        else:
+            crossing_times[i] = brentq(lambda t: mass(t)[0] - threshold, times[k - 1], times[k], rtol=1e-10)
+    return crossing_times
+
+def richardson_estimate(values, ratio=2.0, order=None):
+    """
+    Schätzt Grenzwert, Fehler und Konvergenzordnung einer Folge von Lösungen bei fortgesetzter Verfeinerung.
+
+    Parameter:
+        values (iterable von float): Ergebnisse bei Schrittweiten h, h/ratio, h/ratio², ... (mindestens zwei).
+        ratio (float, optional): Verfeinerungsfaktor zwischen zwei Stufen (Standard: 2).
+        order (float, optional): Feste Ordnung; sonst aus den letzten drei Werten geschätzt (auf [0.5, 4] begrenzt,
+            bei nur zwei Werten 2).
+
+    Rückgabe:
+        tuple: (extrapolierter Wert, geschätzter Fehler des letzten Werts, Ordnung).
+    """
+    values = np.asarray(values, dtype=float)
+    d_last = values[-1] - values[-2]
+    if order is None:
+        order = 2.0
+        if len(values) >= 3:
+            d_prev = values[-2] - values[-3]
+            if d_last != 0 and d_prev != 0:
+                order = float(np.clip(np.log(abs(d_prev / d_last)) / np.log(ratio), 0.5, 4.0))
+    error = abs(d_last) / (ratio**order - 1)
+    return values[-1] + d_last / (ratio**order - 1), error, order
+
+def refined_layers(layers, factor):
+    """
+    Erstellt Kopien der Schichten, deren Gitterabstände um den Faktor factor verkleinert sind.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte.
+        factor (float): Verfeinerungsfaktor (2 halbiert die Gitterabstände aller Schichten).
+
+    Rückgabe:
+        list von Layer: Kopien mit nx = ceil((nx - 1) * factor) + 1 und dx_edge / factor; ideal durchmischte
+            Kontaktphasen bleiben ein einzelner Knoten. Bei ganzzahligem factor liegen alle alten Gitterpunkte
+            auch im neuen Gitter.
+    """
+    refined = []
+    for layer in layers:
+        layer = copy.copy(layer)
+        if not layer.lumped:
+            layer.nx = max(int(np.ceil((layer.nx - 1) * factor - 1e-9)) + 1, 3)
+            if layer.dx_edge:
+                layer.dx_edge = layer.dx_edge / factor
+        refined.append(layer)
+    return refined
+
+def auto_resolution(layers, t_max, rtol=1e-3, integrator="cn", max_nodes=4000, max_steps=1 << 16, coarse_steps=8,
+                    min_steps=100):
+    """
+    Wählt Ortsgitter und Zeitschritt so, dass die spez. Migrationsmenge im letzten Layer bei t_max die
+    relative Toleranz rtol einhält, und zwar mit dem geringsten Aufwand.
+
+    Parameter:
+        layers (list von Layer): Liste der Schichtenobjekte (Diffusionskoeffizienten bereits gesetzt). Die aktuellen
+            nx dienen nur zur Bestimmung der Gitterverhältnisse; begonnen wird auf einem groben Gitter.
+        t_max (float): Gesamte Simulationszeit [s].
+        rtol (float, optional): Relative Toleranz der migrierten Masse bei t_max (Standard: 1e-3), je zur Hälfte
+            auf Orts- und Zeitfehler aufgeteilt.
+        integrator (str, optional): 'cn' (mit Rannacher-Start) oder 'tr_bdf2' (siehe run_simulation).
+        max_nodes (int, optional): Höchstzahl an Gitterpunkten aller Schichten, sowohl für die Testrechnungen als
+            auch für das gewählte Gitter (Standard: 4000).
+        max_steps (int, optional): Höchstzahl an Zeitschritten für die Zeitstudie; darüber wird extrapoliert.
+        coarse_steps (int, optional): Anzahl der Zeitschritte der gröbsten Zeitstufe (Standard: 8).
+        min_steps (int, optional): Mindestanzahl an Zeitschritten des gewählten Zeitschritts, d.h. dt <= t_max / min_steps
+            (Standard: 100), damit auch der Verlauf über die Zeit aufgelöst ist.
+
+    Rückgabe:
+        dict:
+            - "layers": Kopien der Schichten mit gewähltem nx (und skaliertem dx_edge).
+            - "nx": gewählte nx je Schicht; "d_nx_ratio": größter Gitterabstand [cm].
+            - "dt" [s], "Nt": gewählter Zeitschritt und Anzahl Zeitschritte.
+            - "migrated_mass": Richardson-extrapolierte Migrationsmenge bei t_max [mg/dm²].
+            - "error_space", "error_time": vorhergesagte Fehler der gewählten Auflösung [mg/dm²].
+            - "order_space", "order_time": verwendete Konvergenzordnungen (beobachtet bzw. 2, siehe Hinweise).
+            - "predicted_runtime": vorhergesagte Laufzeit der Simulation mit gewählter Auflösung [s].
+            - "solves": Anzahl der durchgeführten Testrechnungen.
+
+    Hinweise:
+        - Zeitfehler: Auf einem groben Gitter (acht Intervalle in der dünnsten Schicht) wird die Anzahl der
+          Zeitschritte ab coarse_steps verdoppelt, bis der Richardson-Fehler unter der Toleranz liegt.
+        - Ortsfehler: Ausgehend von vier Intervallen in der dünnsten Schicht werden alle Gitterabstände halbiert
+          (mit der feinsten Zeitstufe), bis der Richardson-Fehler unter der Toleranz liegt oder max_nodes erreicht ist.
+        - Aus Fehler und Ordnung der feinsten Stufe (Fehler ~ h^p) folgt die gröbste Auflösung, die die Toleranz
+          einhält; sie ist nie gröber als die gröbste getestete Stufe, solange max_nodes dies zulässt.
+        - Beobachtete Ordnungen unter 1.5 (z.B. durch die Schnittstellenbehandlung erster Ordnung oder bereits
+          konvergierte Werte) werden durch die Ordnung 2 des Verfahrens ersetzt, da die Extrapolation mit kleiner
+          Ordnung unbegrenzt feine Auflösungen vorhersagt. Wird max_nodes begrenzend, liegt error_space über der
+          Toleranz.
+        - Die Laufzeit wird aus der gemessenen Zeit je Zeitschritt auf dem gewählten Gitter hochgerechnet.
+    """
+    polymer = [layer for layer in layers if not layer.lumped]
+    h0 = min(layer.d for layer in polymer) / 4
+    base = []
+    for layer in layers:
+        layer = copy.copy(layer)
+        if not layer.lumped:
+            scale = (layer.d / (layer.nx - 1)) / h0 if layer.nx > 1 else layer.d / h0
+            layer.nx = max(int(round(layer.d / h0)), 2) + 1
+            if layer.dx_edge:
+                layer.dx_edge = layer.dx_edge / scale
+        base.append(layer)
+
+    solves = 0
+    kwargs = dict(snapshots="final", integrator=integrator, startup_steps=2 if integrator == "cn" else 0)
+
+    def node_count(stack):
+        return sum(layer.nx for layer in stack)
+
+    def largest_factor(stack):
+        # Größter Verfeinerungsfaktor, mit dem refined_layers(stack, factor) höchstens max_nodes Punkte hat
+        resolved = [layer for layer in stack if not layer.lumped]
+        intervals = sum(layer.nx - 1 for layer in resolved)
+        factor = (max_nodes - (node_count(stack) - intervals)) / intervals
+        while factor > 0 and node_count(refined_layers(stack, factor)) > max_nodes:
+            factor *= 0.99
+        return factor
+
+    def estimate(values):
+        value, error, order = richardson_estimate(values)
+        if order < 1.5:
+            value, error, order = richardson_estimate(values, order=2.0)
+        return value, error, order
+
+    def migrated_mass(stack, Nt):
+        nonlocal solves
+        solves += 1
+        C_values, _, _, x, _, _ = run_simulation(stack, t_max, t_max / Nt, **kwargs)
+        return layer_mass_weights(stack, x)[-1] @ C_values[-1]
+
+    # Zeitfehler auf dem einmal verfeinerten Startgitter
+    probe = refined_layers(base, min(2.0, largest_factor(base)))
+    masses = []
+    Nt = coarse_steps
+    while True:
+        masses.append(migrated_mass(probe, Nt))
+        if len(masses) >= 3:
+            m_time, error_time, order_time = estimate(masses)
+            tol = 0.5 * rtol * abs(m_time)
+            if error_time <= tol or 2 * Nt > max_steps:
+                break
+        Nt *= 2
+    factor = (error_time / tol)**(1 / order_time) if tol > 0 else 1.0
+    Nt_chosen = max(int(np.ceil(Nt * factor)), coarse_steps, min_steps)
+    error_time = error_time * (Nt / Nt_chosen)**order_time
+
+    # Ortsfehler mit fester, feinster Zeitstufe: der Zeitfehler ist auf allen Gittern nahezu gleich und
+    # fällt in den Differenzen der Richardson-Extrapolation heraus
+    masses = []
+    stack = base
+    level = 0
+    while True:
+        masses.append(migrated_mass(stack, Nt))
+        if len(masses) >= 2:
+            m_space, error_space, order_space = estimate(masses)
+            tol = 0.5 * rtol * abs(m_space)
+            if len(masses) >= 3 and error_space <= tol:
+                break
+        # Gitterpunkte vor jeder Testrechnung prüfen
+        if node_count(refined_layers(base, 2**(level + 1))) > max_nodes:
+            if len(masses) >= 2:
+                break
+            # Schon die erste Verfeinerung ist zu fein: mit dem größten zulässigen Faktor vergleichen
+            ratio = largest_factor(base)
+            if ratio <= 1:
+                m_space, error_space, order_space, tol = masses[0], np.nan, 2.0, 0.0
+                break
+            masses.append(migrated_mass(refined_layers(base, ratio), Nt))
+            m_space, error_space, order_space = richardson_estimate(masses, ratio=ratio, order=2.0)
+            level = np.log2(ratio)
+            tol = 0.5 * rtol * abs(m_space)
+            break
+        level += 1
+        stack = refined_layers(base, 2**level)
+    factor = max(2**level * (error_space / tol)**(1 / order_space), 1.0) if tol > 0 else 1.0
+    factor = min(factor, largest_factor(base))
+    chosen = refined_layers(base, factor)
+    error_space = error_space * (2**level / factor)**order_space
+
+    # Laufzeit: gemessener Aufbau und gemessene Zeit je Zeitschritt auf dem gewählten Gitter
+    n_probe = min(Nt_chosen, 64)
+    start = perf_counter()
+    C = initialize_concentration(chosen, initialize_grid(chosen))[0]
+    step = make_timestepper(chosen, t_max / Nt_chosen, method=integrator, cache=False)
+    setup_time = perf_counter() - start
+    start = perf_counter()
+    for _ in range(n_probe):
+        C = step(C)
+    step_time = (perf_counter() - start) / n_probe
+
+    nx = [layer.nx for layer in chosen]
+    return {
+        "layers": chosen,
+        "nx": nx,
+        "d_nx_ratio": max(layer.d / (layer.nx - 1) for layer in chosen if not layer.lumped),
+        "dt": t_max / Nt_chosen,
+        "Nt": Nt_chosen,
+        "migrated_mass": m_space,
+        "error_space": error_space,
+        "error_time": error_time,
+        "order_space": order_space,
+        "order_time": order_time,
+        "predicted_runtime": setup_time + step_time * Nt_chosen,
+        "solves": solves,
+    }
+
+def minimum_layer_thickness(layers, index, limit, t_max, tabler, rtol=1e-3, d_min=None, d_max=None, solver="banded",
+                            integrator="cn", time_stepping="fixed", max_solves=60):
+    """
+    Bestimmt die Dicke einer Schicht (z.B. einer funktionellen Barriere), bei der die spez. Migrationsmenge im
+    letzten Layer bei t_max genau den Grenzwert limit erreicht.
+
+    Parameter:
+        layers (list von Layer): Schichtaufbau (Diffusionskoeffizienten bereits gesetzt); die Dicke von
+            layers[index] dient als Startwert.
+        index (int): Index der auszulegenden Schicht.
+        limit (float): Grenzwert der spez. Migrationsmenge [mg/dm²].
+        t_max (float): Kontaktzeit [s].
+        tabler (float): Zeitschrittgröße [s].
+        rtol (float, optional): Relative Genauigkeit der Dicke (Standard: 1e-3).
+        d_min (float, optional): Kleinste zulässige Dicke [cm]; Standard: drei Gitterabstände der Schicht.
+        d_max (float, optional): Größte zulässige Dicke [cm]; Standard: 1024-fache Startdicke.
+        solver, integrator, time_stepping (str, optional): Siehe run_simulation.
+        max_solves (int, optional): Höchstzahl an Vorwärtsrechnungen (Standard: 60).
+
+    Rückgabe:
+        dict:
+            - "d": Mindestdicke [cm] (bzw. d_min, falls der Grenzwert schon dort eingehalten wird).
+            - "nx": Gitterpunkte der Schicht bei dieser Dicke (gleicher Gitterabstand wie im Startaufbau).
+            - "layers": Kopien der Schichten mit ausgelegter Dicke.
+            - "migrated_mass": Spez. Migrationsmenge bei t_max für die ausgelegte Dicke [mg/dm²].
+            - "bracket": (d_unten, d_oben) der letzten Einschließung [cm]; None, wenn limit_met_at_d_min.
+            - "limit_met_at_d_min": True, wenn der Grenzwert schon mit d_min eingehalten wird; die Schicht ist dann
+              als Barriere nicht erforderlich und "d" ist nur die untere Grenze, keine ausgelegte Dicke.
+            - "solves": Anzahl der Vorwärtsrechnungen; "early_stops": davon vorzeitig beendete.
+
+    Raises:
+        ValueError: Wenn der Grenzwert auch mit d_max überschritten wird.
+
+    Hinweise:
+        - Zielfunktion je Dicke: (t_max - t_c) / t_max, falls der Grenzwert zum Zeitpunkt t_c < t_max überschritten
+          wird (die Zeitschleife endet dort über ThresholdObserver), sonst (m(t_max) - limit) / limit. Beide Zweige
+          sind bei m(t_max) = limit null, die Funktion ist stetig und fällt mit der Dicke; zu dünne Schichten kosten
+          daher nur die Rechnung bis zur Überschreitung, im Verteilungsgleichgewicht endet sie über EquilibriumObserver.
+        - Die Startdicke wird verdoppelt (höchstens bis d_max) bzw. halbiert, bis der Vorzeichenwechsel eingeschlossen ist, danach grenzt
+          brentq die Dicke ein. Die Klammerungsstufen d0 * 2^k wiederholen sich bei weiteren Abfragen (anderer
+          Grenzwert oder andere Kontaktzeit), deren Zerlegungen liefert dann der Operator-Cache.
+        - nx wird mit der Dicke skaliert; die Zielfunktion springt daher geringfügig (Diskretisierungsfehler) an den
+          Stellen, an denen sich nx ändert.
+        - Vorausgesetzt ist, dass die Migrationsmenge mit der Zeit zunimmt (erste Überschreitung = Überschreitung bei t_max).
+    """
+    layer = layers[index]
+    spacing = layer.d / (layer.nx - 1) if layer.nx > 1 else layer.d
+    d_min = 3 * spacing if d_min is None else d_min
+    d_max = 1024 * layer.d if d_max is None else d_max
+
+    solves = 0
+    early_stops = 0
+    evaluated = {}
+
+    def design(d):
+        stack = [copy.copy(template) for template in layers]
+        stack[index].d = d
+        stack[index].nx = max(int(round(d / spacing)), 2) + 1
+        return stack
+
+    def forward(stack, stop):
+        nonlocal solves, early_stops
+        if solves >= max_solves:
+            raise RuntimeError(f"Keine Lösung nach {max_solves} Vorwärtsrechnungen.")
+        solves += 1
+        observers = [ThresholdObserver(limit, stop=stop), EquilibriumObserver()]
+        C_values, _, _, x, _, _ = run_simulation(
+            stack, t_max, tabler, solver=solver, snapshots="final", observers=observers,
+            time_stepping=time_stepping, integrator=integrator, startup_steps=2 if integrator == "cn" else 0,
+        )
+        threshold = observers[0]
+        if any(observer.stop_requested for observer in observers):
+            early_stops += 1
+        return threshold.crossing_times[0], layer_mass_weights(stack, x)[-1] @ C_values[-1]
+
+    def objective(d):
+        if d not in evaluated:
+            t_cross, mass = forward(design(d), stop=True)
+            evaluated[d] = (t_max - t_cross) / t_max if t_cross < t_max else (mass - limit) / limit
+        return evaluated[d]
+
+    d_low = d_high = layer.d
+    limit_met_at_d_min = False
+    if objective(layer.d) > 0:
+        while objective(d_high) > 0:
+            if d_high >= d_max:
+                raise ValueError(f"Der Grenzwert {limit} mg/dm² wird auch mit d = {d_max} cm überschritten.")
+            d_low, d_high = d_high, min(2 * d_high, d_max)
+        d = brentq(objective, d_low, d_high, xtol=rtol * d_low)
+    else:
+        while objective(d_low) <= 0 and d_low > d_min:
+            d_low, d_high = max(d_low / 2, d_min), d_low
+        limit_met_at_d_min = objective(d_low) <= 0
+        d = d_low if limit_met_at_d_min else brentq(objective, d_low, d_high, xtol=rtol * d_low)
+
+    stack = design(d)
+    _, mass = forward(stack, stop=False)
+    return {
+        "d": d,
+        "nx": stack[index].nx,
+        "layers": stack,
+        "migrated_mass": mass,
+        "bracket": None if limit_met_at_d_min else (d_low, d_high),
+        "limit_met_at_d_min": limit_met_at_d_min,
+        "solves": solves,
+        "early_stops": early_stops,
+    }
+
+def stack_tridiagonal_bands(bands_list):
+    """
+    Fasst die tridiagonalen Matrizen mehrerer Szenarien zu einer blockdiagonalen tridiagonalen Matrix zusammen.
+
+    Parameter:
+        bands_list (list von tuple): Diagonalen (unten, Haupt, oben) je Szenario, alle mit derselben Knotenzahl Nx.
+
+    Rückgabe:
+        tuple: Diagonalen (unten, Haupt, oben) der Gesamtmatrix der Größe S*Nx; die Kopplung zwischen den Szenarien ist 0.
+    """
+    S = len(bands_list)
+    Nx = len(bands_list[0][1])
+    lower = np.zeros((S, Nx))
+    diag = np.empty((S, Nx))
+    upper = np.zeros((S, Nx))
+    for s, (l, dg, u) in enumerate(bands_list):
+        lower[s, :-1] = l
+        diag[s] = dg
+        upper[s, :-1] = u
+    return lower.ravel()[:-1], diag.ravel(), upper.ravel()[:-1]
+
+def run_batch_simulation(scenarios, t_max, dt, snapshots=None, startup_steps=0):
+    """
+    Simuliert viele Schichtaufbauten mit gleicher Gesamtknotenzahl gemeinsam in einem Zeitschleifendurchlauf.
+
+    Parameter:
+        scenarios (list von list von Layer): Schichtaufbauten (Diffusionskoeffizienten bereits gesetzt); D, K, d und C_init dürfen sich unterscheiden.
+        t_max (float): Gesamte Simulationszeit in Sekunden.
+        dt (float): Zeitschrittgröße in Sekunden.
+        snapshots (optional): Zeitschritte, zu denen die migrierte Masse gespeichert wird (siehe snapshot_steps).
+        startup_steps (int, optional): Rannacher-Start wie in run_simulation (Standard: 0).
+
+    Rückgabe:
+        tuple:
+            - migrated_mass (np.ndarray): Spez. Migrationsmenge im letzten Layer je Szenario, Form (S, Anzahl Zeitpunkte) [mg/dm²].
+            - time_points (list): Zeitpunkte [s].
+            - C_final (np.ndarray): Konzentrationsprofile am Ende, Form (S, Nx).
+            - x (np.ndarray): Räumliche Gitter je Szenario, Form (S, Nx).
+
+    Raises:
+        ValueError: Wenn die Szenarien unterschiedliche Knotenzahlen haben.
+
+    Hinweise:
+        - Die Koeffizienten stammen aus assemble_tridiagonal_bands, die Schnittstellenbehandlung ist also identisch zu run_simulation.
+        - Alle Szenarien werden als eine blockdiagonale tridiagonale Matrix einmal zerlegt (LAPACK gttrf mit Pivotisierung)
+          und pro Zeitschritt gemeinsam gelöst; die Kosten pro Zeitschritt sind O(S*Nx).
+        - Ist t_max kein Vielfaches von dt, wird der letzte Schritt verkürzt, sodass die Simulation exakt bei t_max endet.
+    """
+    Nx_all = {sum(layer.nx for layer in layers) for layers in scenarios}
+    if len(Nx_all) != 1:
+        raise ValueError("Alle Szenarien müssen dieselbe Gesamtzahl an Gitterpunkten haben.")
+    S = len(scenarios)
+
+    x = np.array([initialize_grid(layers) for layers in scenarios])
+    C = np.array([initialize_concentration(layers, x[s])[0] for s, layers in enumerate(scenarios)])
+    W = np.array([layer_mass_weights(layers, x[s])[-1] for s, layers in enumerate(scenarios)])
+
+    bands = [initialize_matrices(layers, dt, assembly="banded") for layers in scenarios]
+    A_lu = factorize_tridiagonal(stack_tridiagonal_bands([A_bands for A_bands, _ in bands]))
+    B_bands = stack_tridiagonal_bands([B_bands for _, B_bands in bands])
+
+    Nt = _step_count(t_max, dt)
+    times = np.minimum(np.arange(Nt + 1) * dt, t_max)
+    steps_to_store = snapshot_steps(Nt, dt, snapshots, times=times)
+    store = np.zeros(Nt + 1, dtype=bool)
+    store[steps_to_store] = True
+
+    # Letzten Schritt verkürzen, damit t_max exakt getroffen wird (wie in run_simulation)
+    dt_last = t_max - (Nt - 1) * dt
+    last_operator = None
+    if not np.isclose(dt_last, dt, rtol=1e-9):
+        last_bands = [initialize_matrices(layers, dt_last, assembly="banded") for layers in scenarios]
+        last_operator = (factorize_tridiagonal(stack_tridiagonal_bands([A_bands for A_bands, _ in last_bands])),
+                         stack_tridiagonal_bands([B_bands for _, B_bands in last_bands]))
+
+    # Impliziter Euler-Halbschritt A C_new = C; algebraische Zeilen der Kontaktphase erhalten die rechte Seite 0
+    rhs_mask = np.ones((S, C.shape[1]))
+    for s, layers in enumerate(scenarios):
+        if lumped_contact_parameters(layers) is not None:
+            rhs_mask[s, -1] = 0.0
+    rhs_mask = rhs_mask.ravel()
+
+    migrated_mass = np.empty((S, len(steps_to_store)))
+    C_flat = C.ravel()
+    k = 0
+    for n in range(1, Nt + 1):
+        if n == Nt and last_operator is not None:
+            C_flat = solve_timestep_banded(*last_operator, C_flat)
+        elif n <= startup_steps:
+            for _ in range(2):
+                C_flat = solve_factorized(A_lu, rhs_mask * C_flat)
+        else:
+            C_flat = solve_timestep_banded(A_lu, B_bands, C_flat)
+        if store[n]:
+            migrated_mass[:, k] = np.einsum("sx,sx->s", W, C_flat.reshape(S, -1))
+            k += 1
+
+    time_points = times[steps_to_store].tolist()
+    return migrated_mass, time_points, C_flat.reshape(S, -1), x
+
+def migrant_layers(layers, M_r, T_C, C_init=None, K_values=None, simulation_case="worst"):
+    """
+    Erstellt Kopien eines Schichtaufbaus für einen bestimmten Migranten.
+
+    Parameter:
+        layers (list von Layer): Schichtaufbau als Vorlage (Geometrie, Gitter, Dichten).
+        M_r (float): Relative Molekülmasse des Migranten [g/mol].
+        T_C (float): Temperatur [°C].
+        C_init (iterable von float, optional): Anfangskonzentration je Schicht [mg/kg]; sonst aus der Vorlage.
+        K_values (iterable von float, optional): Verteilungskoeffizient je Schnittstelle (Länge len(layers) - 1);
+            sonst aus der Vorlage.
+        simulation_case (str, optional): 'worst' (Standard) oder 'best'.
+
+    Rückgabe:
+        list von Layer: Kopien mit neu berechnetem Diffusionskoeffizienten nach Piringer (Kontaktphase: 1e-2 cm²/s).
+    """
+    migrant = []
+    for i, layer in enumerate(layers):
+        layer = copy.copy(layer)
+        layer.D = None
+        if C_init is not None:
+            layer.C_init = C_init[i]
+        if K_values is not None and i < len(layers) - 1:
+            layer.K_value = K_values[i]
+        layer.set_diffusion_coefficient(M_r, T_C, simulation_case=simulation_case)
+        migrant.append(layer)
+    return migrant
+
+def run_multi_migrant_simulation(layers, migrants, t_max, dt, T_C, simulation_case="worst", snapshots=None,
+                                 startup_steps=2):
+    """
+    Simuliert mehrere Migranten gemeinsam durch denselben Schichtaufbau.
+
+    Parameter:
+        layers (list von Layer): Schichtaufbau (Geometrie, nx, Dichten; Vorgaben für C_init und K).
+        migrants (list von tuple): Je Migrant (M_r, C_init je Schicht, K je Schnittstelle); C_init und K dürfen None
+            sein, dann gelten die Werte aus layers.
+        t_max (float): Gesamte Simulationszeit [s].
+        dt (float): Zeitschrittgröße [s].
+        T_C (float): Temperatur [°C].
+        simulation_case (str, optional): 'worst' (Standard) oder 'best'.
+        snapshots (optional): Speicherstrategie (siehe snapshot_steps).
+        startup_steps (int, optional): Rannacher-Start (Standard: 2), da die Migranten sehr unterschiedliche
+            Diffusionskoeffizienten haben und dt für langsame Migranten gewählt wird.
+
+    Rückgabe:
+        tuple:
+            - migrated_mass (np.ndarray): Spez. Migrationsmenge im letzten Layer, Form (Anzahl Migranten, Anzahl Zeitpunkte) [mg/dm²].
+            - time_points (list): Zeitpunkte [s].
+            - x (np.ndarray): Gemeinsames räumliches Gitter.
+            - C_final (np.ndarray): Konzentrationsprofile am Ende, Form (Anzahl Migranten, Nx).
+
+    Hinweise:
+        - Gitter, Zeitschritte und Ausgabezeitpunkte sind für alle Migranten gleich; die Operatoren der Migranten
+          werden blockdiagonal zusammengefasst und einmal zerlegt (siehe run_batch_simulation).
+    """
+    scenarios = [migrant_layers(layers, M_r, T_C, C_init=C_init, K_values=K_values, simulation_case=simulation_case)
+                 for M_r, C_init, K_values in migrants]
+    migrated_mass, time_points, C_final, x = run_batch_simulation(
+        scenarios, t_max, dt, snapshots=snapshots, startup_steps=startup_steps
+    )
+    return migrated_mass, time_points, x[0], C_final
+
+def remap_profile(old_layers, C_old, new_layers, inherit=None):
+    """
+    Überträgt ein Konzentrationsprofil auf einen geänderten Schichtaufbau (z.B. beim Übergang zwischen Prozessstufen).
+
+    Parameter:
+        old_layers (list von Layer): Bisheriger Schichtaufbau.
+        C_old (np.ndarray): Konzentrationsprofil auf dem Gitter von old_layers.
+        new_layers (list von Layer): Neuer Schichtaufbau.
+        inherit (list, optional): Je neuer Schicht der Index der Schicht in old_layers, deren Profil übernommen wird,
+            oder None für eine neue Schicht mit ihrem eigenen C_init (z.B. frisches Simulanzmittel).
+            Standard: Zuordnung über das Material, wobei das k-te Vorkommen eines Materials dem k-ten Vorkommen
+            im bisherigen Aufbau entspricht; nicht zugeordnete Schichten starten mit ihrem C_init.
+
+    Rückgabe:
+        np.ndarray: Konzentrationsprofil auf dem Gitter von new_layers.
+
+    Hinweise:
+        - Innerhalb einer Schicht wird linear über die relative Position (0 bis 1) interpoliert und anschließend auf
+          den bisherigen Schichtmittelwert skaliert; bei gleicher Dicke und Dichte bleibt die Masse der Schicht erhalten,
+          auch wenn sich nx oder dx_edge ändern.
+        - Eine ideal durchmischte Kontaktphase übernimmt den Mittelwert bzw. gibt ihren Wert gleichmäßig weiter;
+          danach wird sie wie in initialize_concentration mit dem letzten Polymerknoten ins Gleichgewicht gesetzt.
+    """
+    if inherit is None:
+        occurrences = {}
+        for i, layer in enumerate(old_layers):
+            occurrences.setdefault(layer.material, []).append(i)
+        inherit = []
+        for layer in new_layers:
+            candidates = occurrences.get(layer.material, [])
+            inherit.append(candidates.pop(0) if candidates else None)
+    if len(inherit) != len(new_layers):
+        raise ValueError("inherit benötigt genau einen Eintrag je Schicht des neuen Aufbaus.")
+
+    x_old, x_new = initialize_grid(old_layers), initialize_grid(new_layers)
+    old_starts = np.cumsum([0] + [layer.nx for layer in old_layers])
+    new_starts = np.cumsum([0] + [layer.nx for layer in new_layers])
+
+    def relative_profile(x, start, end, d):
+        xi = (x[start:end] - x[start]) / d
+        return xi, trapezoid_weights(xi, 0, len(xi))
+
+    C_new = np.zeros(len(x_new))
+    for i, (layer, j) in enumerate(zip(new_layers, inherit)):
+        start, end = new_starts[i], new_starts[i + 1]
+        if j is None:
+            C_new[start:end] = layer.C_init
+            continue
+        old_start, old_end = old_starts[j], old_starts[j + 1]
+        C_layer = C_old[old_start:old_end]
+        if layer.nx == 1 or len(C_layer) == 1:
+            if len(C_layer) == 1:
+                mean = C_layer[0]
+            else:
+                xi_old, w_old = relative_profile(x_old, old_start, old_end, old_layers[j].d)
+                mean = w_old @ C_layer
+            C_new[start:end] = mean
+            continue
+        xi_old, w_old = relative_profile(x_old, old_start, old_end, old_layers[j].d)
+        xi_new, w_new = relative_profile(x_new, start, end, layer.d)
+        C_layer_new = np.interp(xi_new, xi_old, C_layer)
+        mean_new = w_new @ C_layer_new
+        if mean_new > 0:
+            C_layer_new *= (w_old @ C_layer) / mean_new
+        C_new[start:end] = C_layer_new
+
+    equilibrate_lumped_contact(new_layers, C_new)
+    return C_new
+
+class ProcessStage:
+    def __init__(self, layers, duration, T_C=None, dt=None, inherit=None, name=None):
+        """
+        Beschreibt eine Stufe einer Prozesskette (z.B. Lagerung der Folienrolle, Abfüllung, Lagerung des Füllguts).
+
+        Parameter:
+            layers (list von Layer): Schichtaufbau dieser Stufe. Schichten können gegenüber der vorherigen Stufe
+                hinzukommen (z.B. die Kontaktphase beim Abfüllen) oder entfallen; C_init gilt nur für Schichten, die
+                kein Profil übernehmen (siehe remap_profile).
+            duration (float): Dauer der Stufe [s].
+            T_C (float, optional): Temperatur [°C]; die Diffusionskoeffizienten werden dann mit M_r der Prozesskette
+                nach Piringer berechnet (siehe migrant_layers). Sonst gelten die D-Werte von layers.
+            dt (float, optional): Zeitschrittgröße [s]; sonst die der Prozesskette. Sie wird ggf. verkleinert, damit
+                die Dauer ein ganzzahliges Vielfaches ist.
+            inherit (list, optional): Zuordnung der Schichten zur vorherigen Stufe (siehe remap_profile), z.B.
+                [0, 1, None], um die Kontaktphase bei einem Wechsel des Simulanzmittels neu zu beginnen.
+            name (str, optional): Bezeichnung der Stufe.
+        """
+        self.layers = layers
+        self.duration = duration
+        self.T_C = T_C
+        self.dt = dt
+        self.inherit = inherit
+        self.name = name
+
+def run_process_chain(stages, dt, M_r=None, simulation_case="worst", solver="banded", integrator="cn",
+                      snapshots=None, startup_steps=2):
+    """
+    Simuliert eine Prozesskette, deren Stufen nacheinander ablaufen und jeweils das Endprofil der vorherigen Stufe erben.
+
+    Parameter:
+        stages (list von ProcessStage): Stufen in zeitlicher Reihenfolge.
+        dt (float): Zeitschrittgröße [s] für Stufen ohne eigene Angabe.
+        M_r (float, optional): Relative Molekülmasse des Migranten [g/mol]; erforderlich für Stufen mit T_C.
+        simulation_case (str, optional): 'worst' (Standard) oder 'best' für die Piringer-Parameter.
+        solver (str, optional): 'banded' (Standard) oder 'dense'.
+        integrator (str, optional): 'cn' (Standard) oder 'tr_bdf2' (siehe make_timestepper).
+        snapshots (optional): Speicherstrategie je Stufe (siehe snapshot_steps); eine Liste von Zeitpunkten bezieht
+            sich auf die absolute Zeit der Kette, das Ende jeder Stufe wird immer gespeichert.
+        startup_steps (int, optional): Rannacher-Start zu Beginn jeder Stufe (Standard: 2), da ein Stufenwechsel
+            (neue Kontaktphase, Temperatursprung) wie ein sprunghafter Anfangszustand wirkt.
+
+    Rückgabe:
+        list von tuple: Je Stufe das Ergebnis von run_simulation (C_values, C_init, total_masses, x,
+            partitioning_checks, time_points); die Zeitpunkte laufen über die Stufen fort, C_init ist das übernommene
+            Anfangsprofil der Stufe.
+
+    Hinweise:
+        - Die Zerlegungen werden über den Operator-Cache je Schichtaufbau, Temperatur und Schrittweite
+          wiederverwendet; wiederkehrende Stufen oder erneute Läufe der Kette kosten keine neue Zerlegung.
+    """
+    results = []
+    t_start = 0.0
+    previous_layers, C_previous = None, None
+    for stage in stages:
+        layers = stage.layers
+        if stage.T_C is not None:
+            if M_r is None:
+                raise ValueError("Für Stufen mit Temperaturangabe wird die Molekülmasse M_r des Migranten benötigt.")
+            layers = migrant_layers(layers, M_r, stage.T_C, simulation_case=simulation_case)
+        if previous_layers is None:
+            C_start = initialize_concentration(layers, initialize_grid(layers))[0]
+        else:
+            C_start = remap_profile(previous_layers, C_previous, layers, inherit=stage.inherit)
+
+        t_end = t_start + stage.duration
+        stage_snapshots = snapshots
+        if snapshots is not None and not isinstance(snapshots, (str, tuple, int, np.integer)):
+            times = np.asarray(snapshots, dtype=float)
+            stage_snapshots = np.union1d(times[(times > t_start) & (times < t_end)], [t_end])
+        # Gleich lange Schritte, damit kein verkürzter letzter Schritt eine weitere Zerlegung erfordert
+        stage_dt = stage.duration / _step_count(stage.duration, stage.dt or dt)
+        result = run_simulation(layers, t_end, stage_dt, solver=solver,
+                                snapshots=stage_snapshots, startup_steps=startup_steps, integrator=integrator,
+                                initial_state=(t_start, C_start))
+        results.append(result)
+
+        previous_layers, C_previous = layers, result[0][-1]
+        t_start = t_end
+    return results
+
+_response_cache = OperatorCache()
+
+class SuperpositionEngine:
+    def __init__(self, layers, t_max, tabler, **options):
+        """
+        Beantwortet Simulationen eines festen Schichtaufbaus für beliebige Anfangsbeladungen durch Superposition.
+
+        Parameter:
+            layers (list von Layer): Schichtaufbau (Diffusionskoeffizienten bereits gesetzt); C_init wird ignoriert.
+            t_max (float): Gesamte Simulationszeit [s].
+            tabler (float): Zeitschrittgröße [s].
+            **options: Weitere Argumente für run_simulation (z.B. solver, snapshots, time_stepping, integrator,
+                startup_steps, temperature_profile); observers, trajectory, initial_state und checkpoint sind nicht
+                zulässig, ebenso time_stepping="adaptive", dessen Zeitpunkte von der Anfangsbeladung abhängen.
+
+        Methoden:
+            unit_response(i): Antwort auf C_init = 1 in Schicht i und 0 sonst als Tupel (Profile inkl. Anfangsprofil,
+                Zeitpunkte inkl. 0, Masse je Schicht), Form (Anzahl Zeitpunkte + 1, Nx bzw. Anzahl Schichten).
+            profiles(C_init_values): (C_values, C_init, x, time_points) wie bei run_simulation für eine
+                Anfangskonzentration je Schicht; C_values hat die Form (Anzahl Zeitpunkte, Nx).
+            migrated_mass(C_init_values): (migrated_mass, time_points) wie bei calculate_migrated_mass_over_time.
+            layer_masses(C_init_values): Masse je Schicht, Form (Anzahl Schichten, Anzahl Zeitpunkte) [mg/dm²].
+            threshold_time(C_init_values, threshold): Erster Zeitpunkt [s], zu dem die spez. Migrationsmenge threshold
+                erreicht (linear zwischen den gespeicherten Zeitpunkten interpoliert), sonst np.nan.
+
+        Hinweise:
+            - Das Modell ist linear in C_init (auch mit ideal durchmischter Kontaktphase und Temperaturprofil); die
+              Lösung für Anfangskonzentrationen c_i je Schicht ist daher die Summe c_i mal Einheitsantwort i.
+            - Einheitsantworten werden erst bei Bedarf (c_i != 0) berechnet und im Modul-Cache _response_cache
+              abgelegt (Schlüssel: layer_stack_key, t_max, tabler, options, Schicht). Alle Einheitsantworten teilen
+              sich dieselbe Zerlegung aus dem Operator-Cache.
+            - Oszillationen (negative Konzentrationen) und der Abbruch im Gleichgewicht werden nicht beobachtet.
+        """
+        for name in ("observers", "trajectory", "initial_state", "checkpoint"):
+            if options.get(name) is not None:
+                raise ValueError(f"{name} ist mit der Superposition nicht verfügbar.")
+        if options.get("time_stepping") == "adaptive":
+            # Jede Einheitsantwort hätte eigene Zeitpunkte, die sich nicht summieren lassen
+            raise ValueError("Die Superposition setzt feste oder geometrische Zeitschritte voraus.")
+        self.layers = layers
+        self.t_max = t_max
+        self.tabler = tabler
+        self.options = options
+        self.x = initialize_grid(layers)
+        self.mass_weights = layer_mass_weights(layers, self.x)
+        self._key = (layer_stack_key(layers), float(t_max), float(tabler), repr(sorted(options.items())))
+        self._computed = []
+
+    def unit_response(self, i):
+        key = self._key + (i,)
+        response = _response_cache.get(key)
+        if response is None:
+            unit = [copy.copy(layer) for layer in self.layers]
+            for j, layer in enumerate(unit):
+                layer.C_init = 1.0 if j == i else 0.0
+            C_values, C_init, _, _, _, time_points = run_simulation(unit, self.t_max, self.tabler, **self.options)
+            profiles = np.vstack([C_init, np.asarray(C_values)])
+            times = np.concatenate([[0.0], np.asarray(time_points, dtype=float)])
+            response = (profiles, times, profiles @ self.mass_weights.T)
+            _response_cache.put(key, response)
+        if i not in self._computed:
+            self._computed.append(i)
+        return response
+
+    def _combine(self, C_init_values, part):
+        C_init_values = np.asarray(C_init_values, dtype=float)
+        if len(C_init_values) != len(self.layers):
+            raise ValueError("Es wird genau eine Anfangskonzentration je Schicht benötigt.")
+        loaded = np.nonzero(C_init_values)[0]
+        if len(loaded) == 0:
+            return 0.0 * self.unit_response(0)[part]
+        return sum(C_init_values[i] * self.unit_response(i)[part] for i in loaded)
+
+    @property
+    def time_points(self):
+        return self.unit_response(self._computed[0] if self._computed else 0)[1][1:]
+
+    def profiles(self, C_init_values):
+        profiles = self._combine(C_init_values, 0)
+        return profiles[1:], profiles[0], self.x, self.time_points
+
+    def layer_masses(self, C_init_values):
+        return self._combine(C_init_values, 2)[1:].T
+
+    def migrated_mass(self, C_init_values):
+        return self._combine(C_init_values, 2)[1:, -1], self.time_points
+
+    def threshold_time(self, C_init_values, threshold):
+        mass = self._combine(C_init_values, 2)[:, -1]
+        times = np.concatenate([[0.0], self.time_points])
+        crossed = np.nonzero(mass >= threshold)[0]
+        if len(crossed) == 0:
+            return np.nan
+        k = crossed[0]
+        if k == 0:
+            return 0.0
+        return times[k - 1] + (threshold - mass[k - 1]) / (mass[k] - mass[k - 1]) * (times[k] - times[k - 1])
+
+def calculate_migrated_mass_over_time(C_values, x, layers, tabler, calc_interval, time_points=None):
+    """
+    Berechnet die migrierte Masse im letzten Layer über die Zeit.
+    
+    Parameter:
+        C_values (list von np.ndarray): Konzentrationsprofile über die Zeit.
+        x (np.ndarray): Räumliches Gitter.
+        layers (list von Layer): Liste der Schichtobjekte.
+        tabler (float): Zeitschrittgröße [s].
+        calc_interval (int): Intervall der Berechnung.
+        time_points (list, optional): Zeitpunkte der Profile aus run_simulation [s]. Ohne Angabe wird i * tabler angenommen.
+
+    Rückgabe:
+        migrated_mass_over_time (np.ndarray): Liste der migrierten Massen über die Zeit.
+        time_points (list): Liste der Zeitpunkte [s].
+    """
+    # Gewichte der Trapezregel (inkl. Dichte) für den letzten Layer
+    weights_last = layer_mass_weights(layers, x)[-1]
+    
+    # Speichert die migrierte Masse über die Zeit
+    migrated_mass_over_time = []
+    
+    # Speichert die entsprechenden Zeitpunkte
+    snapshot_times = time_points
+    time_points = []
+    
+    # Schleife über die gespeicherten Konzentrationsprofile in C_values mit dem angegebenen Intervall
+    for i in range(0, len(C_values), calc_interval):
+        # Berechne die migrierte Masse mittels der Trapezregel (bzw. direkt aus dem Knoten einer ideal durchmischten Kontaktphase)
+        migrated_mass_over_time.append(weights_last @ C_values[i])
+        
+        # Berechne und speichere die entsprechende Zeit in Sekunden
+        time_points.append(snapshot_times[i] if snapshot_times is not None else i * tabler)
+        
+    return np.array(migrated_mass_over_time), time_points
+
+def calculate_migrated_mass_over_time_by_layer(C_values, x, layers, tabler, calc_interval, time_points=None):
+    """
+    Berechnet die migrierte Masse je Schicht über die Zeit.
+
+    Parameter:
+        C_values (list von np.ndarray): Konzentrationsprofile über die Zeit.
+        x (np.ndarray): Räumliches Gitter.
+        layers (list von Layer): Liste der Schichtobjekte.
+        tabler (float): Zeitschrittgröße [s].
+        calc_interval (int): Intervall der Berechnung.
+        time_points (list, optional): Zeitpunkte der Profile aus run_simulation [s]. Ohne Angabe wird i * tabler angenommen.
+
+    Rückgabe:
+        tuple:
+            - migrated_masses_by_layer (list von np.ndarray): Liste je Schicht mit migrierter Masse über die Zeit.
+            - time_points (list): Liste der Zeitpunkte [s].
+    """
+    W = layer_mass_weights(layers, x)
+
+    migrated_masses_by_layer = [[] for _ in layers]
+    snapshot_times = time_points
+    time_points = []
+
+    for i in range(0, len(C_values), calc_interval):
+        time_points.append(snapshot_times[i] if snapshot_times is not None else i * tabler)
+        layer_masses = W @ C_values[i]
+        for idx in range(len(layers)):
+            migrated_masses_by_layer[idx].append(layer_masses[idx])
+
+    migrated_masses_by_layer = [np.array(values) for values in migrated_masses_by_layer]
+    return migrated_masses_by_layer, time_points
+
+def plot_results(C_values, C_init, x, layers, tabler,
+                 log_scale=False, steps_to_plot=10, save_path=None, show=True, time_points=None):
+    """
+    Erstellt einen Plot der Konzentrationsprofile zu verschiedenen Zeitpunkten während der Simulation.
+    Nutzt automatisch tight_layout, damit Legende und Labels nicht abgeschnitten werden.
+    Mit time_points (aus run_simulation) werden die tatsächlichen Zeitpunkte der gespeicherten Profile verwendet.
+    """
+    def get_time_label(s):
+        if s < 3600:
+            return f't={s:.0f} s'
+        if s < 3600 * 24:
+            return f't={s/3600:.1f} h'
+        return f't={s/(3600*24):.1f} d'
+
+    Nt = len(C_values)
+    if time_points is None:
+        if log_scale:
+            ts = np.unique(np.logspace(0, np.log10(Nt-1),
+                                       num=steps_to_plot, dtype=int))
+            time_steps = np.insert(ts, 0, 0)
+        else:
+            time_steps = np.linspace(0, Nt-1, num=steps_to_plot, dtype=int).astype(int)
+        curves = [(t * tabler, C_init if t == 0 else C_values[t]) for t in time_steps]
+    else:
+        # Anfangsprofil bei t=0 plus Auswahl der gespeicherten Profile
+        if log_scale and Nt > 1:
+            idx = np.unique(np.logspace(0, np.log10(Nt-1),
+                                        num=steps_to_plot - 1, dtype=int))
+        else:
+            # Auswahl nach Zeit, damit auch ungleichmäßige Zeitpläne gleichmäßig dargestellt werden
+            targets = np.linspace(0, time_points[-1], num=steps_to_plot)[1:]
+            idx = np.unique(np.searchsorted(time_points, targets).clip(0, Nt-1))
+        curves = [(0.0, C_init)] + [(time_points[i], C_values[i]) for i in idx]
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    # Ideal durchmischte Kontaktphase als konstanten Wert über ihre Dicke darstellen
+    x_plot = x
+    if getattr(layers[-1], "lumped", False):
+        x_plot = np.append(x, x[-1] + layers[-1].d)
+
+    def profile(C):
+        return np.append(C, C[-1]) if x_plot is not x else C
+
+    # Zeitlinien plotten
+    time_lines = []
+    for i, (s, C_plot) in enumerate(curves):
+        lbl = get_time_label(s)
+        if i == 0 and C_plot is C_init:
+            ln, = ax.plot(x_plot, profile(C_init), color='k', linewidth=1.5, label=lbl)
+        else:
+            ln, = ax.plot(x_plot, profile(C_plot), linewidth=1.5, label=lbl)
+        time_lines.append(ln)
+
+    # Layer-Flächen einzeichnen
+    colors = {
+        'LDPE': '#f16d1d','LLDPE': '#f16d1d','HDPE': '#32c864',
+        'PP': '#c832ee','PET': '#646464','Kontaktphase': '#64e6df',
+        'PS': '#8c564b','PEN': '#e377c2','HIPS': '#7f7f7f'
+    }
+    added = set()
+    start_pos = x[0]
+    ymin, ymax = ax.get_ylim()   # aktuelle Achsen-Limits holen
+    for layer in layers:
+        end_pos = start_pos + layer.d
+        col = colors.get(layer.material, '#cccccc')
+        lbl = layer.material if layer.material not in added else None
+        ax.axvspan(start_pos, end_pos, ymin=0, ymax=1,
+                facecolor=col, alpha=0.3, label=lbl)
+        added.add(layer.material)
+        start_pos = end_pos
+
+    # Achsen , Labels
+    ax.set_xlim(x_plot[0], x_plot[-1])
+    C_ref = max(np.max(C_init), np.max(C_values[0]))
+    ymin, ymax = 0, C_ref + 0.1 * C_ref
+    ax.set_ylim(ymin, ymax)
+    ax.set_xlabel('Position x [cm]', fontsize=14)
+    ax.set_ylabel('Konzentration [mg/kg]', fontsize=14)
+    ax.tick_params(labelsize=12)
+
+    # Layer-Hintergründe über gesamte Höhe mit axvspan
+    added = set()
+    start = x[0]
+    for layer in layers:
+        end = start + layer.d
+        col = colors.get(layer.material, '#cccccc')
+        # Label nur beim ersten Mal hinzufügen
+        lbl = layer.material if layer.material not in added else None
+        ax.axvspan(start, end, ymin=0, ymax=1, facecolor=col, alpha=0.3, label=lbl)
+        added.add(layer.material)
+        start = end
+
+    # Legenden
+    legend1 = ax.legend(handles=time_lines,
+                        loc='upper right',
+                        title='Zeitpunkte',
+                        fontsize=12)
+    ax.add_artist(legend1)
+    layer_labels = []
+    for layer in layers:
+        if layer.material not in layer_labels:
+            layer_labels.append(layer.material)
+
+    # Dummy-Patches für die Legende
+    legend_handles = [
+        Patch(facecolor=colors[label], edgecolor='none', alpha=0.3, label=label)
+        for label in layer_labels
+    ]
+
+    legend2 = ax.legend(handles=legend_handles,
+                        loc='upper left',
+                        title='Layer',
+                        fontsize=12, 
+                        bbox_to_anchor=(1, 1))
+    ax.add_artist(legend2)
+
+    # Zusätzlichen Rand lassen, damit die Layer-Legende rechts nicht abgeschnitten wird
+    fig.subplots_adjust(left=0.1, right=0.8, top=0.95, bottom=0.12)
+
+    # Speichern und Anzeigen
+    if save_path:
+        fn = os.path.join(save_path, 'concentration_plot.pdf')
+        fig.savefig(fn)
+        print(f"Konzentrationsplot gespeichert unter: {fn}")
+
+    if show:
+        plt.show()
+
+    return fig
+
+
+
+def plot_mass_conservation(total_masses, total_mass_init, t_max, Nt, plot_interval, save_path=None, time_points=None):
+    """
+    Plottet die rel. Abweichung der Gesamtmasse während der Simulation.
+    
+    Parameter:
+        total_masses (list): Liste der Gesamtmassen während der Simulation.
+        total_mass_init (float): Anfangsmasse.
+        t_max (float): Gesamte Simulationszeit [s].
+        Nt (int): Anzahl der Zeitschritte.
+        plot_interval (int): Intervall, in dem geplottet wird.
+        save_path (str, optional): Verzeichnis, in dem der Plot gespeichert wird.
+        time_points (list, optional): Zeitpunkte der gespeicherten Gesamtmassen aus run_simulation [s].
+    """
+    # Berechnung der relativen Abweichung von der Anfangsmasse
+    rel_deviation = ((np.array(total_masses) - total_mass_init) / total_mass_init) * 100
+    
+    # Zeitwerte für die Simulation
+    if time_points is not None:
+        time_values = np.asarray(time_points, dtype=float)
+    else:
+        time_values = np.linspace(0, t_max, Nt)
+    
+    # Plot erstellen
+    plt.figure(figsize=(10, 6))
     plt.plot(time_values[::plot_interval] / (3600 * 24), rel_deviation[::plot_interval], 
              label=r'$\Delta c_{{\%}} = \frac{\int c(t) \, dx - \int c_{\mathrm{init}} \, dx}{\int c_{\mathrm{init}} \, dx} * 100$', 
              linewidth=2, color='#F06D1D')
@@ -561,7 +3297,8 @@ def plot_mass_conservation(total_masses, total_mass_init, t_max, Nt, plot_interv
     plt.show()
 
 
-def plot_migrated_mass_over_time(migrated_mass_over_time, time_points, save_path=None):
+def plot_migrated_mass_over_time(migrated_mass_over_time, time_points, save_path=None, show=True, threshold=None,
+                                 threshold_time=None):
     """
     Plottet die spezifische Migrationsmenge im Verlauf der Zeit.
     
@@ -569,34 +3306,110 @@ def plot_migrated_mass_over_time(migrated_mass_over_time, time_points, save_path
         migrated_mass_over_time (list): Liste der migrierten Massen.
         time_points (list): Zeitschritte der Simulation [s].
         save_path (str, optional): Verzeichnis, in dem der Plot gespeichert wird.
+        threshold (float, optional): Grenzwert für die Migrationsmenge in mg/dm^2.
+        threshold_time (float, optional): Interpolierter Überschreitungszeitpunkt [s] (z.B. aus ThresholdObserver);
+            ohne Angabe wird der erste gespeicherte Zeitpunkt oberhalb des Grenzwerts verwendet.
     """
     # Konvertiere Zeitpunkte in Tage
     time_points_days = np.array(time_points) / (3600 * 24)
     
     # Plot der migrierten Masse
-    plt.figure(figsize=(10, 6))
-    plt.plot(time_points_days, migrated_mass_over_time, linewidth=2, color='#F06D1D')
-
-    # Finde den Punkt, an dem die migrierte Masse einen bestimmten Schwellenwert überschreitet
-    threshold_index = np.argmax(migrated_mass_over_time > 1e-5)
-    if migrated_mass_over_time[threshold_index] > 1e-5 and threshold_index != 0:
-        threshold_time = time_points_days[threshold_index]
-        plt.axvline(x=threshold_time, color='black', linestyle='--', label=f'$m_{{F}}(t)/A_{{P,F}} > 10^{{-5}} mg/dm^2$ nach {threshold_time:.2f} Tagen')
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(time_points_days, migrated_mass_over_time, linewidth=2, color='#F06D1D')
+
+    if threshold is not None:
+        # Finde den Punkt, an dem die migrierte Masse den Grenzwert überschreitet
+        threshold_index = np.argmax(migrated_mass_over_time > threshold)
+        if threshold_time is not None and not np.isnan(threshold_time):
+            threshold_time = threshold_time / (3600 * 24)
+        elif migrated_mass_over_time[threshold_index] > threshold and threshold_index != 0:
+            threshold_time = time_points_days[threshold_index]
+        else:
+            threshold_time = None
+        if threshold_time is not None:
+            ax.axvline(
+                x=threshold_time,
+                color='black',
+                linestyle='--',
+                label=(
+                    f'$m_{{F}}(t)/A_{{P,F}} > {threshold:.3g} mg/dm^2$ '
+                    f'nach {threshold_time:.2f} Tagen'
+                ),
+            )
 
     # Achsenbeschriftungen und Titel
-    plt.xlabel('Zeit $[Tage]$', fontsize=14)
-    plt.ylabel('spez. Migrationsmenge $[mg/dm^2]$', fontsize=14)
-    plt.xticks(fontsize=14)
-    plt.yticks(fontsize=14)
-    plt.grid(True, which='both', linestyle='--', linewidth=0.5, alpha=0.7)
+    ax.set_xlabel('Zeit [Tage]', fontsize=12)
+    ax.set_ylabel('spez. Migrationsmenge [mg/dm²]', fontsize=12)
+    ax.tick_params(labelsize=12)
+    ax.grid(True, which='both', linestyle='--', linewidth=0.7, alpha=0.7)
     
-    if threshold_index != 0:
-        plt.legend(fontsize=14)
+    if threshold is not None and threshold_time is not None:
+        ax.legend(fontsize=12)
 
     # Plot speichern, wenn ein Pfad angegeben wurde
     if save_path:
         plot_filename = os.path.join(save_path, 'migrated_mass_plot.pdf')
-        plt.savefig(plot_filename, bbox_inches='tight')
+        fig.savefig(plot_filename, bbox_inches='tight')
         print(f"Migrationsplot gespeichert unter: {plot_filename}")
     
-    plt.show()
+    if show:
+        plt.show()
+
+    return fig
+
+
+def plot_migrated_mass_over_time_by_layer(migrated_masses_by_layer, time_points, layers, save_path=None, show=True):
+    """
+    Plottet die spezifische Migrationsmenge pro Schicht im Verlauf der Zeit.
+
+    Parameter:
+        migrated_masses_by_layer (list von np.ndarray): Liste je Schicht mit migrierter Masse über die Zeit.
+        time_points (list): Zeitschritte der Simulation [s].
+        layers (list von Layer): Liste der Schichten.
+        save_path (str, optional): Verzeichnis, in dem der Plot gespeichert wird.
+    """
+    time_points_days = np.array(time_points) / (3600 * 24)
+    layer_count = len(layers)
+    cols = 2 if layer_count > 1 else 1
+    rows = int(np.ceil(layer_count / cols))
+
+    colors = {
+        "LDPE": "#f16d1d",
+        "LLDPE": "#f16d1d",
+        "HDPE": "#32c864",
+        "PP": "#c832ee",
+        "PET": "#646464",
+        "Kontaktphase": "#64e6df",
+        "PS": "#8c564b",
+        "PEN": "#e377c2",
+        "HIPS": "#7f7f7f",
+    }
+
+    fig, axes = plt.subplots(rows, cols, figsize=(10, 4 * rows))
+    if not isinstance(axes, np.ndarray):
+        axes = np.array([[axes]])
+    axes = axes.reshape(rows, cols)
+
+    for idx, layer in enumerate(layers):
+        ax = axes[idx // cols][idx % cols]
+        color = colors.get(layer.material, "#F06D1D")
+        ax.plot(time_points_days, migrated_masses_by_layer[idx], linewidth=2, color=color)
+        ax.set_title(f"{layer.material} (d={layer.d:g} cm)", fontsize=11)
+        ax.set_xlabel("Zeit [Tage]", fontsize=10)
+        ax.set_ylabel("spez. Migrationsmenge [mg/dm²]", fontsize=10)
+        ax.grid(True, which="both", linestyle="--", linewidth=0.7, alpha=0.7)
+
+    for j in range(layer_count, rows * cols):
+        axes[j // cols][j % cols].set_visible(False)
+
+    fig.tight_layout(pad=3.0, h_pad=3.0, w_pad=1.5)
+
+    if save_path:
+        plot_filename = os.path.join(save_path, "migrated_mass_by_layer_plot.pdf")
+        fig.savefig(plot_filename, bbox_inches="tight")
+        print(f"Migrationsplot gespeichert unter: {plot_filename}")
+
+    if show:
+        plt.show()
+
+    return fig
@@ -20,11 +20,6 @@ layers = [
 for layer in layers:
     layer.set_diffusion_coefficient(M_r, T_C)
       
-# Starten der Simulation
-C_values, C_init, total_masses, x, partitioning_checks = run_simulation(layers, t_max, dt)
-total_masses_init = np.trapz(C_init, x)
-# Berechnen der spez. Migrationsmenge
-migrated_mass_over_time, time_points = calculate_migrated_mass_over_time(C_values, x, layers, dt, calc_interval = 1)
 # Verzeichnis zum Speichern der Ergebnisse
 # Pfad entsprechend anpassen
 path_name = '/Users/tomhartmann/Desktop/studienarbeit-migrationsmodellierung/data/ML-Modell'
@@ -39,11 +34,17 @@ simulation_name = f"{current_time}_sim_{time_days}days_T{T_C}C_M{M_r}g_{material
 full_path = os.path.join(path_name, simulation_name)
 if not os.path.exists(full_path):
     os.makedirs(full_path)
+
+# Starten der Simulation; die Konzentrationsprofile werden direkt nach full_path/trajectory geschrieben
+# und können später mit load_trajectory(...) wieder geöffnet werden
+C_values, C_init, total_masses, x, partitioning_checks, snapshot_times = run_simulation(layers, t_max, dt, trajectory=os.path.join(full_path, 'trajectory'))
+total_masses_init = np.trapz(C_init, x)
+# Berechnen der spez. Migrationsmenge
+migrated_mass_over_time, time_points = calculate_migrated_mass_over_time(C_values, x, layers, dt, calc_interval = 1, time_points=snapshot_times)
     
-# Speichern der Ergebnisse als NumPy Datei im Containerformat für die spätere Weiterverarbeitung
+# Speichern der übrigen Ergebnisse als NumPy Datei im Containerformat für die spätere Weiterverarbeitung
 np.savez(os.path.join(full_path, 'data.npz'), 
          C_init=C_init, 
-         C_values=C_values, 
          total_masses=total_masses, 
          total_masses_init=total_masses_init, 
          x=x, 
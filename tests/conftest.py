@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+# Projektwurzel ins PYTHONPATH aufnehmen, damit die Pakete wie in gui/main.py importiert werden
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_model_package.ml_model_functions import Layer  # noqa: E402
+
+
+@pytest.fixture
+def two_layers():
+    """LDPE-Schicht mit Migrant vor einer unbeladenen, aufgelösten Kontaktphase."""
+    return [
+        Layer("LDPE", 0.01, 21, K_value=1.0, C_init=100.0, density=0.92, D=1e-8),
+        Layer("Kontaktphase", 0.1, 11, K_value=2.0, C_init=0.0, density=1.0, D=1e-6),
+    ]
+
+
+@pytest.fixture
+def three_layers():
+    """Beladene Schicht, Barriere und Kontaktphase."""
+    return [
+        Layer("LDPE", 0.005, 11, K_value=1.0, C_init=50.0, density=0.92, D=5e-9),
+        Layer("PET", 0.002, 9, K_value=3.0, C_init=0.0, density=1.4, D=2e-10),
+        Layer("Kontaktphase", 0.1, 11, K_value=1.0, C_init=0.0, density=1.0, D=1e-6),
+    ]
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from ml_model_package.ml_model_functions import (
+    EquilibriumObserver,
+    ThresholdObserver,
+    equilibrium_profile,
+    layer_mass_weights,
+    run_simulation,
+    time_to_threshold,
+)
+
+
+def test_threshold_crossing_is_interpolated_and_stops_early(two_layers):
+    C_values, _, _, x, _, time_points = run_simulation(two_layers, 20000.0, 10.0, startup_steps=2)
+    mass = np.asarray(C_values) @ layer_mass_weights(two_layers, x)[-1]
+    limit = 0.5 * mass[-1]
+    expected = np.interp(limit, mass, time_points)
+
+    observer = ThresholdObserver(limit, stop=True)
+    result = run_simulation(two_layers, 20000.0, 200.0, startup_steps=2, observers=[observer])
+    assert observer.crossing_times[0] == pytest.approx(expected, rel=2e-2)
+    assert result[5][-1] < 20000.0
+    assert observer.stop_requested
+
+
+@pytest.mark.parametrize("solver", ["banded", "modal"])
+def test_time_to_threshold_reports_missed_limits_as_nan(two_layers, solver):
+    times = time_to_threshold(two_layers, [1e-3, 1e6], 20000.0, 200.0, solver=solver)
+    assert 0.0 < times[0] < 20000.0
+    assert np.isnan(times[1])
+
+
+def test_equilibrium_detection_stops_and_fills_remaining_outputs(two_layers):
+    observer = EquilibriumObserver(rtol=1e-4)
+    C_values, C_init, _, x, _, time_points = run_simulation(two_layers, 1e6, 500.0, startup_steps=2,
+                                                            observers=[observer])
+    assert observer.equilibration_time < 1e6
+    assert time_points[-1] == pytest.approx(1e6)
+    assert len(time_points) == 2000
+    C_eq = equilibrium_profile(two_layers, C_init)
+    np.testing.assert_allclose(C_values[-1], C_values[len(C_values) // 2 + 1])
+    assert np.abs(C_values[-1] - C_eq).max() <= 1e-4 * np.abs(C_eq).max()
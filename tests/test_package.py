@@ -0,0 +1,21 @@
+import ast
+import os
+
+import ml_model_package.ml_model_functions as ml_model_functions
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_gui_uses_the_package_implementation():
+    # Es gibt nur eine Implementierung des Multi-Layer-Modells; die GUI importiert sie aus dem Paket
+    assert not os.path.exists(os.path.join(ROOT, "gui", "ml_model_functions.py"))
+    with open(os.path.join(ROOT, "gui", "multi_layer_gui.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    imported = [
+        alias.name
+        for node in tree.body
+        if isinstance(node, ast.ImportFrom) and node.module == "ml_model_package.ml_model_functions"
+        for alias in node.names
+    ]
+    assert imported
+    assert all(hasattr(ml_model_functions, name) for name in imported)
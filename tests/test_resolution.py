@@ -0,0 +1,35 @@
+import pytest
+
+from ml_model_package.ml_model_functions import (
+    auto_resolution,
+    layer_mass_weights,
+    richardson_estimate,
+    run_simulation,
+)
+
+
+def test_richardson_estimate_recovers_order_and_limit():
+    values = [1.0 + 0.3 * h**2 for h in (0.4, 0.2, 0.1)]
+    value, error, order = richardson_estimate(values)
+    assert order == pytest.approx(2.0)
+    assert value == pytest.approx(1.0)
+    assert error == pytest.approx(0.3 * 0.1**2)
+
+
+def test_auto_resolution_meets_tolerance(two_layers):
+    result = auto_resolution(two_layers, 20000.0, rtol=1e-3)
+    C_values, _, _, x, _, _ = run_simulation(result["layers"], 20000.0, result["dt"], snapshots="final",
+                                             startup_steps=2)
+    assert layer_mass_weights(result["layers"], x)[-1] @ C_values[-1] == pytest.approx(result["migrated_mass"],
+                                                                                      rel=1e-3)
+    reference = auto_resolution(two_layers, 20000.0, rtol=1e-5)
+    assert result["migrated_mass"] == pytest.approx(reference["migrated_mass"], rel=2e-3)
+
+
+def test_auto_resolution_respects_node_and_step_bounds(three_layers):
+    result = auto_resolution(three_layers, 20000.0, rtol=1e-6, max_nodes=300, min_steps=100)
+    assert sum(result["nx"]) <= 300
+    assert result["Nt"] >= 100
+    assert result["dt"] <= 20000.0 / 100 * (1 + 1e-12)
+    assert result["order_space"] >= 1.5
+    assert result["order_time"] >= 1.5
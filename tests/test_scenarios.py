@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from ml_model_package.ml_model_functions import (
+    CheckpointObserver,
+    Layer,
+    ProcessStage,
+    layer_mass_weights,
+    load_checkpoint,
+    migrant_layers,
+    minimum_layer_thickness,
+    resume_simulation,
+    run_multi_migrant_simulation,
+    run_process_chain,
+    run_simulation,
+)
+
+
+DAY = 86400.0
+
+
+def stack(lumped=True):
+    layers = [Layer("LDPE", 0.02, 21, C_init=200.0, density=0.92), Layer("PET", 0.002, 9, K_value=1.0, density=1.4)]
+    if lumped:
+        layers.append(Layer("Kontaktphase", 0.5, 1, K_value=None, density=1.0, lumped=True))
+    else:
+        layers.append(Layer("Kontaktphase", 0.5, 21, K_value=1.0, density=1.0))
+    for layer in layers:
+        layer.set_diffusion_coefficient(200, 40)
+    return layers
+
+
+def migrated_mass(layers, x, C):
+    return layer_mass_weights(layers, x)[-1] @ C
+
+
+def test_multi_migrant_run_matches_single_runs():
+    template = stack()
+    migrants = [(100.0, None, None), (250.0, [80.0, 0.0, 0.0], [1.0, 3.0]), (500.0, None, None)]
+    masses, time_points, x, C_final = run_multi_migrant_simulation(template, migrants, 30 * DAY, 3600.0, 40,
+                                                                   snapshots=10)
+    for i, (M_r, C_init, K_values) in enumerate(migrants):
+        layers = migrant_layers(template, M_r, 40, C_init, K_values)
+        C_values, _, _, _, _, single_times = run_simulation(layers, 30 * DAY, 3600.0, snapshots=10, startup_steps=2)
+        np.testing.assert_allclose(time_points, single_times)
+        np.testing.assert_allclose(C_final[i], C_values[-1], rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(masses[i], [migrated_mass(layers, x, C) for C in C_values], rtol=1e-9,
+                                   atol=1e-15)
+
+
+def test_constant_temperature_profile_matches_plain_run():
+    plain = run_simulation(stack(), 30 * DAY, 3600.0, snapshots="final")
+    profile = run_simulation(stack(), 30 * DAY, 3600.0, snapshots="final", M_r=200,
+                             temperature_profile=[(0.0, 10 * DAY, 40), (10 * DAY, 30 * DAY, 40)])
+    np.testing.assert_allclose(profile[0][-1], plain[0][-1], rtol=1e-9)
+
+
+def test_temperature_profile_matches_chained_stages():
+    profile = [(0.0, 2 * DAY, 70), (2 * DAY, 30 * DAY, 25)]
+    direct = run_simulation(stack(), 30 * DAY, 3600.0, snapshots="final", M_r=200, temperature_profile=profile)
+    chain = run_process_chain([ProcessStage(stack(), 2 * DAY, T_C=70), ProcessStage(stack(), 28 * DAY, T_C=25)],
+                              3600.0, M_r=200, snapshots="final", startup_steps=0)
+    np.testing.assert_allclose(chain[-1][0][-1], direct[0][-1], rtol=1e-9, atol=1e-12)
+    assert chain[-1][5][-1] == pytest.approx(30 * DAY)
+
+
+@pytest.mark.parametrize("integrator", ["cn", "tr_bdf2"])
+@pytest.mark.parametrize("lumped", [True, False])
+def test_resume_from_checkpoint_matches_continuous_run(tmp_path, integrator, lumped):
+    path = str(tmp_path / "state.npz")
+    full = run_simulation(stack(lumped), 60 * DAY, 3600.0, snapshots="final", integrator=integrator)
+    observer = CheckpointObserver(path, interval=1e9, every=100, integrator=integrator)
+    run_simulation(stack(lumped), 30 * DAY, 3600.0, snapshots="final", observers=[observer], integrator=integrator)
+    state = load_checkpoint(path)
+    assert state["t"] == pytest.approx(30 * DAY)
+    assert state["dt"] == pytest.approx(3600.0)
+    resumed = resume_simulation(path, 60 * DAY, snapshots="final")
+    np.testing.assert_allclose(resumed[0][-1], full[0][-1], rtol=1e-9, atol=1e-12)
+
+
+def test_checkpoint_records_the_nominal_step_after_a_shortened_last_step(tmp_path):
+    path = str(tmp_path / "state.npz")
+    run_simulation(stack(), 2500.0, 200.0, snapshots="final", checkpoint=path)
+    state = load_checkpoint(path)
+    assert state["t"] == pytest.approx(2500.0)
+    assert state["dt"] == pytest.approx(200.0)
+
+
+@pytest.mark.parametrize("solver", ["expm", "modal"])
+def test_checkpoints_are_rejected_without_time_steps(tmp_path, solver):
+    with pytest.raises(ValueError):
+        run_simulation(stack(), 30 * DAY, 3600.0, solver=solver, checkpoint=str(tmp_path / "state.npz"))
+
+
+def test_process_chain_ends_stages_exactly_and_hands_over_profiles():
+    stages = [ProcessStage(stack(), 2.3 * DAY, T_C=70), ProcessStage(stack(), 10.1 * DAY, T_C=25)]
+    results = run_process_chain(stages, 7000.0, M_r=200)
+    assert results[0][5][-1] == pytest.approx(2.3 * DAY)
+    assert results[1][5][-1] == pytest.approx(12.4 * DAY)
+    np.testing.assert_allclose(results[1][1], results[0][0][-1])
+
+
+def test_minimum_layer_thickness_meets_limit():
+    layers = stack()
+    free = run_simulation(layers, 10 * DAY, 3600.0, snapshots="final")
+    limit = 0.2 * migrated_mass(layers, free[3], free[0][-1])
+    result = minimum_layer_thickness(layers, 1, limit, 10 * DAY, 3600.0, rtol=1e-3)
+    assert not result["limit_met_at_d_min"]
+    assert result["migrated_mass"] == pytest.approx(limit, rel=2e-2)
+    d_low, d_high = result["bracket"]
+    assert d_low <= result["d"] <= d_high
+
+    # d_max zwischen Startdicke und nächster Verdopplung: die Einschließung endet bei d_max
+    d_max = 0.5 * (result["d"] + 2 * layers[1].d)
+    assert layers[1].d < result["d"] < d_max < 2 * layers[1].d
+    clamped = minimum_layer_thickness(layers, 1, limit, 10 * DAY, 3600.0, rtol=1e-3, d_max=d_max)
+    assert clamped["d"] == pytest.approx(result["d"], rel=1e-2)
+    assert clamped["bracket"][1] == pytest.approx(d_max)
+    with pytest.raises(ValueError):
+        minimum_layer_thickness(layers, 1, limit, 10 * DAY, 3600.0, d_max=0.5 * (layers[1].d + result["d"]))
+
+
+def test_minimum_layer_thickness_reports_when_no_barrier_is_needed():
+    layers = stack()
+    C_values, C_init, _, x, _, _ = run_simulation(layers, 10 * DAY, 3600.0, snapshots="final")
+    # Mehr als die gesamte Masse im Aufbau kann nicht migrieren
+    limit = 2 * layer_mass_weights(layers, x).sum(axis=0) @ C_init
+    result = minimum_layer_thickness(layers, 1, limit, 10 * DAY, 3600.0)
+    assert result["limit_met_at_d_min"]
+    assert result["bracket"] is None
+    assert result["migrated_mass"] <= limit
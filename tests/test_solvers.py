@@ -0,0 +1,168 @@
+import copy
+
+import numpy as np
+import pytest
+
+import ml_model_package.ml_model_functions as ml_model_functions
+from ml_model_package.ml_model_functions import (
+    Layer,
+    LayerMassObserver,
+    MigratedMassObserver,
+    clear_operator_cache,
+    factorize_tridiagonal,
+    initialize_grid,
+    initialize_matrices,
+    layer_mass_weights,
+    load_trajectory,
+    operator_cache_info,
+    run_batch_simulation,
+    run_simulation,
+    solve_factorized,
+)
+
+
+def migrated_mass(layers, x, C):
+    return layer_mass_weights(layers, x)[-1] @ C
+
+
+def test_banded_matches_dense(three_layers):
+    dense = run_simulation(three_layers, 20000.0, 200.0, solver="dense")
+    banded = run_simulation(three_layers, 20000.0, 200.0, solver="banded")
+    np.testing.assert_allclose(np.asarray(banded[0]), np.asarray(dense[0]), rtol=1e-10, atol=1e-10)
+    np.testing.assert_allclose(banded[5], dense[5])
+
+
+def test_banded_assembly_matches_dense(three_layers):
+    A, B = initialize_matrices(three_layers, 200.0)
+    A_bands, B_bands = initialize_matrices(three_layers, 200.0, assembly="banded")
+    for M, (lower, diag, upper) in ((A, A_bands), (B, B_bands)):
+        np.testing.assert_allclose(np.diag(M, -1), lower)
+        np.testing.assert_allclose(np.diag(M), diag)
+        np.testing.assert_allclose(np.diag(M, 1), upper)
+        np.testing.assert_allclose(M, np.diag(lower, -1) + np.diag(diag) + np.diag(upper, 1))
+
+
+def test_snapshots_select_steps_of_full_run(two_layers):
+    full = run_simulation(two_layers, 20000.0, 200.0)
+    every = run_simulation(two_layers, 20000.0, 200.0, snapshots=7)
+    final = run_simulation(two_layers, 20000.0, 200.0, snapshots="final")
+    times = np.asarray(full[5])
+    for C_values, time_points in ((every[0], every[5]), (final[0], final[5])):
+        index = np.searchsorted(times, time_points)
+        np.testing.assert_allclose(times[index], time_points)
+        np.testing.assert_allclose(np.asarray(C_values), np.asarray(full[0])[index])
+    assert final[5][-1] == pytest.approx(20000.0)
+
+
+def test_observers_see_every_step(two_layers):
+    mass = MigratedMassObserver()
+    layer_mass = LayerMassObserver()
+    C_values, _, _, x, _, time_points = run_simulation(two_layers, 20000.0, 200.0, observers=[mass, layer_mass])
+    expected = [migrated_mass(two_layers, x, C) for C in C_values]
+    np.testing.assert_allclose(np.asarray(mass.values)[-len(expected):], expected)
+    np.testing.assert_allclose(np.asarray(layer_mass.values).sum(axis=-1)[-1],
+                               layer_mass_weights(two_layers, x).sum(axis=0) @ C_values[-1])
+
+
+def test_trajectory_store_round_trip(two_layers, tmp_path):
+    C_values, C_init, _, x, _, time_points = run_simulation(two_layers, 20000.0, 200.0, snapshots=10,
+                                                            trajectory=str(tmp_path))
+    stored, stored_times, stored_x, stored_init = load_trajectory(str(tmp_path))
+    np.testing.assert_allclose(np.asarray(stored), np.asarray(C_values))
+    np.testing.assert_allclose(stored_times, time_points)
+    np.testing.assert_allclose(stored_x, x)
+
+
+def test_batch_matches_single_runs(two_layers):
+    scenarios = []
+    for D, K in ((1e-8, 1.0), (3e-8, 2.0), (5e-9, 0.5)):
+        stack = [copy.copy(layer) for layer in two_layers]
+        stack[0].D = D
+        stack[0].K_value = K
+        scenarios.append(stack)
+    masses, time_points, C_final, x = run_batch_simulation(scenarios, 20100.0, 200.0, snapshots=10)
+    for s, stack in enumerate(scenarios):
+        C_values, _, _, x_single, _, single_times = run_simulation(stack, 20100.0, 200.0, snapshots=10)
+        np.testing.assert_allclose(time_points, single_times)
+        assert time_points[-1] == pytest.approx(20100.0)
+        np.testing.assert_allclose(C_final[s], C_values[-1], rtol=1e-10, atol=1e-10)
+        np.testing.assert_allclose(masses[s], [migrated_mass(stack, x_single, C) for C in C_values],
+                                   rtol=1e-10, atol=1e-12)
+
+
+@pytest.mark.parametrize("solver", ["expm", "modal"])
+def test_jump_to_time_matches_fine_time_stepping(three_layers, solver):
+    reference = run_simulation(three_layers, 20000.0, 5.0, snapshots=[2000.0, 20000.0], startup_steps=2)
+    result = run_simulation(three_layers, 20000.0, 200.0, solver=solver, snapshots=[2000.0, 20000.0])
+    np.testing.assert_allclose(result[5], [2000.0, 20000.0])
+    scale = np.abs(reference[1]).max()
+    np.testing.assert_allclose(np.asarray(result[0]), np.asarray(reference[0]), atol=1e-4 * scale)
+
+
+def test_adaptive_matches_fine_time_stepping(three_layers):
+    reference = run_simulation(three_layers, 20000.0, 5.0, snapshots="final", startup_steps=2)
+    adaptive = run_simulation(three_layers, 20000.0, 10.0, time_stepping="adaptive", rtol=1e-5, snapshots="final")
+    assert adaptive[5][-1] == pytest.approx(20000.0)
+    x = reference[3]
+    m_ref = migrated_mass(three_layers, x, reference[0][-1])
+    assert migrated_mass(three_layers, x, adaptive[0][-1]) == pytest.approx(m_ref, rel=1e-3)
+
+
+def test_graded_mesh_clusters_nodes_at_boundaries():
+    layers = [Layer("LDPE", 0.01, 21, D=1e-8, C_init=1.0, dx_edge=1e-4),
+              Layer("Kontaktphase", 0.1, 11, D=1e-6, dx_edge=1e-4)]
+    x = initialize_grid(layers)
+    h = np.diff(x[:21])
+    assert h[0] == pytest.approx(1e-4)
+    assert h[-1] == pytest.approx(1e-4)
+    assert h.max() > 2e-4
+    assert x[20] == pytest.approx(0.01)
+
+
+def test_graded_mesh_rejects_mismatched_interface_spacing():
+    layers = [Layer("LDPE", 0.01, 21, D=1e-8, C_init=1.0, dx_edge=1e-4),
+              Layer("Kontaktphase", 0.1, 11, D=1e-6)]
+    with pytest.raises(ValueError):
+        run_simulation(layers, 2000.0, 200.0)
+
+
+def test_lumped_contact_conserves_mass_and_reaches_partition_equilibrium(two_layers):
+    layers = [copy.copy(layer) for layer in two_layers]
+    layers[1].lumped = True
+    layers[1].nx = 1
+    C_values, C_init, _, x, _, _ = run_simulation(layers, 2e5, 200.0, integrator="tr_bdf2")
+    weights = layer_mass_weights(layers, x)
+    total = weights.sum(axis=0) @ C_init
+    np.testing.assert_allclose(weights.sum(axis=0) @ np.asarray(C_values).T, total, rtol=1e-10)
+    polymer, contact = layers
+    share = contact.density * contact.d / (polymer.density * polymer.d * polymer.K_value + contact.density * contact.d)
+    assert migrated_mass(layers, x, C_values[-1]) == pytest.approx(share * total, rel=1e-4)
+
+
+def test_operator_cache_reuses_factorizations(two_layers):
+    clear_operator_cache()
+    run_simulation(two_layers, 2000.0, 200.0)
+    misses = operator_cache_info()["misses"]
+    run_simulation(two_layers, 4000.0, 200.0)
+    info = operator_cache_info()
+    assert info["misses"] == misses
+    assert info["hits"] > 0
+
+
+def test_solve_factorized_matches_dense_solve():
+    bands = (np.full(4, -1.0), np.full(5, 3.0), np.full(4, -1.5))
+    A = np.diag(bands[0], -1) + np.diag(bands[1]) + np.diag(bands[2], 1)
+    b = np.arange(10.0).reshape(5, 2)
+    np.testing.assert_allclose(solve_factorized(factorize_tridiagonal(bands), b), np.linalg.solve(A, b))
+
+
+def test_singular_matrix_is_rejected():
+    with pytest.raises(ValueError):
+        factorize_tridiagonal((np.zeros(2), np.array([1.0, 0.0, 1.0]), np.zeros(2)))
+
+
+def test_solve_factorized_checks_lapack_info(monkeypatch):
+    A_lu = factorize_tridiagonal((np.ones(2), np.full(3, 4.0), np.ones(2)))
+    monkeypatch.setattr(ml_model_functions, "dgttrs", lambda *args: (args[-1], -6))
+    with pytest.raises(ValueError):
+        solve_factorized(A_lu, np.ones(3))
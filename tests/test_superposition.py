@@ -0,0 +1,36 @@
+import copy
+
+import numpy as np
+import pytest
+
+from ml_model_package.ml_model_functions import SuperpositionEngine, run_simulation
+
+
+def _loaded(layers, C_init_values):
+    stack = [copy.copy(layer) for layer in layers]
+    for layer, value in zip(stack, C_init_values):
+        layer.C_init = value
+    return stack
+
+
+@pytest.mark.parametrize("options", [
+    dict(time_stepping="fixed"),
+    dict(time_stepping="fixed", integrator="tr_bdf2"),
+    dict(time_stepping="geometric", dt_max=2000.0),
+    dict(time_stepping="fixed", startup_steps=2, snapshots=10),
+    dict(solver="modal", snapshots=("log", 12)),
+])
+def test_superposition_matches_direct_run(three_layers, options):
+    C_init_values = [50.0, 7.0, 0.5]
+    engine = SuperpositionEngine(three_layers, 20000.0, 200.0, **options)
+    C_values, C_init, x, time_points = engine.profiles(C_init_values)
+
+    direct = run_simulation(_loaded(three_layers, C_init_values), 20000.0, 200.0, **options)
+    np.testing.assert_allclose(time_points, direct[5])
+    np.testing.assert_allclose(C_init, direct[1])
+    np.testing.assert_allclose(C_values, np.asarray(direct[0]), rtol=1e-9, atol=1e-9)
+
+
+def test_superposition_rejects_adaptive_time_stepping(three_layers):
+    with pytest.raises(ValueError):
+        SuperpositionEngine(three_layers, 20000.0, 200.0, time_stepping="adaptive")
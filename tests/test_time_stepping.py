@@ -0,0 +1,93 @@
+import copy
+
+import numpy as np
+import pytest
+
+from ml_model_package.ml_model_functions import (
+    NegativeConcentrationObserver,
+    geometric_time_points,
+    layer_mass_weights,
+    run_simulation,
+)
+
+
+def migrated_mass(layers, result):
+    return layer_mass_weights(layers, result[3])[-1] @ result[0][-1]
+
+
+@pytest.fixture
+def stiff_layers(two_layers):
+    """Aufgelöste Kontaktphase mit großem D: steife Moden, an denen Crank-Nicolson bei großem dt oszilliert."""
+    layers = [copy.copy(layer) for layer in two_layers]
+    layers[1].D = 1e-4
+    return layers
+
+
+@pytest.fixture
+def reference(stiff_layers):
+    return run_simulation(stiff_layers, 20000.0, 10000.0, solver="modal", snapshots=[20000.0])
+
+
+def test_geometric_schedule_ends_exactly_and_grows():
+    times = geometric_time_points(1e6, 10.0, dt_max=1e4)
+    steps = np.diff(times, prepend=0.0)
+    assert times[-1] == 1e6
+    assert steps[0] == pytest.approx(10.0)
+    assert steps.max() <= 1e4 * (1 + 1e-12)
+    assert len(times) < 1e6 / 1e4 + 100
+
+
+def test_geometric_time_stepping_matches_reference(stiff_layers, reference):
+    result = run_simulation(stiff_layers, 20000.0, 1.0, time_stepping="geometric", dt_max=200.0, snapshots="final")
+    assert result[5][-1] == pytest.approx(20000.0)
+    assert migrated_mass(stiff_layers, result) == pytest.approx(migrated_mass(stiff_layers, reference), rel=1e-3)
+
+
+def test_startup_steps_damp_crank_nicolson_oscillations(stiff_layers):
+    plain = NegativeConcentrationObserver()
+    smoothed = NegativeConcentrationObserver()
+    run_simulation(stiff_layers, 20000.0, 2000.0, observers=[plain])
+    run_simulation(stiff_layers, 20000.0, 2000.0, observers=[smoothed], startup_steps=2)
+    assert not np.isnan(plain.first_time)
+    assert np.isnan(smoothed.first_time)
+
+
+def test_adaptive_time_stepping_honours_startup_steps(stiff_layers):
+    plain = NegativeConcentrationObserver()
+    smoothed = NegativeConcentrationObserver()
+    run_simulation(stiff_layers, 20000.0, 2000.0, time_stepping="adaptive", rtol=1e-1, observers=[plain])
+    run_simulation(stiff_layers, 20000.0, 2000.0, time_stepping="adaptive", rtol=1e-1, observers=[smoothed],
+                   startup_steps=2)
+    assert smoothed.minimum >= plain.minimum
+    assert np.isnan(smoothed.first_time)
+
+
+def test_tr_bdf2_damps_stiff_modes_and_is_second_order(stiff_layers, reference):
+    cn = NegativeConcentrationObserver()
+    tr_bdf2 = NegativeConcentrationObserver()
+    run_simulation(stiff_layers, 20000.0, 2000.0, observers=[cn])
+    run_simulation(stiff_layers, 20000.0, 2000.0, integrator="tr_bdf2", observers=[tr_bdf2])
+    assert abs(tr_bdf2.minimum) < 0.1 * abs(cn.minimum)
+
+    errors = []
+    for dt in (400.0, 200.0, 100.0):
+        result = run_simulation(stiff_layers, 20000.0, dt, integrator="tr_bdf2", snapshots="final")
+        errors.append(abs(migrated_mass(stiff_layers, result) - migrated_mass(stiff_layers, reference)))
+    orders = np.log2(np.array(errors[:-1]) / np.array(errors[1:]))
+    assert np.all(orders > 1.7)
+
+
+def test_fixed_steps_end_exactly_at_t_max(two_layers):
+    result = run_simulation(two_layers, 1050.0, 100.0)
+    assert result[5][-1] == pytest.approx(1050.0)
+    assert result[5][-2] == pytest.approx(1000.0)
+    fine = run_simulation(two_layers, 1050.0, 1.0, startup_steps=2, snapshots="final")
+    coarse = run_simulation(two_layers, 1050.0, 50.0, startup_steps=2, snapshots="final")
+    assert migrated_mass(two_layers, coarse) == pytest.approx(migrated_mass(two_layers, fine), rel=1e-2)
+
+
+def test_explicit_snapshots_map_to_the_shortened_last_step(two_layers):
+    result = run_simulation(two_layers, 2500.0, 200.0, snapshots=[600.0, 2500.0])
+    assert result[5] == pytest.approx([600.0, 2500.0])
+    full = run_simulation(two_layers, 2500.0, 200.0, snapshots="final")
+    np.testing.assert_allclose(result[0][-1], full[0][-1])